@@ -0,0 +1,320 @@
+# config/runtime.py
+"""
+Live configuration and the local control endpoint.
+
+• `StrategyParams` – thresholds, trade size, limits; read from
+  config/strategy.yaml, validated as a whole and swapped in as one object
+• `Runtime.watch()` – polls the mtimes of strategy.yaml and exchanges.yaml
+  once a second and reloads whichever changed. A file that fails to parse
+  or validate is logged and ignored; the running values stay.
+• applying params touches only in-memory state: `SpreadEngine.configure`
+  (thresholds, max quote age) and the `PositionManager` limits, in one
+  synchronous step on the event loop, so no quote is ever evaluated
+  against a half-applied set and no connection is dropped
+• exchanges.yaml – rotated apiKey / secret are set on the running clients;
+  added or removed venues need a restart
+• `Runtime.serve()` – aiohttp app on 127.0.0.1 only:
+    GET  /stats   quotes/s, decision latency, open positions, rate limits,
+                  transport counters; all O(1) or O(buckets), fine at 1 Hz
+    GET  /params  current parameters
+    POST /params  JSON object of parameters to change (not written back
+                  to the file; the next file edit wins)
+    POST /reload  re-read both files now
+
+`symbol` and `poll_interval` decide which feeds run; they are reported as
+pending until the next restart. So is `trade_amount` while depth feeds run
+(`Runtime.depth_amount` set): their books quote the VWAP for the startup
+size, and positions keep being opened at that size so decisions and orders
+agree. quotes/s in /stats is the rate over the last RATE_WINDOW samples
+taken by `watch()`, whoever asks and however often.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+from typing import Any, ClassVar, Deque, Dict, List, Optional, Tuple
+
+import yaml
+from aiohttp import web
+
+from config.loader import load_exchanges_config
+from exchanges import rate_limit, resilience
+from utils import latency
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR     = Path(__file__).parent
+STRATEGY_PATH  = CONFIG_DIR / "strategy.yaml"
+EXCHANGES_PATH = CONFIG_DIR / "exchanges.yaml"
+WATCH_INTERVAL = 1.0        # seconds between mtime checks
+RATE_WINDOW    = 10         # watch() samples of the quote counter behind quotes/s
+CONTROL_HOST   = "127.0.0.1"
+CONTROL_PORT   = 8787
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    symbol: str = "BTC/USDT"
+    trade_amount: float = 0.001
+    threshold_open: float = 0.2
+    threshold_close: float = 0.1
+    poll_interval: float = 1.0
+    max_quote_age: Optional[float] = 2.0
+    max_positions: int = 4
+    max_per_symbol: int = 1
+
+    RESTART_ONLY: ClassVar[Tuple[str, ...]] = ("symbol", "poll_interval")
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any], base: Optional["StrategyParams"] = None) -> "StrategyParams":
+        """`base` (defaults if None) with the keys of `raw` replaced; ValueError if invalid."""
+        base = base or cls()
+        types = {f.name: type(f.default) for f in fields(cls)}
+        unknown = set(raw) - set(types)
+        if unknown:
+            raise ValueError(f"unknown parameter(s): {', '.join(sorted(unknown))}")
+        values = {}
+        for k, v in raw.items():
+            if k == "max_quote_age" and v is None:
+                values[k] = None
+                continue
+            try:
+                values[k] = (float(v) if types[k] is float else _whole(v) if types[k] is int
+                             else types[k](v))
+            except (TypeError, ValueError):
+                raise ValueError(f"{k}: expected {types[k].__name__}, got {v!r}") from None
+        params = replace(base, **values)
+        params.validate()
+        return params
+
+    def validate(self) -> None:
+        if self.trade_amount <= 0:
+            raise ValueError("trade_amount must be > 0")
+        if self.threshold_close > self.threshold_open:
+            raise ValueError(f"threshold_close {self.threshold_close} > threshold_open {self.threshold_open}")
+        if self.poll_interval <= 0:
+            raise ValueError("poll_interval must be > 0")
+        if self.max_quote_age is not None and self.max_quote_age <= 0:
+            raise ValueError("max_quote_age must be > 0 or null")
+        if self.max_positions < 1:
+            raise ValueError("max_positions must be ≥ 1")
+        if self.max_per_symbol < 1:
+            raise ValueError("max_per_symbol must be ≥ 1")
+
+    def diff(self, other: "StrategyParams") -> List[str]:
+        return [f.name for f in fields(self) if getattr(self, f.name) != getattr(other, f.name)]
+
+
+def _whole(v: Any) -> int:
+    """`v` as an int if it is a whole number (3, 3.0, "3"); ValueError for 2.9, "3.5" or a bool."""
+    if isinstance(v, bool):
+        raise ValueError(v)
+    if isinstance(v, str):
+        v = float(v)
+    if isinstance(v, float) and not v.is_integer():
+        raise ValueError(v)
+    return int(v)
+
+
+def load_strategy(path: Path = STRATEGY_PATH) -> StrategyParams:
+    """Params from `path`; defaults if the file does not exist."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return StrategyParams()
+    if not isinstance(raw, dict):
+        raise ValueError(f"{path}: expected a mapping")
+    return StrategyParams.from_dict(raw)
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+# ─── Runtime ─────────────────────────────────────────────────────────────────
+class Runtime:
+    """Current params + the live objects they are applied to."""
+
+    def __init__(self, params: Optional[StrategyParams] = None,
+                 strategy_path: Path = STRATEGY_PATH, exchanges_path: Optional[Path] = EXCHANGES_PATH):
+        self.strategy_path = Path(strategy_path)
+        self.exchanges_path = Path(exchanges_path) if exchanges_path else None
+        self.params = params or load_strategy(self.strategy_path)
+        self.started_with = self.params           # what the feeds were built from
+        self.exchanges: Dict[str, dict] = {}
+        self.engine = None
+        self.store = None
+        self.positions = None
+        self.clients: Dict[str, Any] = {}
+        self.depth_amount: Optional[float] = None   # size the running depth feeds quote for
+        self.reloads = 0
+        self._mtimes = {p: _mtime(p) for p in self._paths()}
+        # (when, store.updates), one per watch() tick
+        self._rate: Deque[Tuple[float, int]] = deque([(time.monotonic(), 0)], maxlen=RATE_WINDOW + 1)
+        self._started = time.time()
+
+    def _paths(self) -> List[Path]:
+        return [p for p in (self.strategy_path, self.exchanges_path) if p is not None]
+
+    def bind(self, **objects) -> None:
+        """Register live objects (engine, store, positions, clients) and push the params to them."""
+        for name, obj in objects.items():
+            if name not in ("engine", "store", "positions", "clients"):
+                raise TypeError(f"cannot bind {name!r}")
+            setattr(self, name, obj)
+        self._push(self.params)
+
+    # ─── Applying ────────────────────────────────────────────────────────────
+    def _push(self, p: StrategyParams) -> None:
+        if self.engine is not None:
+            self.engine.configure(p.threshold_open, p.threshold_close, p.max_quote_age)
+        if self.positions is not None:
+            self.positions.max_positions = p.max_positions
+            self.positions.max_per_symbol = p.max_per_symbol
+            if self.engine is not None:
+                self.engine.max_pairs = p.max_per_symbol
+
+    @property
+    def trade_amount(self) -> float:
+        """Size to open new positions with: the depth feeds' size while they run."""
+        return self.depth_amount if self.depth_amount is not None else self.params.trade_amount
+
+    def restart_only(self) -> Tuple[str, ...]:
+        if self.depth_amount is not None:
+            return StrategyParams.RESTART_ONLY + ("trade_amount",)
+        return StrategyParams.RESTART_ONLY
+
+    def apply(self, params: StrategyParams) -> List[str]:
+        """Make `params` current; returns the names of the fields that changed."""
+        params.validate()
+        changed = params.diff(self.params)
+        if not changed:
+            return []
+        self.params = params
+        self._push(params)
+        pending = [k for k in changed if k in self.restart_only()]
+        logger.info("params updated: %s", ", ".join(f"{k}={getattr(params, k)}" for k in changed))
+        if pending:
+            logger.warning("params %s take effect on restart", ", ".join(pending))
+        return changed
+
+    def update(self, raw: Dict[str, Any]) -> List[str]:
+        return self.apply(StrategyParams.from_dict(raw, self.params))
+
+    def pending(self) -> List[str]:
+        return [k for k in self.restart_only()
+                if getattr(self.params, k) != getattr(self.started_with, k)]
+
+    # ─── Files ───────────────────────────────────────────────────────────────
+    def _reload_exchanges(self) -> None:
+        cfg = load_exchanges_config(str(self.exchanges_path))
+        for venue, client in self.clients.items():
+            new = cfg.get(venue)
+            inner = getattr(client, "client", None)
+            if new is None or inner is None:
+                continue
+            for key in ("apiKey", "secret"):
+                if key in new and hasattr(inner, key) and getattr(inner, key) != new[key]:
+                    setattr(inner, key, new[key])
+                    logger.info("[%s] %s rotated", venue, key)
+        if self.exchanges and set(cfg) != set(self.exchanges):
+            logger.warning("venues changed in %s; restart to connect them", self.exchanges_path)
+        self.exchanges = cfg
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read every file whose mtime moved (all with `force`); True if any was read."""
+        read = False
+        for path in self._paths():
+            mtime = _mtime(path)
+            if not force and mtime == self._mtimes.get(path):
+                continue
+            self._mtimes[path] = mtime
+            read = True
+            try:
+                if path == self.strategy_path:
+                    self.apply(load_strategy(path))
+                else:
+                    self._reload_exchanges()
+            except Exception as exc:
+                logger.error("%s not applied: %s", path.name, exc)
+        if read:
+            self.reloads += 1
+        return read
+
+    async def watch(self, interval: float = WATCH_INTERVAL) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.sample()
+            self.reload()
+
+    def sample(self) -> None:
+        """Add the quote counter to the quotes/s window."""
+        self._rate.append((time.monotonic(), self.store.updates if self.store is not None else 0))
+
+    # ─── Stats ───────────────────────────────────────────────────────────────
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        updates = self.store.updates if self.store is not None else 0
+        since, seen = self._rate[0]
+        out: Dict[str, Any] = {
+            "uptime": round(time.time() - self._started, 1),
+            "quotes": updates,
+            "quotes_per_sec": round((updates - seen) / (now - since), 1) if now > since else 0.0,
+            "decision_us": latency.histogram("quote_to_decision").snapshot(),
+            "rate_limit": rate_limit.stats()["venues"],
+            "transport": {k: v for k, v in resilience.stats().items() if not isinstance(v, dict)},
+            "reloads": self.reloads,
+            "pending_restart": self.pending(),
+        }
+        if self.positions is not None:
+            pm = self.positions
+            out["positions"] = {
+                "open": len(pm.positions),
+                "max": pm.max_positions,
+                "max_per_symbol": pm.max_per_symbol,
+                "exposure": round(pm.exposure, 2),
+                "list": [{"symbol": p.symbol, "low": p.low, "high": p.high, "amount": p.amount,
+                          "price": p.price, "spread": round(p.spread, 4),
+                          "age": round(time.time() - p.opened, 1)} for p in pm.positions.values()],
+            }
+        return out
+
+    # ─── Control endpoint ────────────────────────────────────────────────────
+    async def serve(self, host: str = CONTROL_HOST, port: int = CONTROL_PORT) -> web.AppRunner:
+        async def get_stats(_):
+            return web.json_response(self.stats())
+
+        async def get_params(_):
+            return web.json_response({**asdict(self.params), "pending_restart": self.pending()})
+
+        async def post_params(request):
+            try:
+                raw = await request.json()
+                if not isinstance(raw, dict):
+                    raise ValueError("expected a JSON object")
+                changed = self.update(raw)
+            except ValueError as exc:
+                return web.json_response({"error": str(exc)}, status=400)
+            return web.json_response({"changed": changed, **asdict(self.params)})
+
+        async def post_reload(_):
+            self.reload(force=True)
+            return web.json_response(asdict(self.params))
+
+        app = web.Application()
+        app.router.add_get("/stats", get_stats)
+        app.router.add_get("/params", get_params)
+        app.router.add_post("/params", post_params)
+        app.router.add_post("/reload", post_reload)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        logger.info("control endpoint on http://%s:%d (/stats, /params, /reload)", host, port)
+        return runner
@@ -0,0 +1,210 @@
+# data/recorder.py
+"""
+Tick recorder.
+
+Quotes are appended into preallocated NumPy column buffers (no I/O, no
+allocation per tick). Full buffers are handed to a single writer thread that
+appends each column as raw little-endian bytes to
+
+    data/raw/<YYYY-MM-DD>/<column>.bin      (one directory per UTC day)
+
+so any day can be opened with `np.memmap` / `np.fromfile` without parsing.
+Venue and symbol names are stored as small integer codes mapped in
+`data/raw/codes.json`.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RAW_DIR = Path(__file__).parent / "raw"
+
+COLUMNS = {
+    "ts":     np.dtype("<f8"),   # local receive time, epoch seconds
+    "venue":  np.dtype("<u2"),
+    "symbol": np.dtype("<u4"),
+    "bid":    np.dtype("<f8"),
+    "ask":    np.dtype("<f8"),
+    "last":   np.dtype("<f8"),
+}
+
+DEFAULT_CAPACITY = 1 << 16    # ticks per buffer
+FLUSH_INTERVAL   = 1.0        # seconds; partial buffers are flushed this often
+
+
+class TickRecorder:
+    """
+    Non-blocking quote recorder.
+
+    • record(venue, symbol, bid, ask, last, ts) – O(1), safe on the hot path
+    • run()   – background task flushing partial buffers every FLUSH_INTERVAL
+    • close() – flush what is left and wait for the writer
+    """
+
+    def __init__(
+        self,
+        root: Path = RAW_DIR,
+        capacity: int = DEFAULT_CAPACITY,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.venues, self.symbols = _load_codes(self.root)
+        self._codes_dirty = False
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tick-writer")
+        self._alloc()
+        self.recorded = 0
+
+    def _alloc(self) -> None:
+        cols = {name: np.empty(self.capacity, dtype) for name, dtype in COLUMNS.items()}
+        self._cols = cols
+        self._ts, self._venue, self._symbol = cols["ts"], cols["venue"], cols["symbol"]
+        self._bid, self._ask, self._last = cols["bid"], cols["ask"], cols["last"]
+        self._n = 0
+
+    def _code(self, table: Dict[str, int], name: str) -> int:
+        code = table.get(name)
+        if code is None:
+            code = table[name] = len(table)
+            self._codes_dirty = True
+        return code
+
+    def record(
+        self,
+        venue: str,
+        symbol: str,
+        bid: float,
+        ask: float,
+        last: float,
+        ts: Optional[float] = None,
+    ) -> None:
+        n = self._n
+        self._ts[n]     = time.time() if ts is None else ts
+        self._venue[n]  = self._code(self.venues, venue)
+        self._symbol[n] = self._code(self.symbols, symbol)
+        self._bid[n]    = bid
+        self._ask[n]    = ask
+        self._last[n]   = last
+        self._n = n + 1
+        self.recorded += 1
+        if self._n == self.capacity:
+            self.flush()
+
+    def flush(self):
+        """Hand the current buffer to the writer thread; returns its future."""
+        if self._n == 0 and not self._codes_dirty:
+            return None
+        cols = {k: v[:self._n] for k, v in self._cols.items()}
+        codes = (dict(self.venues), dict(self.symbols)) if self._codes_dirty else None
+        self._codes_dirty = False
+        self._alloc()
+        return self._writer.submit(_write, self.root, cols, codes)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            fut = self.flush()
+            if fut is not None:
+                await asyncio.wrap_future(fut, loop=loop)
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.shutdown(wait=True)
+
+
+# ─── Writer side ─────────────────────────────────────────────────────────────
+def _day(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+def _write(root: Path, cols: Dict[str, np.ndarray], codes) -> None:
+    try:
+        if codes is not None:
+            _save_codes(root, *codes)
+        ts = cols["ts"]
+        if not len(ts):
+            return
+        # split at UTC midnight boundaries (ticks arrive in time order)
+        days = np.floor(ts / 86400.0).astype(np.int64)
+        cuts = np.flatnonzero(np.diff(days)) + 1
+        for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, len(ts)]):
+            day_dir = root / _day(ts[lo])
+            day_dir.mkdir(exist_ok=True)
+            for name, arr in cols.items():
+                with open(day_dir / f"{name}.bin", "ab") as f:
+                    arr[lo:hi].tofile(f)
+    except Exception as exc:
+        logger.error(f"tick flush failed: {exc}")
+
+
+def _load_codes(root: Path) -> Tuple[Dict[str, int], Dict[str, int]]:
+    path = root / "codes.json"
+    if not path.exists():
+        return {}, {}
+    with open(path, "r") as f:
+        data = json.load(f)
+    return data.get("venues", {}), data.get("symbols", {})
+
+
+def _save_codes(root: Path, venues: Dict[str, int], symbols: Dict[str, int]) -> None:
+    tmp = root / "codes.json.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"venues": venues, "symbols": symbols}, f)
+    os.replace(tmp, root / "codes.json")
+
+
+# ─── Reader side ─────────────────────────────────────────────────────────────
+def list_days(root: Path = RAW_DIR) -> List[str]:
+    return sorted(p.name for p in Path(root).iterdir() if p.is_dir() and (p / "ts.bin").exists())
+
+
+def open_day(day: str, root: Path = RAW_DIR, mmap: bool = True) -> Dict[str, np.ndarray]:
+    """Columns for one day; memory-mapped unless `mmap=False`."""
+    day_dir = Path(root) / day
+    lengths = [(day_dir / f"{n}.bin").stat().st_size // d.itemsize for n, d in COLUMNS.items()]
+    rows = min(lengths)   # a crash mid-flush can leave columns ragged
+    out = {}
+    for name, dtype in COLUMNS.items():
+        path = day_dir / f"{name}.bin"
+        if mmap:
+            out[name] = np.memmap(path, dtype=dtype, mode="r", shape=(rows,)) if rows else np.empty(0, dtype)
+        else:
+            out[name] = np.fromfile(path, dtype=dtype, count=rows)
+    return out
+
+
+def iter_days(start: Optional[str] = None, end: Optional[str] = None,
+              root: Path = RAW_DIR) -> Iterator[Tuple[str, Dict[str, np.ndarray]]]:
+    """Yield (day, columns) for every recorded day in [start, end]."""
+    for day in list_days(root):
+        if (start is None or day >= start) and (end is None or day <= end):
+            yield day, open_day(day, root)
+
+
+def load_ticks(start: Optional[str] = None, end: Optional[str] = None,
+               root: Path = RAW_DIR) -> Dict[str, Any]:
+    """
+    Concatenate all columns for days in [start, end] (YYYY-MM-DD, inclusive).
+    Adds `venues` / `symbols` name lists indexed by the stored codes.
+    """
+    days = [cols for _, cols in iter_days(start, end, root)]
+    out = {
+        name: np.concatenate([d[name] for d in days]) if days else np.empty(0, dtype)
+        for name, dtype in COLUMNS.items()
+    }
+    venues, symbols = _load_codes(Path(root))
+    out["venues"]  = [n for n, _ in sorted(venues.items(), key=lambda kv: kv[1])]
+    out["symbols"] = [n for n, _ in sorted(symbols.items(), key=lambda kv: kv[1])]
+    return out
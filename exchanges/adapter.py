@@ -0,0 +1,554 @@
+# exchanges/adapter.py
+"""
+One async interface for every venue.
+
+Each adapter wraps whatever client its venue uses (native REST + WebSocket,
+ccxt / ccxt.pro, ib_insync) behind the same coroutines:
+
+    load_markets()  → cached metadata    fetch_markets() → [MarketInfo]
+    fetch_balance()
+    fetch_quote(symbol)   → (bid, ask)   fetch_tickers(symbols) → {symbol: (bid, ask)}
+    fetch_book(symbol)    → (bids, asks) create_order(symbol, side, amount, client_id)
+    fetch_order(symbol, client_id) → order / None
+    stream_quotes(store, symbols, venue)  stream_depth(store, symbols, amount, venue)
+
+and advertises what it can do natively in `capabilities`. Callers pick the
+fastest path from the flags once, at start-up; the base class fills every
+gap with a generic fallback (polling for streams, per-symbol requests for
+batches), so no venue needs its own branch on the hot path.
+
+`ExchangeAdapter` is an ABC: every adapter must implement `fetch_quote`,
+`create_order` and `fetch_balance`. `fetch_book` (BOOK_SNAPSHOT) and
+`stream_depth` (STREAM_DEPTH) have no generic fallback; a venue without the
+flag raises `Unsupported`, so check `supports()` first. IBKR has neither.
+`fetch_order` looks an order up by the `client_id` it was sent with, so an
+order whose reply was lost can be reconciled; only Binance and Bybit have it.
+
+Every REST call, blocking ccxt ones included, first takes its weight from
+the venue's bucket in `exchanges.rate_limit`.
+
+ccxt-style `fetch_ticker` / `create_market_buy_order` /
+`create_market_sell_order` are kept so existing call sites keep working.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from enum import Flag, auto
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config.settings import DEFAULT_TIMEOUT
+from exchanges import streams
+from exchanges.http import get_json
+from exchanges.markets import DEFAULT_FEE_PCT, MARKETS, MarketInfo
+from exchanges.rate_limit import Priority, acquire, coalesce
+from utils import latency
+
+logger = logging.getLogger(__name__)
+
+# blocking client calls (ccxt REST) run here, off the event loop
+BLOCKING_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="exchange")
+
+STREAM_RETRY_DELAY = 5.0   # seconds before a failed ccxt.pro watch is retried
+LISTING_TIMEOUT    = DEFAULT_TIMEOUT   # seconds for a full market listing (exchangeInfo is large)
+
+Level = List[float]        # [price, qty]
+
+# only for venues with no cached markets; longest first so "FDUSD" wins over "USD"
+QUOTE_ASSETS = ("FDUSD", "USDT", "USDC", "BUSD", "TUSD", "USDE", "DAI",
+                "BTC", "ETH", "BNB", "EUR", "TRY", "BRL", "USD")
+
+
+def to_unified(pair: str) -> Optional[str]:
+    """'BTCUSDT' → 'BTC/USDT' by its quote suffix; None if the quote asset is not recognised."""
+    for quote in QUOTE_ASSETS:
+        if pair.endswith(quote) and len(pair) > len(quote):
+            return f"{pair[:-len(quote)]}/{quote}"
+    return None
+
+
+def unifier(venue: str) -> Callable[[str], Optional[str]]:
+    """
+    Exchange id → unified symbol for `venue`: exact, from the base / quote of
+    its cached markets; the `to_unified` suffix guess while it has none.
+    """
+    ids = MARKETS.unified(venue)
+    return ids.get if ids else to_unified
+
+
+async def _blocking(fn: Callable, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(BLOCKING_POOL, lambda: fn(*args))
+
+
+class Capability(Flag):
+    NONE          = 0
+    STREAM_QUOTES = auto()   # pushes top of book
+    STREAM_DEPTH  = auto()   # pushes L2, quoted as VWAP for a size
+    BATCH_TICKERS = auto()   # every symbol's bid/ask in one request
+    ORDERS        = auto()
+    BALANCES      = auto()
+    BOOK_SNAPSHOT = auto()   # L2 snapshot through fetch_book
+
+
+class Unsupported(NotImplementedError):
+    """The venue has no path for this call (its capability flag is not set)."""
+
+    def __init__(self, venue: str, call: str):
+        super().__init__(f"{venue} does not support {call}")
+
+
+# ─── Base ────────────────────────────────────────────────────────────────────
+class ExchangeAdapter(ABC):
+    """Common interface plus generic fallbacks for what a venue lacks."""
+
+    id = "generic"
+    capabilities = Capability.NONE
+
+    def __init__(self, client: Any = None):
+        self.client = client
+
+    def supports(self, capability: Capability) -> bool:
+        return capability in self.capabilities
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.id} {self.capabilities}>"
+
+    async def _limited(self, priority: Priority, weight: float, fn: Callable, *args):
+        """Blocking client call on `BLOCKING_POOL`, after the venue's rate limiter admits it."""
+        await acquire(self.id, weight, priority)
+        return await _blocking(fn, *args)
+
+    async def load_markets(self) -> Dict[str, MarketInfo]:
+        """Symbol → `MarketInfo` from the local cache; never hits the network."""
+        return MARKETS.markets(self.id)
+
+    async def fetch_markets(self) -> List[MarketInfo]:
+        """Download the venue's listing (`MARKETS` calls this in the background)."""
+        return []
+
+    @abstractmethod
+    async def fetch_quote(self, symbol: str) -> Tuple[float, float]:
+        """Current (bid, ask)."""
+
+    async def fetch_ticker(self, symbol: str) -> dict:
+        bid, ask = await self.fetch_quote(symbol)
+        return {"bid": bid, "ask": ask, "last": (bid + ask) / 2}
+
+    async def fetch_tickers(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Tuple[float, float]]:
+        """Fallback: one `fetch_quote` per symbol, concurrently."""
+        if symbols is None:
+            symbols = list(await self.load_markets()) or [m.symbol for m in await self.fetch_markets()]
+        symbols = list(symbols)
+        quotes = await asyncio.gather(*(self.fetch_quote(s) for s in symbols), return_exceptions=True)
+        return {s: q for s, q in zip(symbols, quotes) if not isinstance(q, BaseException)}
+
+    async def fetch_book(self, symbol: str, limit: int = 50) -> Tuple[List[Level], List[Level]]:
+        """Top *limit* levels per side; only with `Capability.BOOK_SNAPSHOT`."""
+        raise Unsupported(self.id, "fetch_book")
+
+    async def stream_quotes(self, store: streams.QuoteStore, symbols: List[str],
+                            venue: Optional[str] = None, poll_interval: float = 1.0) -> None:
+        """Fallback: poll bid/ask into `store` every *poll_interval* seconds."""
+        venue = venue or self.id
+        while True:
+            t0 = latency.now_ns()
+            try:
+                quotes = await self.fetch_tickers(symbols)
+                latency.record(f"fetch.{self.id}", latency.now_ns() - t0)
+                for sym in symbols:
+                    q = quotes.get(sym)
+                    if q is not None:
+                        store.update(venue, sym, q[0], q[1])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("[%s] fetch error: %s", venue, exc)
+            await asyncio.sleep(poll_interval)
+
+    async def stream_depth(self, store: streams.QuoteStore, symbols: List[str], amount: float,
+                           venue: Optional[str] = None) -> None:
+        """VWAP bid/ask for *amount* into `store`; only with `Capability.STREAM_DEPTH`."""
+        raise Unsupported(self.id, "stream_depth")
+
+    @abstractmethod
+    async def create_order(self, symbol: str, side: str, amount: float,
+                           client_id: Optional[str] = None) -> dict:
+        """Market order; `side` is "buy" or "sell", `client_id` our own id for it."""
+
+    async def create_market_buy_order(self, symbol: str, amount: float,
+                                      client_id: Optional[str] = None) -> dict:
+        return await self.create_order(symbol, "buy", amount, client_id)
+
+    async def create_market_sell_order(self, symbol: str, amount: float,
+                                       client_id: Optional[str] = None) -> dict:
+        return await self.create_order(symbol, "sell", amount, client_id)
+
+    async def fetch_order(self, symbol: str, client_id: str) -> Optional[dict]:
+        """The order sent with `client_id` (ccxt-shaped, with `filled`), None if the venue never took it."""
+        raise Unsupported(self.id, "fetch_order")
+
+    @abstractmethod
+    async def fetch_balance(self) -> dict:
+        """ccxt-shaped balances, at least {"free": {asset: amount}}."""
+
+
+# ─── Binance ─────────────────────────────────────────────────────────────────
+class BinanceAdapter(ExchangeAdapter):
+    """Public data over native REST/WebSocket, signed calls through `AsyncBinanceRestClient`."""
+
+    id = "binance"
+    capabilities = (Capability.STREAM_QUOTES | Capability.STREAM_DEPTH | Capability.BATCH_TICKERS
+                    | Capability.BOOK_SNAPSHOT | Capability.ORDERS | Capability.BALANCES)
+    REST_URL  = "https://api.binance.com/api/v3"
+    WS_URL    = streams.BINANCE_WS_URL
+    DEPTH_URL = streams.BINANCE_DEPTH_URL
+
+    async def fetch_quote(self, symbol: str) -> Tuple[float, float]:
+        t = await get_json(f"{self.REST_URL}/ticker/bookTicker", params={"symbol": symbol.replace("/", "")},
+                           weight=2)
+        return float(t["bidPrice"]), float(t["askPrice"])
+
+    async def fetch_tickers(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Tuple[float, float]]:
+        wanted = set(symbols) if symbols is not None else None
+        out = {}
+        tickers = await get_json(f"{self.REST_URL}/ticker/bookTicker", weight=4)
+        unified = unifier(self.id)
+        for t in tickers:
+            symbol = unified(t["symbol"])
+            if symbol is not None and (wanted is None or symbol in wanted):
+                out[symbol] = (float(t["bidPrice"]), float(t["askPrice"]))
+        return out
+
+    async def fetch_markets(self) -> List[MarketInfo]:
+        info = await get_json(f"{self.REST_URL}/exchangeInfo", params={"permissions": "SPOT"},
+                              timeout=LISTING_TIMEOUT, weight=20, hedge=False)
+        out = []
+        for s in info["symbols"]:
+            if s.get("status") != "TRADING":
+                continue
+            f = {x["filterType"]: x for x in s.get("filters", ())}
+            price, lot = f.get("PRICE_FILTER", {}), f.get("LOT_SIZE", {})
+            notional = f.get("NOTIONAL") or f.get("MIN_NOTIONAL") or {}
+            base, quote = s["baseAsset"], s["quoteAsset"]
+            out.append(MarketInfo(f"{base}/{quote}", base, quote,
+                                  float(price.get("tickSize", 0)), float(lot.get("stepSize", 0)),
+                                  float(lot.get("minQty", 0)), float(notional.get("minNotional", 0))))
+        return out
+
+    async def fetch_book(self, symbol: str, limit: int = 50) -> Tuple[List[Level], List[Level]]:
+        d = await get_json(f"{self.REST_URL}/depth", params={"symbol": symbol.replace("/", ""), "limit": limit},
+                           weight=5 if limit <= 100 else 25 if limit <= 500 else 50)
+        return ([[float(p), float(q)] for p, q in d["bids"]],
+                [[float(p), float(q)] for p, q in d["asks"]])
+
+    async def stream_quotes(self, store, symbols, venue=None, poll_interval=1.0) -> None:
+        await streams.stream_binance_book(store, symbols, venue=venue or self.id, url=self.WS_URL)
+
+    async def stream_depth(self, store, symbols, amount, venue=None) -> None:
+        await streams.stream_binance_depth(store, symbols, amount, venue=venue or self.id,
+                                           url=self.WS_URL, rest_url=self.DEPTH_URL)
+
+    async def create_order(self, symbol: str, side: str, amount: float,
+                           client_id: Optional[str] = None) -> dict:
+        return await self.client.create_order(symbol, "market", side, amount, client_id)
+
+    async def fetch_order(self, symbol: str, client_id: str) -> Optional[dict]:
+        return await self.client.fetch_order(symbol, client_id)
+
+    async def fetch_balance(self) -> dict:
+        return await self.client.fetch_balance()
+
+
+# ─── Bybit ───────────────────────────────────────────────────────────────────
+class BybitAdapter(ExchangeAdapter):
+    """Native REST/WebSocket throughout, around `AsyncBybitRestClient`."""
+
+    id = "bybit"
+    capabilities = (Capability.STREAM_QUOTES | Capability.STREAM_DEPTH | Capability.BATCH_TICKERS
+                    | Capability.BOOK_SNAPSHOT | Capability.ORDERS | Capability.BALANCES)
+    MARKET_URL = "https://api-testnet.bybit.com/v5/market"
+    WS_URL     = streams.BYBIT_WS_URL
+
+    async def fetch_quote(self, symbol: str) -> Tuple[float, float]:
+        t = await self.fetch_ticker(symbol)
+        return t["bid"], t["ask"]
+
+    async def fetch_ticker(self, symbol: str) -> dict:
+        data = await get_json(f"{self.MARKET_URL}/tickers",
+                              params={"category": "spot", "symbol": symbol.replace("/", "")})
+        t = data["result"]["list"][0]
+        return {"bid": float(t["bid1Price"]), "ask": float(t["ask1Price"]), "last": float(t["lastPrice"])}
+
+    async def fetch_tickers(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Tuple[float, float]]:
+        wanted = set(symbols) if symbols is not None else None
+        data = await get_json(f"{self.MARKET_URL}/tickers", params={"category": "spot"})
+        unified = unifier(self.id)
+        out = {}
+        for t in data["result"]["list"]:
+            symbol = unified(t["symbol"])
+            if (symbol is not None and (wanted is None or symbol in wanted)
+                    and t.get("bid1Price") and t.get("ask1Price")):
+                out[symbol] = (float(t["bid1Price"]), float(t["ask1Price"]))
+        return out
+
+    async def fetch_markets(self) -> List[MarketInfo]:
+        data = await get_json(f"{self.MARKET_URL}/instruments-info", params={"category": "spot"},
+                              timeout=LISTING_TIMEOUT, hedge=False)
+        out = []
+        for i in data["result"]["list"]:
+            if i.get("status") != "Trading":
+                continue
+            lot, price = i.get("lotSizeFilter", {}), i.get("priceFilter", {})
+            base, quote = i["baseCoin"], i["quoteCoin"]
+            out.append(MarketInfo(f"{base}/{quote}", base, quote,
+                                  float(price.get("tickSize", 0)), float(lot.get("basePrecision", 0)),
+                                  float(lot.get("minOrderQty", 0)), float(lot.get("minOrderAmt", 0))))
+        return out
+
+    async def fetch_book(self, symbol: str, limit: int = 50) -> Tuple[List[Level], List[Level]]:
+        data = await get_json(f"{self.MARKET_URL}/orderbook",
+                              params={"category": "spot", "symbol": symbol.replace("/", ""), "limit": limit})
+        r = data["result"]
+        return ([[float(p), float(q)] for p, q in r["b"]],
+                [[float(p), float(q)] for p, q in r["a"]])
+
+    async def stream_quotes(self, store, symbols, venue=None, poll_interval=1.0) -> None:
+        await streams.stream_bybit_book(store, symbols, venue=venue or self.id, url=self.WS_URL)
+
+    async def stream_depth(self, store, symbols, amount, venue=None) -> None:
+        await streams.stream_bybit_depth(store, symbols, amount, venue=venue or self.id, url=self.WS_URL)
+
+    async def create_order(self, symbol: str, side: str, amount: float,
+                           client_id: Optional[str] = None) -> dict:
+        if side == "buy":
+            return await self.client.create_market_buy_order(symbol, amount, client_id)
+        return await self.client.create_market_sell_order(symbol, amount, client_id)
+
+    async def fetch_order(self, symbol: str, client_id: str) -> Optional[dict]:
+        return await self.client.fetch_order(symbol, client_id)
+
+    async def fetch_balance(self) -> dict:
+        return await self.client.fetch_balance()
+
+
+# ─── ccxt (kraken, alpaca, …) ────────────────────────────────────────────────
+class CcxtAdapter(ExchangeAdapter):
+    """
+    Any ccxt exchange. REST calls run on `BLOCKING_POOL`; quotes stream
+    through ccxt.pro's `watch_ticker` when it supports the venue, else the
+    base class polls (batched when the venue has `fetchTickers`).
+    """
+
+    def __init__(self, client: Any):
+        super().__init__(client)
+        self.id = client.id
+        caps = Capability.ORDERS | Capability.BALANCES | Capability.BOOK_SNAPSHOT
+        if client.has.get("fetchTickers"):
+            caps |= Capability.BATCH_TICKERS
+        self._pro_cls = self._pro_class(client.id)
+        if self._pro_cls is not None:
+            caps |= Capability.STREAM_QUOTES
+        self.capabilities = caps
+
+    @staticmethod
+    def _pro_class(exchange_id: str) -> Optional[type]:
+        try:
+            import ccxt.pro as ccxtpro
+        except ImportError:
+            return None
+        return getattr(ccxtpro, exchange_id, None)
+
+    async def fetch_markets(self) -> List[MarketInfo]:
+        from ccxt.base.decimal_to_precision import TICK_SIZE
+        markets = await self._limited(Priority.MARKET_DATA, 1, self.client.load_markets)
+        ticks = getattr(self.client, "precisionMode", None) == TICK_SIZE
+
+        def step(p) -> float:
+            if p is None:
+                return 0.0
+            return float(p) if ticks else 10.0 ** -p
+
+        out = []
+        for symbol, m in markets.items():
+            if not m.get("spot", True) or m.get("active") is False or ":" in symbol:
+                continue
+            precision, limits = m.get("precision") or {}, m.get("limits") or {}
+            taker, maker = m.get("taker"), m.get("maker")
+            out.append(MarketInfo(symbol, m["base"], m["quote"],
+                                  step(precision.get("price")), step(precision.get("amount")),
+                                  (limits.get("amount") or {}).get("min") or 0.0,
+                                  (limits.get("cost") or {}).get("min") or 0.0,
+                                  DEFAULT_FEE_PCT if taker is None else taker * 100,
+                                  DEFAULT_FEE_PCT if maker is None else maker * 100))
+        return out
+
+    async def fetch_quote(self, symbol: str) -> Tuple[float, float]:
+        t = await self.fetch_ticker(symbol)
+        return t.get("bid") or t["last"], t.get("ask") or t["last"]
+
+    async def fetch_ticker(self, symbol: str) -> dict:
+        return await coalesce((self.id, "ticker", symbol), lambda: self._limited(
+            Priority.MARKET_DATA, 1, self.client.fetch_ticker, symbol))
+
+    async def fetch_tickers(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Tuple[float, float]]:
+        if not self.supports(Capability.BATCH_TICKERS):
+            return await super().fetch_tickers(symbols)
+        symbols = list(symbols) if symbols is not None else None
+        tickers = await self._limited(Priority.MARKET_DATA, 1, self.client.fetch_tickers, symbols)
+        return {s: (t["bid"], t["ask"]) for s, t in tickers.items() if t.get("bid") and t.get("ask")}
+
+    async def fetch_book(self, symbol: str, limit: int = 50) -> Tuple[List[Level], List[Level]]:
+        book = await self._limited(Priority.MARKET_DATA, 1, self.client.fetch_order_book, symbol, limit)
+        return book["bids"], book["asks"]
+
+    async def _watch(self, pro: Any, store, symbol: str, venue: str) -> None:
+        while True:
+            try:
+                t = await pro.watch_ticker(symbol)
+                if t.get("bid") and t.get("ask"):
+                    store.update(venue, symbol, t["bid"], t["ask"], t.get("last"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("[%s] %s watch error: %s", venue, symbol, exc)
+                await asyncio.sleep(STREAM_RETRY_DELAY)
+
+    async def stream_quotes(self, store, symbols, venue=None, poll_interval=1.0) -> None:
+        if self._pro_cls is None:
+            return await super().stream_quotes(store, symbols, venue, poll_interval)
+        venue = venue or self.id
+        pro = self._pro_cls({"apiKey": self.client.apiKey, "secret": self.client.secret,
+                             "urls": self.client.urls, "enableRateLimit": True})
+        try:
+            await asyncio.gather(*(self._watch(pro, store, s, venue) for s in symbols))
+        finally:
+            await pro.close()
+
+    async def create_order(self, symbol: str, side: str, amount: float,
+                           client_id: Optional[str] = None) -> dict:
+        params = {"clientOrderId": client_id} if client_id else {}
+        return await self._limited(Priority.ORDER, 1, self.client.create_order,
+                                   symbol, "market", side, amount, None, params)
+
+    async def fetch_balance(self) -> dict:
+        return await self._limited(Priority.BALANCE, 1, self.client.fetch_balance)
+
+
+# ─── Interactive Brokers ─────────────────────────────────────────────────────
+class IbkrAdapter(ExchangeAdapter):
+    """
+    ib_insync is natively async: quotes stream from market-data
+    subscriptions, orders and account data use its *Async calls.
+    Symbols map to `Crypto(base, "PAXOS", quote)` contracts. Top of book
+    only: no fetch_book / stream_depth (they raise `Unsupported`), so
+    `start_feeds` streams quotes from it even when a size is given.
+    """
+
+    id = "ibkr"
+    capabilities = Capability.STREAM_QUOTES | Capability.ORDERS | Capability.BALANCES
+    VENUE = "PAXOS"
+    ACK_TIMEOUT = 5.0
+
+    def __init__(self, client: Any):
+        super().__init__(client)
+        self._contracts: Dict[str, Any] = {}
+        cached = getattr(client, "_btc_contract", None)
+        if cached is not None:
+            self._contracts["BTC/USD"] = cached
+
+    def _contract(self, symbol: str) -> Any:
+        c = self._contracts.get(symbol)
+        if c is None:
+            from ib_insync import Crypto
+            base, quote = symbol.split("/")
+            c = self._contracts[symbol] = Crypto(base, self.VENUE, quote)
+        return c
+
+    async def fetch_quote(self, symbol: str) -> Tuple[float, float]:
+        [t] = await self.client.reqTickersAsync(self._contract(symbol))
+        price = t.marketPrice()
+        return (t.bid if t.bid == t.bid and t.bid > 0 else price,
+                t.ask if t.ask == t.ask and t.ask > 0 else price)
+
+    async def stream_quotes(self, store, symbols, venue=None, poll_interval=1.0) -> None:
+        venue = venue or self.id
+        by_contract = {}
+        for s in symbols:
+            c = self._contract(s)
+            self.client.reqMktData(c)
+            by_contract[id(c)] = s
+        try:
+            async for tickers in self.client.pendingTickersEvent:
+                for t in tickers:
+                    s = by_contract.get(id(t.contract))
+                    if s is not None and t.bid > 0 and t.ask > 0:
+                        store.update(venue, s, t.bid, t.ask, t.last if t.last == t.last else None)
+        finally:
+            for s in symbols:
+                self.client.cancelMktData(self._contract(s))
+
+    async def create_order(self, symbol: str, side: str, amount: float,
+                           client_id: Optional[str] = None) -> dict:
+        from ib_insync import MarketOrder
+        order = MarketOrder(side.upper(), amount, orderRef=client_id or "")
+        trade = self.client.placeOrder(self._contract(symbol), order)
+        deadline = asyncio.get_running_loop().time() + self.ACK_TIMEOUT
+        while trade.orderStatus.status in ("PendingSubmit", "ApiPending", ""):
+            if asyncio.get_running_loop().time() > deadline:
+                break
+            await asyncio.sleep(0.01)
+        return {"id": trade.order.orderId, "status": trade.orderStatus.status}
+
+    async def fetch_balance(self) -> dict:
+        free: Dict[str, float] = {}
+        for v in await self.client.accountSummaryAsync():
+            if v.tag == "TotalCashValue" and v.currency:
+                free[v.currency] = free.get(v.currency, 0.0) + float(v.value)
+        for p in self.client.positions():
+            if p.contract.secType == "CRYPTO":
+                free[p.contract.symbol] = free.get(p.contract.symbol, 0.0) + float(p.position)
+        return {"free": free, "total": dict(free)}
+
+
+# ─── Factories ───────────────────────────────────────────────────────────────
+def create_binance_adapter(cfg: dict) -> BinanceAdapter:
+    """Market data from the host the client signs against (the testnet with `sandbox`)."""
+    from exchanges.binance import create_binance_client
+    client = create_binance_client(cfg)
+    a = BinanceAdapter(client)
+    a.REST_URL = f"{client.base}/api/v3"
+    a.DEPTH_URL = f"{client.base}/api/v3/depth"
+    if cfg.get("sandbox", False):
+        a.WS_URL = streams.BINANCE_TESTNET_WS_URL
+    return a
+
+
+def create_bybit_adapter(cfg: dict) -> BybitAdapter:
+    from exchanges.bybit import create_bybit_client
+    return BybitAdapter(create_bybit_client(cfg))
+
+
+def create_kraken_adapter(cfg: dict) -> CcxtAdapter:
+    from exchanges.kraken import create_kraken_client
+    return CcxtAdapter(create_kraken_client(cfg))
+
+
+def create_alpaca_adapter(cfg: dict) -> CcxtAdapter:
+    from exchanges.alpaca import create_alpaca_client
+    return CcxtAdapter(create_alpaca_client(cfg))
+
+
+def create_ibkr_adapter(cfg: dict) -> IbkrAdapter:
+    from exchanges.ibkr import create_ibkr_client   # needs ib_insync
+    return IbkrAdapter(create_ibkr_client(cfg))
+
+
+ADAPTERS: Dict[str, Callable[[dict], ExchangeAdapter]] = {
+    "binance": create_binance_adapter,
+    "bybit":   create_bybit_adapter,
+    "kraken":  create_kraken_adapter,
+    "alpaca":  create_alpaca_adapter,
+    "ibkr":    create_ibkr_adapter,
+}
@@ -1,17 +1,103 @@
-import ccxt
+# exchanges/binance.py
 
-def create_binance_client(cfg: dict) -> ccxt.binance:
+import hmac
+import hashlib
+import time
+from typing import Optional
+from urllib.parse import urlencode
+
+from exchanges.clock import CLOCKS, VenueClock
+from exchanges.http import get_json, post_json
+from exchanges.markets import MARKETS, amount_str
+from exchanges.rate_limit import Priority
+
+BINANCE_URL = 'https://api.binance.com'
+BINANCE_TESTNET_URL = 'https://testnet.binance.vision'   # spot testnet, `sandbox: true`
+RECV_WINDOW = 5000
+ORDER_NOT_FOUND = -2013     # error code of GET /api/v3/order for an order Binance never took
+
+
+class AsyncBinanceRestClient:
     """
-    Create a Binance Spot client that:
-    - Only calls the public ticker endpoint
-    - Never loads markets or currencies (avoids margin/allPairs and exchangeInfo)
+    Signed Binance Spot calls over the shared aiohttp pool:
+      - create_order(symbol, type, side, amount, client_id) → ccxt-shaped order
+      - fetch_order(symbol, client_id) → the same shape, None if Binance has no such order
+      - fetch_balance() → ccxt-shaped {'free', 'used', 'total'}
+
+    Every request carries `timestamp` + `recvWindow` in its query and the
+    HMAC-SHA256 of that exact query as `signature`. Timestamps come from
+    `clock` (the exchange-corrected time) when given; that clock is then
+    sampled from `base`, the host that checks the signatures. Market data
+    does not go through here: `BinanceAdapter` reads it unsigned.
     """
-    exchange = ccxt.binance({
-        'apiKey':          cfg['apiKey'],
-        'secret':          cfg['secret'],
-        'enableRateLimit': True,
-    })
-    # Override methods that fetch markets or currencies
-    exchange.load_markets = lambda *args, **kwargs: {}
-    exchange.fetch_currencies = lambda *args, **kwargs: {}
-    return exchange
+    def __init__(self, apiKey: str, secret: str, base: str = BINANCE_URL,
+                 clock: Optional[VenueClock] = None):
+        self.apiKey = apiKey
+        self.secret = secret
+        self.base = base
+        self.clock = clock
+        if clock is not None:
+            clock.url = f'{base}/api/v3/time'
+
+    def _sign(self, params: dict) -> str:
+        now_ms = self.clock.now_ms() if self.clock is not None else time.time() * 1000
+        query = urlencode({**params, 'recvWindow': RECV_WINDOW, 'timestamp': int(now_ms)})
+        signature = hmac.new(self.secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+        return f'{query}&signature={signature}'
+
+    def _headers(self, form: bool = False) -> dict:
+        headers = {'X-MBX-APIKEY': self.apiKey}
+        if form:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        return headers
+
+    @staticmethod
+    def _parse_order(data: dict, symbol: str) -> dict:
+        filled = float(data['executedQty'])
+        return {'id': str(data['orderId']), 'symbol': symbol, 'side': data.get('side', '').lower(),
+                'type': data.get('type', '').lower(), 'amount': float(data.get('origQty') or filled),
+                'filled': filled, 'client_id': data.get('clientOrderId'),
+                'status': 'closed' if data.get('status') == 'FILLED' else data.get('status', '').lower(),
+                'average': float(data['cummulativeQuoteQty']) / filled if filled else None,
+                'info': data}
+
+    async def create_order(self, symbol: str, type: str, side: str, amount: float,
+                           client_id: Optional[str] = None) -> dict:
+        market = MARKETS.get('binance', symbol)
+        params = {
+            'symbol': symbol.replace('/', ''),
+            'side': side.upper(),
+            'type': type.upper(),
+            'quantity': amount_str(amount, market.step if market else 0.0),
+            'newOrderRespType': 'FULL',
+        }
+        if client_id:
+            params['newClientOrderId'] = client_id
+        data = await post_json(f'{self.base}/api/v3/order', self._sign(params),
+                               headers=self._headers(form=True))
+        order = self._parse_order(data, symbol)
+        order.update(side=side, type=type, amount=amount)
+        return order
+
+    async def fetch_order(self, symbol: str, client_id: str) -> Optional[dict]:
+        query = self._sign({'symbol': symbol.replace('/', ''), 'origClientOrderId': client_id})
+        data = await get_json(f'{self.base}/api/v3/order?{query}', headers=self._headers(),
+                              weight=4, priority=Priority.ORDER, allow=(400,))
+        if 'orderId' in data:
+            return self._parse_order(data, symbol)
+        if data.get('code') == ORDER_NOT_FOUND:
+            return None
+        raise Exception(f"Binance order query error: code={data.get('code')}, msg={data.get('msg')}")
+
+    async def fetch_balance(self) -> dict:
+        query = self._sign({'omitZeroBalances': 'true'})
+        data = await get_json(f'{self.base}/api/v3/account?{query}', headers=self._headers(),
+                              weight=20, priority=Priority.BALANCE)
+        free = {b['asset']: float(b['free']) for b in data['balances']}
+        used = {b['asset']: float(b['locked']) for b in data['balances']}
+        return {'free': free, 'used': used, 'total': {a: free[a] + used[a] for a in free}}
+
+
+def create_binance_client(cfg: dict) -> AsyncBinanceRestClient:
+    base = BINANCE_TESTNET_URL if cfg.get('sandbox', False) else BINANCE_URL
+    return AsyncBinanceRestClient(cfg['apiKey'], cfg['secret'], base=base, clock=CLOCKS.clock('binance'))
@@ -1,43 +1,80 @@
 # exchanges/bybit.py
 
+import json
 import time
 import hmac
 import hashlib
 import requests
+from typing import Optional
+from urllib.parse import urlencode
 
-class BybitRestClient:
+from exchanges.clock import CLOCKS, VenueClock
+from exchanges.http import get_json, post_json
+from exchanges.markets import MARKETS, amount_str
+from exchanges.rate_limit import Priority
+
+BYBIT_DEMO_URL = 'https://api-demo.bybit.com'
+ORDER_STATUS = {'New': 'open', 'PartiallyFilled': 'open', 'Untriggered': 'open',
+                'Filled': 'closed', 'Cancelled': 'canceled', 'PartiallyFilledCanceled': 'canceled',
+                'Rejected': 'rejected', 'Deactivated': 'canceled'}
+
+class _BybitRequests:
     """
-    Minimal Bybit Demo Trading client using direct HTTP.
-    Provides:
-      - fetch_ticker(symbol)
-      - load_markets() (no-op)
-      - create_market_buy_order(symbol, amount)
-      - create_market_sell_order(symbol, amount)
+    Request building, v5 signing and response parsing shared by the sync and
+    async clients. Request timestamps come from `clock` (the
+    exchange-corrected time) when given; that clock is then sampled from
+    `base`, the host that checks the signatures.
     """
-    def __init__(self, apiKey: str, secret: str):
+    def __init__(self, apiKey: str, secret: str, base: str = BYBIT_DEMO_URL,
+                 clock: Optional[VenueClock] = None):
         self.apiKey = apiKey
         self.secret = secret
-        self.base = 'https://api-demo.bybit.com'
+        self.base = base
+        self.clock = clock
+        if clock is not None:
+            clock.url = f'{base}/v5/market/time'
 
     def load_markets(self):
         # no-op so CCXT-style calls won't fail
         return {}
 
-    def fetch_ticker(self, symbol: str) -> dict:
+    def _ticker_request(self, symbol: str):
         pair = symbol.replace('/', '')
-        url = f'{self.base}/v5/market/tickers'
-        params = {'symbol': pair, 'category': 'spot'}
-        resp = requests.get(url, params=params, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
+        return f'{self.base}/v5/market/tickers', {'symbol': pair, 'category': 'spot'}
+
+    @staticmethod
+    def _parse_ticker(data: dict) -> dict:
         if int(data.get('retCode', -1)) != 0:
             raise Exception(f"Bybit ticker error retCode={data.get('retCode')}")
         price = float(data['result']['list'][0]['lastPrice'])
         return {'last': price}
 
-    def _sign(self, recvWindow: int = 5000) -> dict:
-        ts = str(int(time.time() * 1000))
-        payload = ts + self.apiKey + str(recvWindow)
+    def _balance_request(self):
+        # GET requests sign the exact query string
+        query = urlencode({'accountType': 'UNIFIED'})
+        return f'{self.base}/v5/account/wallet-balance?{query}', self._sign(body=query)
+
+    @staticmethod
+    def _parse_balance(data: dict) -> dict:
+        """CCXT-shaped {'free': {coin: x}, 'used': {...}, 'total': {...}}."""
+        if int(data.get('retCode', -1)) != 0:
+            raise Exception(f"Bybit balance error: retCode={data.get('retCode')}, msg={data.get('retMsg')}")
+        free, used, total = {}, {}, {}
+        for account in data['result']['list']:
+            for c in account.get('coin', ()):
+                wallet = float(c.get('walletBalance') or 0)
+                locked = float(c.get('locked') or 0)
+                coin = c['coin']
+                total[coin] = total.get(coin, 0.0) + wallet
+                used[coin] = used.get(coin, 0.0) + locked
+                free[coin] = free.get(coin, 0.0) + wallet - locked
+        return {'free': free, 'used': used, 'total': total}
+
+    def _sign(self, recvWindow: int = 5000, body: str = '') -> dict:
+        # v5 signs timestamp + apiKey + recvWindow + raw JSON body (POST)
+        now_ms = self.clock.now_ms() if self.clock is not None else time.time() * 1000
+        ts = str(int(now_ms))
+        payload = ts + self.apiKey + str(recvWindow) + body
         signature = hmac.new(self.secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
         return {'X-BAPI-API-KEY': self.apiKey,
                 'X-BAPI-TIMESTAMP': ts,
@@ -45,30 +82,126 @@ class BybitRestClient:
                 'X-BAPI-SIGN': signature,
                 'Content-Type': 'application/json'}
 
-    def create_market_buy_order(self, symbol: str, amount: float) -> dict:
-        return self._place_order(symbol, amount, 'Buy')
-
-    def create_market_sell_order(self, symbol: str, amount: float) -> dict:
-        return self._place_order(symbol, amount, 'Sell')
-
-    def _place_order(self, symbol: str, amount: float, side: str) -> dict:
+    def _order_request(self, symbol: str, amount: float, side: str, client_id: Optional[str] = None):
         pair = symbol.replace('/', '')
-        url = f'{self.base}/v5/order/create'
-        body = {
+        market = MARKETS.get('bybit', symbol)
+        order = {
             "category": "spot",
             "symbol": pair,
             "side": side,
             "orderType": "Market",
-            "qty": str(amount),
+            "qty": amount_str(amount, market.step if market else 0.0),
             "timeInForce": "GTC"
         }
-        headers = self._sign()
-        resp = requests.post(url, json=body, headers=headers, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
+        if client_id:
+            order["orderLinkId"] = client_id
+        body = json.dumps(order)
+        return f'{self.base}/v5/order/create', body, self._sign(body=body)
+
+    @staticmethod
+    def _parse_order(data: dict) -> dict:
         if int(data.get('retCode', -1)) != 0:
             raise Exception(f"Bybit order error: retCode={data.get('retCode')}, msg={data.get('retMsg')}")
         return data['result']
 
-def create_bybit_client(cfg: dict) -> BybitRestClient:
-    return BybitRestClient(cfg['apiKey'], cfg['secret'])
+    def _order_query(self, symbol: str, client_id: str):
+        # open and recently closed orders, looked up by our orderLinkId
+        query = urlencode({'category': 'spot', 'symbol': symbol.replace('/', ''), 'orderLinkId': client_id})
+        return f'{self.base}/v5/order/realtime?{query}', self._sign(body=query)
+
+    @staticmethod
+    def _parse_order_query(data: dict) -> Optional[dict]:
+        """ccxt-shaped order from an order/realtime reply; None if Bybit has no such order."""
+        if int(data.get('retCode', -1)) != 0:
+            raise Exception(f"Bybit order query error: retCode={data.get('retCode')}, msg={data.get('retMsg')}")
+        found = data['result'].get('list') or ()
+        if not found:
+            return None
+        o = found[0]
+        filled = float(o.get('cumExecQty') or 0)
+        status = o.get('orderStatus', '')
+        return {'id': o.get('orderId'), 'client_id': o.get('orderLinkId'), 'symbol': o.get('symbol'),
+                'side': o.get('side', '').lower(), 'amount': float(o.get('qty') or 0),
+                'filled': filled, 'average': float(o.get('avgPrice') or 0) or None,
+                'status': ORDER_STATUS.get(status, status.lower()), 'info': o}
+
+
+class BybitRestClient(_BybitRequests):
+    """
+    Minimal Bybit Demo Trading client using direct HTTP.
+    Provides:
+      - fetch_ticker(symbol)
+      - fetch_balance() (unified account, every coin in one call)
+      - load_markets() (no-op)
+      - create_market_buy_order(symbol, amount, client_id=None)
+      - create_market_sell_order(symbol, amount, client_id=None)
+      - fetch_order(symbol, client_id) (None if Bybit has no such order)
+
+    Calls go through one keep-alive `requests.Session`.
+    """
+    def __init__(self, apiKey: str, secret: str, base: str = BYBIT_DEMO_URL,
+                 clock: Optional[VenueClock] = None):
+        super().__init__(apiKey, secret, base, clock)
+        self.session = requests.Session()
+
+    def fetch_ticker(self, symbol: str) -> dict:
+        url, params = self._ticker_request(symbol)
+        resp = self.session.get(url, params=params, timeout=5)
+        resp.raise_for_status()
+        return self._parse_ticker(resp.json())
+
+    def fetch_balance(self) -> dict:
+        url, headers = self._balance_request()
+        resp = self.session.get(url, headers=headers, timeout=5)
+        resp.raise_for_status()
+        return self._parse_balance(resp.json())
+
+    def create_market_buy_order(self, symbol: str, amount: float, client_id: Optional[str] = None) -> dict:
+        return self._place_order(symbol, amount, 'Buy', client_id)
+
+    def create_market_sell_order(self, symbol: str, amount: float, client_id: Optional[str] = None) -> dict:
+        return self._place_order(symbol, amount, 'Sell', client_id)
+
+    def fetch_order(self, symbol: str, client_id: str) -> Optional[dict]:
+        url, headers = self._order_query(symbol, client_id)
+        resp = self.session.get(url, headers=headers, timeout=5)
+        resp.raise_for_status()
+        return self._parse_order_query(resp.json())
+
+    def _place_order(self, symbol: str, amount: float, side: str, client_id: Optional[str] = None) -> dict:
+        url, body, headers = self._order_request(symbol, amount, side, client_id)
+        resp = self.session.post(url, data=body, headers=headers, timeout=5)
+        resp.raise_for_status()
+        return self._parse_order(resp.json())
+
+
+class AsyncBybitRestClient(_BybitRequests):
+    """
+    Async variant of `BybitRestClient`: same methods, awaitable, sharing the
+    process-wide aiohttp keep-alive pool from `exchanges.http`.
+    """
+    async def fetch_ticker(self, symbol: str) -> dict:
+        url, params = self._ticker_request(symbol)
+        return self._parse_ticker(await get_json(url, params=params))
+
+    async def fetch_balance(self) -> dict:
+        url, headers = self._balance_request()
+        return self._parse_balance(await get_json(url, headers=headers, priority=Priority.BALANCE))
+
+    async def create_market_buy_order(self, symbol: str, amount: float, client_id: Optional[str] = None) -> dict:
+        return await self._place_order(symbol, amount, 'Buy', client_id)
+
+    async def create_market_sell_order(self, symbol: str, amount: float, client_id: Optional[str] = None) -> dict:
+        return await self._place_order(symbol, amount, 'Sell', client_id)
+
+    async def fetch_order(self, symbol: str, client_id: str) -> Optional[dict]:
+        url, headers = self._order_query(symbol, client_id)
+        return self._parse_order_query(await get_json(url, headers=headers, priority=Priority.ORDER))
+
+    async def _place_order(self, symbol: str, amount: float, side: str, client_id: Optional[str] = None) -> dict:
+        url, body, headers = self._order_request(symbol, amount, side, client_id)
+        return self._parse_order(await post_json(url, body, headers=headers))
+
+
+def create_bybit_client(cfg: dict) -> AsyncBybitRestClient:
+    return AsyncBybitRestClient(cfg['apiKey'], cfg['secret'], clock=CLOCKS.clock('bybit'))
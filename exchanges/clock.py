@@ -0,0 +1,119 @@
+# exchanges/clock.py
+"""
+Per-exchange clock offset / RTT estimation.
+
+A background task samples each venue's server-time endpoint. Every sample
+gives (NTP-style)
+
+    rtt    = t1 − t0
+    offset = server_time − (t0 + t1) / 2
+
+and the offset is taken from the lowest-RTT sample in a sliding window,
+since that one has the least asymmetric queuing in it. Signing uses
+`now_ms()` (local clock corrected into the exchange's), and quote freshness
+converts exchange timestamps back to local time with `to_local()`.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Tuple
+
+from exchanges.http import get_json
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WINDOW   = 8       # samples kept per venue
+SAMPLE_INTERVAL = 30.0    # seconds between refreshes
+BURST_SAMPLES   = 4       # quick samples on startup
+BURST_SPACING   = 0.25
+
+# exchange id → (server-time URL, response → server time in ms); the URL is
+# only the default – a client that signs against another host points its
+# `VenueClock.url` there, so the offset is measured where orders go
+SERVER_TIME: Dict[str, Tuple[str, Callable[[dict], float]]] = {
+    "binance": ("https://api.binance.com/api/v3/time",
+                lambda d: float(d["serverTime"])),
+    "bybit":   ("https://api-demo.bybit.com/v5/market/time",
+                lambda d: int(d["result"]["timeNano"]) / 1e6),
+}
+
+
+class VenueClock:
+    """Offset of one exchange's clock relative to ours, in milliseconds."""
+    __slots__ = ("venue", "url", "samples", "offset_ms", "rtt_ms", "updated")
+
+    def __init__(self, venue: str, window: int = SAMPLE_WINDOW):
+        self.venue = venue
+        self.url = SERVER_TIME[venue][0] if venue in SERVER_TIME else ""   # sampled endpoint
+        self.samples: Deque[Tuple[float, float]] = deque(maxlen=window)   # (rtt, offset)
+        self.offset_ms = 0.0
+        self.rtt_ms = 0.0
+        self.updated = 0.0
+
+    def add_sample(self, t0_ms: float, server_ms: float, t1_ms: float) -> None:
+        rtt = t1_ms - t0_ms
+        self.samples.append((rtt, server_ms - (t0_ms + t1_ms) / 2))
+        self.rtt_ms, self.offset_ms = min(self.samples)
+        self.updated = time.time()
+
+    def now_ms(self) -> float:
+        """Current time on the exchange's clock."""
+        return time.time() * 1000 + self.offset_ms
+
+    def to_local(self, exch_ms: float) -> float:
+        """Exchange timestamp (ms) → local epoch seconds."""
+        return (exch_ms - self.offset_ms) / 1000
+
+
+class ClockService:
+    """Keeps a `VenueClock` per exchange fresh in the background."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, window: int = SAMPLE_WINDOW):
+        self.interval = interval
+        self.window = window
+        self.clocks: Dict[str, VenueClock] = {}
+
+    def clock(self, venue: str) -> VenueClock:
+        c = self.clocks.get(venue)
+        if c is None:
+            c = self.clocks[venue] = VenueClock(venue, self.window)
+        return c
+
+    def to_local(self, venue: str, exch_ms: float) -> float:
+        c = self.clocks.get(venue)
+        return exch_ms / 1000 if c is None else c.to_local(exch_ms)
+
+    async def sample(self, venue: str) -> None:
+        parse = SERVER_TIME[venue][1]
+        c = self.clock(venue)
+        t0 = time.time() * 1000
+        data = await get_json(c.url)
+        t1 = time.time() * 1000
+        c.add_sample(t0, parse(data), t1)
+
+    async def _sample_logged(self, venue: str) -> None:
+        try:
+            await self.sample(venue)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("[%s] server-time sample failed: %s", venue, exc)
+
+    async def run(self, venues: Iterable[str]) -> None:
+        """Sample every known venue in `venues` forever."""
+        venues = [v for v in venues if v in SERVER_TIME]
+        for _ in range(BURST_SAMPLES):
+            await asyncio.gather(*(self._sample_logged(v) for v in venues))
+            await asyncio.sleep(BURST_SPACING)
+        for v in venues:
+            c = self.clock(v)
+            logger.info("[%s] clock offset %+.1f ms (rtt %.1f ms)", v, c.offset_ms, c.rtt_ms)
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.gather(*(self._sample_logged(v) for v in venues))
+
+
+# process-wide service shared by signing and the spread loop
+CLOCKS = ClockService()
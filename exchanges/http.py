@@ -0,0 +1,138 @@
+# exchanges/http.py
+"""
+Shared async HTTP transport.
+
+One process-wide `aiohttp.ClientSession` with a keep-alive connection pool,
+so REST quotes and orders reuse warm TCP+TLS connections instead of opening
+a new one per call, and never wait on a thread-pool slot.
+
+Every call first takes its weight from the venue's bucket in
+`exchanges.rate_limit` (picked by host), at the caller's priority – once,
+before any attempt, so the wait for tokens is not charged to the deadline
+and a hedge or retry does not take the weight again. Unsigned GETs that are
+already in flight are shared rather than sent twice. The round trips then
+run under `exchanges.resilience`: a deadline for the whole call, hedged
+duplicates for slow public GETs, jittered retries for GETs and a circuit
+breaker per endpoint; its latency samples (the hedge delay) are pure HTTP
+time. Bodies are decoded with `exchanges.parsing.loads`.
+
+An order POST that times out or loses its connection mid-reply raises
+`OutcomeUnknown`, not a plain failure: the venue may have executed it, so
+the caller has to look the order up before treating it as not filled.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from config.settings import REQUEST_TIMEOUT
+from exchanges import resilience
+from exchanges.parsing import loads
+from exchanges.rate_limit import Priority, acquire, coalesce, venue_of
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE          = 100     # total open connections
+POOL_SIZE_PER_HOST = 20
+KEEPALIVE_TIMEOUT  = 60      # seconds an idle connection is kept warm
+DNS_CACHE_TTL      = 300
+CALL_TIMEOUT       = 5       # seconds, matches the old requests timeout
+MARKET_DATA_DEADLINE = 2.0   # seconds for a public GET, retries and hedges included
+MARKET_DATA_BACKOFF  = 0.05  # seconds, first retry pause of a public GET (quotes age fast)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+class OutcomeUnknown(Exception):
+    """A non-idempotent request may have reached the venue, but no reply came back."""
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the shared session, creating it on first use (inside a loop)."""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=POOL_SIZE,
+            limit_per_host=POOL_SIZE_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=CALL_TIMEOUT),
+        )
+    return _session
+
+
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def get_json(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    weight: float = 1.0,
+    priority: Priority = Priority.MARKET_DATA,
+    hedge: bool = True,
+    allow: Tuple[int, ...] = (),
+) -> Any:
+    """
+    GET `url` on the shared pool and decode the JSON body. `timeout` is the
+    deadline for the whole call (default MARKET_DATA_DEADLINE, or
+    REQUEST_TIMEOUT when signed); signed and `hedge=False` calls are never
+    duplicated. Statuses in `allow` are returned like a 200, for venues that
+    give the reason for a 4xx in its body.
+    """
+    signed = headers is not None
+
+    async def attempt(left: float) -> Any:
+        async with get_session().get(url, params=params, headers=headers,
+                                     timeout=aiohttp.ClientTimeout(total=left)) as resp:
+            if resp.status not in allow:
+                resp.raise_for_status()
+            return loads(await resp.read())
+
+    async def fetch() -> Any:
+        await acquire(venue_of(url), weight, priority)
+        deadline = timeout or (REQUEST_TIMEOUT if signed else MARKET_DATA_DEADLINE)
+        if signed:
+            return await resilience.call(resilience.endpoint(url), attempt, deadline, hedge=False)
+        return await resilience.call(resilience.endpoint(url), attempt, deadline, hedge=hedge,
+                                     backoff=MARKET_DATA_BACKOFF)
+
+    if signed:                       # never shared
+        return await fetch()
+    return await coalesce((url, tuple(sorted((params or {}).items()))), fetch)
+
+
+async def post_json(
+    url: str,
+    data: str,
+    headers: Optional[Dict[str, str]] = None,
+    weight: float = 1.0,
+    priority: Priority = Priority.ORDER,
+) -> Any:
+    """
+    POST a pre-serialised JSON `data` string once, within REQUEST_TIMEOUT, and
+    decode the reply. Raises `OutcomeUnknown` when the request went out but
+    its reply never arrived (timeout, connection dropped mid-reply).
+    """
+    async def attempt(left: float) -> Any:
+        async with get_session().post(url, data=data, headers=headers,
+                                      timeout=aiohttp.ClientTimeout(total=left)) as resp:
+            resp.raise_for_status()
+            return loads(await resp.read())
+
+    await acquire(venue_of(url), weight, priority)
+    try:
+        return await resilience.call(resilience.endpoint(url), attempt, REQUEST_TIMEOUT,
+                                     idempotent=False)
+    except (asyncio.TimeoutError, aiohttp.ServerDisconnectedError, aiohttp.ClientPayloadError) as exc:
+        raise OutcomeUnknown(f"no reply from {resilience.endpoint(url)}: {exc!r}") from exc
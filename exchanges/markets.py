@@ -0,0 +1,230 @@
+# exchanges/markets.py
+"""
+Market metadata cache.
+
+Per venue and symbol: base / quote asset, price tick, amount step, minimum
+amount, minimum notional and fees. Everything lives in memory as
+`MarketInfo` objects keyed by (venue, symbol) and is persisted to
+
+    data/processed/markets.json
+
+so start-up only reads a local file. Venues whose entry is missing or older
+than the TTL are re-fetched by `MarketCache.run` in the background, through
+each adapter's `fetch_markets()`; the order path only ever does dict lookups.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_DIR = Path(__file__).parent.parent / "data" / "processed"
+CACHE_PATH    = PROCESSED_DIR / "markets.json"
+
+MARKET_CACHE_TTL = 6 * 3600.0   # seconds before a venue's metadata is re-fetched
+REFRESH_CHECK    = 300.0        # seconds between staleness checks / failed-fetch retries
+DEFAULT_FEE_PCT  = 0.10         # taker / maker %, when the venue's listing has no fees
+
+
+class MarketInfo:
+    """Trading rules for one (venue, symbol); sizes in base, notional in quote."""
+    __slots__ = ("symbol", "base", "quote", "tick", "step", "min_amount",
+                 "min_notional", "taker", "maker", "_decimals")
+
+    def __init__(self, symbol: str, base: str, quote: str, tick: float = 0.0, step: float = 0.0,
+                 min_amount: float = 0.0, min_notional: float = 0.0,
+                 taker: float = DEFAULT_FEE_PCT, maker: float = DEFAULT_FEE_PCT):
+        self.symbol       = symbol
+        self.base         = base
+        self.quote        = quote
+        self.tick         = tick
+        self.step         = step
+        self.min_amount   = min_amount
+        self.min_notional = min_notional
+        self.taker        = taker     # %
+        self.maker        = maker     # %
+        self._decimals    = _decimals(step)
+
+    def __repr__(self) -> str:
+        return (f"MarketInfo({self.symbol} tick={self.tick} step={self.step} "
+                f"min={self.min_amount} min_notional={self.min_notional})")
+
+    def round_amount(self, amount: float) -> float:
+        """Floor `amount` to the step (exact decimal, so it prints cleanly)."""
+        if self.step <= 0:
+            return amount
+        return round(math.floor(amount / self.step + 1e-9) * self.step, self._decimals)
+
+    def round_price(self, price: float) -> float:
+        if self.tick <= 0:
+            return price
+        return round(round(price / self.tick) * self.tick, _decimals(self.tick))
+
+    def accepts(self, amount: float, price: Optional[float] = None) -> bool:
+        """True if `amount` (at `price`, when known) clears both minimums."""
+        if amount <= 0 or amount < self.min_amount:
+            return False
+        return price is None or amount * price >= self.min_notional
+
+    def to_row(self) -> list:
+        return [self.base, self.quote, self.tick, self.step, self.min_amount,
+                self.min_notional, self.taker, self.maker]
+
+    @classmethod
+    def from_row(cls, symbol: str, row: list) -> "MarketInfo":
+        return cls(symbol, *row)
+
+
+def _decimals(step: float) -> int:
+    """Decimal places of a step like 0.001 → 3 (capped at 12)."""
+    if step <= 0 or step >= 1:
+        return 0
+    return min(12, max(0, -math.floor(math.log10(step) + 1e-9)))
+
+
+def amount_str(amount: float, step: float = 0.0) -> str:
+    """Order size as a plain decimal ('0.00001', never '1e-05'), to the step's places when known."""
+    s = f"{amount:.{_decimals(step) if step > 0 else 8}f}"
+    return s.rstrip("0").rstrip(".") if "." in s else s
+
+
+class MarketCache:
+    """
+    In-memory `MarketInfo` per venue, loaded from / saved to `path`.
+    `get` and `size` are the order-path lookups; `run` keeps it fresh.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, ttl: float = MARKET_CACHE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.venues: Dict[str, Dict[str, MarketInfo]] = {}
+        self.fetched: Dict[str, float] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._ids: Dict[str, Tuple[Dict[str, MarketInfo], Dict[str, str]]] = {}
+
+    # ─── Lookups ─────────────────────────────────────────────────────────────
+    def get(self, venue: str, symbol: str) -> Optional[MarketInfo]:
+        return self.venues.get(venue, {}).get(symbol)
+
+    def markets(self, venue: str) -> Dict[str, MarketInfo]:
+        return self.venues.get(venue, {})
+
+    def symbols(self, venue: str) -> List[str]:
+        return sorted(self.venues.get(venue, ()))
+
+    def unified(self, venue: str) -> Dict[str, str]:
+        """
+        Exchange id → unified symbol ("BTCUSDT" → "BTC/USDT") for `venue`,
+        from each cached market's own base and quote; empty while the venue
+        has no cached markets. Rebuilt only when its listing is replaced.
+        """
+        markets = self.venues.get(venue)
+        if not markets:
+            return {}
+        cached = self._ids.get(venue)
+        if cached is None or cached[0] is not markets:
+            cached = self._ids[venue] = (markets, {m.base + m.quote: s for s, m in markets.items()})
+        return cached[1]
+
+    def taker_fee(self, venue: str, symbol: Optional[str] = None) -> Optional[float]:
+        """Taker fee % for `symbol`, or the venue's most common one."""
+        markets = self.venues.get(venue)
+        if not markets:
+            return None
+        if symbol is not None and symbol in markets:
+            return markets[symbol].taker
+        fees = [m.taker for m in markets.values()]
+        return max(set(fees), key=fees.count)
+
+    def size(self, symbol: str, venues: Iterable[str], amount: float,
+             price: Optional[float] = None) -> float:
+        """
+        `amount` floored so every venue in `venues` accepts it as-is (the
+        coarsest step wins); 0.0 if it falls below any venue's minimums.
+        Venues without metadata are passed through unchanged.
+        """
+        for venue in venues:
+            m = self.get(venue, symbol)
+            if m is None:
+                continue
+            amount = m.round_amount(amount)
+            if not m.accepts(amount, price):
+                return 0.0
+        return amount
+
+    # ─── Staleness ───────────────────────────────────────────────────────────
+    def age(self, venue: str) -> float:
+        return time.time() - self.fetched.get(venue, 0.0)
+
+    def stale(self, venues: Iterable[str]) -> List[str]:
+        return [v for v in venues if v not in self.venues or self.age(v) > self.ttl]
+
+    # ─── Persistence ─────────────────────────────────────────────────────────
+    def load(self) -> "MarketCache":
+        """Read the cache file (missing or unreadable → empty cache)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as exc:
+            logger.warning("market cache %s unreadable: %s", self.path, exc)
+            return self
+        for venue, entry in raw.items():
+            self.venues[venue] = {s: MarketInfo.from_row(s, row)
+                                  for s, row in entry["markets"].items()}
+            self.fetched[venue] = entry["fetched"]
+        return self
+
+    def save(self) -> None:
+        """Write atomically (temp file + rename) so readers never see half a file."""
+        data = {v: {"fetched": self.fetched.get(v, 0.0),
+                    "markets": {s: m.to_row() for s, m in markets.items()}}
+                for v, markets in self.venues.items()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    # ─── Refresh ─────────────────────────────────────────────────────────────
+    async def refresh(self, venue: str, client: Any) -> bool:
+        """Fetch `venue`'s listing via `client.fetch_markets()` and persist it."""
+        try:
+            markets = await client.fetch_markets()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("[%s] market metadata refresh failed: %s", venue, exc)
+            return False
+        if not markets:
+            return False
+        self.venues[venue] = {m.symbol: m for m in markets}
+        self.fetched[venue] = time.time()
+        await asyncio.get_running_loop().run_in_executor(None, self.save)
+        logger.info("[%s] market metadata refreshed: %d symbols", venue, len(markets))
+        return True
+
+    def refresh_soon(self, venue: str, client: Any) -> asyncio.Task:
+        """Start a background refresh of `venue` unless one is running."""
+        task = self._refreshing.get(venue)
+        if task is None or task.done():
+            task = self._refreshing[venue] = asyncio.ensure_future(self.refresh(venue, client))
+        return task
+
+    async def run(self, clients: Dict[str, Any], interval: float = REFRESH_CHECK) -> None:
+        """Re-fetch every stale venue now, then re-check every *interval* seconds."""
+        while True:
+            stale = self.stale(clients)
+            if stale:
+                await asyncio.gather(*(self.refresh_soon(v, clients[v]) for v in stale))
+            await asyncio.sleep(interval)
+
+
+MARKETS = MarketCache()
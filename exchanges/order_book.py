@@ -0,0 +1,104 @@
+# exchanges/order_book.py
+"""
+Local L2 order book.
+
+Each side is a pair of parallel `array('d')` buffers (price key, quantity)
+kept sorted ascending with the best level at the *end*, so the busy top of
+book is touched with the shortest memmove and walking the book for a fill
+estimate reads contiguous memory. Asks are stored under a negated price key.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Optional, Sequence
+
+Levels = Iterable[Sequence]   # [[price, qty], ...] – strings or floats
+
+
+class OrderBook:
+    """
+    Snapshot + incremental diffs (qty 0 deletes a level) and volume-weighted
+    executable prices for a target size.
+    """
+    __slots__ = ("bid_px", "bid_qty", "ask_px", "ask_qty", "max_depth")
+
+    def __init__(self, max_depth: int = 1000):
+        self.bid_px  = array("d")
+        self.bid_qty = array("d")
+        self.ask_px  = array("d")     # negated prices
+        self.ask_qty = array("d")
+        self.max_depth = max_depth
+
+    # ── updates ──────────────────────────────────────────────────────────────
+    @staticmethod
+    def _set(px: array, qty: array, key: float, q: float) -> None:
+        i = bisect_left(px, key)
+        if i < len(px) and px[i] == key:
+            if q:
+                qty[i] = q
+            else:
+                del px[i]
+                del qty[i]
+        elif q:
+            px.insert(i, key)
+            qty.insert(i, q)
+
+    def _trim(self) -> None:
+        # worst levels sit at the front; drop them in one slice when over budget
+        limit = self.max_depth
+        for px, qty in ((self.bid_px, self.bid_qty), (self.ask_px, self.ask_qty)):
+            extra = len(px) - limit
+            if extra > limit // 4:
+                del px[:extra]
+                del qty[:extra]
+
+    def apply_snapshot(self, bids: Levels, asks: Levels) -> None:
+        bl = sorted((float(p), float(q)) for p, q in bids)
+        al = sorted((-float(p), float(q)) for p, q in asks)
+        self.bid_px  = array("d", (p for p, q in bl if q))
+        self.bid_qty = array("d", (q for p, q in bl if q))
+        self.ask_px  = array("d", (p for p, q in al if q))
+        self.ask_qty = array("d", (q for p, q in al if q))
+        self._trim()
+
+    def apply_diff(self, bids: Levels, asks: Levels) -> None:
+        set_level = self._set
+        bp, bq = self.bid_px, self.bid_qty
+        for p, q in bids:
+            set_level(bp, bq, float(p), float(q))
+        ap, aq = self.ask_px, self.ask_qty
+        for p, q in asks:
+            set_level(ap, aq, -float(p), float(q))
+        self._trim()
+
+    # ── reads ────────────────────────────────────────────────────────────────
+    def best_bid(self) -> Optional[float]:
+        return self.bid_px[-1] if self.bid_px else None
+
+    def best_ask(self) -> Optional[float]:
+        return -self.ask_px[-1] if self.ask_px else None
+
+    @staticmethod
+    def _walk(px: array, qty: array, amount: float, sign: float) -> Optional[float]:
+        left, cost = amount, 0.0
+        i = len(px) - 1
+        while i >= 0:
+            q = qty[i]
+            if q >= left:
+                cost += left * px[i]
+                return sign * cost / amount
+            cost += q * px[i]
+            left -= q
+            i -= 1
+        return None
+
+    def vwap_buy(self, amount: float) -> Optional[float]:
+        """Average price to buy `amount` with a market order; None if too thin."""
+        return self._walk(self.ask_px, self.ask_qty, amount, -1.0)
+
+    def vwap_sell(self, amount: float) -> Optional[float]:
+        """Average price to sell `amount` with a market order; None if too thin."""
+        return self._walk(self.bid_px, self.bid_qty, amount, 1.0)
+
+    def __len__(self) -> int:
+        return len(self.bid_px) + len(self.ask_px)
@@ -0,0 +1,102 @@
+# exchanges/parsing.py
+"""
+Hot-path message parsing.
+
+• `loads` – orjson when installed (≈2× the stdlib on exchange payloads),
+  else `json.loads`; accepts str or bytes
+• top-of-book frames are not decoded into dicts at all: one precompiled
+  regex pulls out just symbol / bid / ask (/ ts) and the numbers are
+  written into a reusable `BookTick`. A frame the pattern does not match
+  (field order changed, unusual payload) falls back to a full decode, so
+  the fast path can never drop a valid update.
+
+Each stream connection owns one `BookTick` and overwrites it per message;
+callers copy the fields out (into the `QuoteStore`) before the next one.
+"""
+
+import json
+import re
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+    loads: Callable[[Any], Any] = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:              # pragma: no cover - optional speed-up
+    loads = json.loads
+    JSON_BACKEND = "json"
+
+# {"stream":"btcusdt@bookTicker","data":{"u":1,"s":"BTCUSDT","b":"1.0","B":"2","a":"1.1","A":"3"}}
+_BINANCE_BOOK = re.compile(r'"s":"([^"]+)","b":"([^"]+)","B":"[^"]*","a":"([^"]+)"')
+
+# {"topic":"orderbook.1.BTCUSDT","type":"delta","ts":1,"data":{"s":"BTCUSDT","b":[["1.0","2"]],"a":[],...}}
+# level-1 deltas may leave a side empty, or remove its level (size "0")
+_BYBIT_BOOK = re.compile(
+    r'"ts":(\d+),"data":\{"s":"([^"]+)","b":\[(?:\["([^"]+)","([^"]+)")?[^\]]*\]*,'
+    r'"a":\[(?:\["([^"]+)","([^"]+)")?'
+)
+
+
+class BookTick:
+    """Reusable parse target; a side the frame left out is 0.0."""
+    __slots__ = ("symbol", "bid", "ask", "ts")
+
+    def __init__(self):
+        self.symbol = ""
+        self.bid = 0.0
+        self.ask = 0.0
+        self.ts = 0.0        # exchange time in ms, 0.0 if the frame has none
+
+    def __repr__(self) -> str:
+        return f"BookTick({self.symbol} bid={self.bid} ask={self.ask} ts={self.ts})"
+
+
+def parse_binance_book(raw: str, out: BookTick) -> bool:
+    """Binance `<pair>@bookTicker` frame → `out`; False if it is not one."""
+    m = _BINANCE_BOOK.search(raw)
+    if m is not None:
+        out.symbol, bid, ask = m.groups()
+        out.bid = float(bid)
+        out.ask = float(ask)
+        out.ts = 0.0
+        return True
+    d = loads(raw).get("data")
+    if not d or "b" not in d or "a" not in d:
+        return False
+    out.symbol = d.get("s", "")
+    out.bid = float(d["b"])
+    out.ask = float(d["a"])
+    out.ts = float(d.get("E", 0.0))
+    return True
+
+
+def _level(price: Optional[str], qty: Optional[str]) -> float:
+    """Price of a book level; 0.0 (side left out) if it is absent or removed (size 0)."""
+    return float(price) if price and float(qty) else 0.0
+
+
+def parse_bybit_book(raw: str, out: BookTick) -> bool:
+    """Bybit `orderbook.1.<pair>` frame → `out`; False for acks / pongs."""
+    m = _BYBIT_BOOK.search(raw)
+    if m is not None:
+        ts, out.symbol, bid, bid_qty, ask, ask_qty = m.groups()
+        out.bid = _level(bid, bid_qty)
+        out.ask = _level(ask, ask_qty)
+        out.ts = float(ts)
+        return True
+    frame = loads(raw)
+    d = frame.get("data")
+    if not d or "s" not in d:
+        return False
+    out.symbol = d["s"]
+    out.bid = _level(*d["b"][0]) if d.get("b") else 0.0
+    out.ask = _level(*d["a"][0]) if d.get("a") else 0.0
+    out.ts = float(frame.get("ts", 0.0))
+    return True
+
+
+def control_error(raw: str) -> Optional[str]:
+    """`ret_msg` of a failed subscribe ack, else None."""
+    if '"success":false' not in raw:
+        return None
+    return loads(raw).get("ret_msg", "")
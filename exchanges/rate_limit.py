@@ -0,0 +1,213 @@
+# exchanges/rate_limit.py
+"""
+Per-venue request scheduler.
+
+Every outbound REST call takes `weight` tokens from its venue's bucket
+(refilled at `rate` tokens/s up to `burst`) before it is sent. Callers that
+cannot be served at once queue by priority:
+
+    ORDER        – order placement / cancels, always first
+    MARKET_DATA  – tickers, books, listings, server time
+    BALANCE      – account / balance refreshes
+
+Lower classes also leave a slice of the bucket untouched (`HEADROOM`), so
+market-data polling can never spend the tokens an order needs next. A
+weight larger than its class can ever hold (a 50-weight depth snapshot
+against the small DEFAULT_LIMIT of an unmapped host) is capped to that
+maximum: it waits for a full allowance instead of queueing forever.
+
+Identical unsigned GETs that are already in flight are coalesced: later
+callers await the first request's result instead of sending their own.
+
+Wait times go to `utils.latency` as `ratelimit_wait.<venue>.<class>`;
+queue depths, tokens left and coalesced hits are in `stats()`.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from utils import latency
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    ORDER       = 0
+    MARKET_DATA = 1
+    BALANCE     = 2
+
+
+# fraction of `burst` each class must leave in the bucket
+HEADROOM = {Priority.ORDER: 0.0, Priority.MARKET_DATA: 0.10, Priority.BALANCE: 0.20}
+
+# venue → (tokens/s, burst); ~80 % of the published limits
+#   binance: 6000 request weight / min / IP      bybit: 600 requests / 5 s / IP
+VENUE_LIMITS: Dict[str, Tuple[float, float]] = {
+    "binance": (80.0, 1000.0),
+    "bybit":   (80.0, 400.0),
+}
+DEFAULT_LIMIT = (10.0, 20.0)
+
+# REST host → venue bucket it draws from
+HOSTS: Dict[str, str] = {
+    "api.binance.com":       "binance",
+    "api-testnet.bybit.com": "bybit",
+    "api-demo.bybit.com":    "bybit",
+    "api.bybit.com":         "bybit",
+    "testnet.binance.vision": "binance",
+}
+
+STATS_REPORT_INTERVAL = 60.0   # seconds
+
+
+class RateLimiter:
+    """Weighted token bucket with a priority queue of waiters."""
+
+    def __init__(self, venue: str, rate: float, burst: float):
+        self.venue = venue
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+        self._queue: List[Tuple[int, int, float, asyncio.Future]] = []   # (priority, seq, weight, fut)
+        self._seq = 0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self.granted = 0
+        self.max_queued = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def _fits(self, priority: int, weight: float) -> bool:
+        return self.tokens - weight >= HEADROOM[priority] * self.burst
+
+    def capacity(self, priority: Priority) -> float:
+        """Most tokens one call at `priority` can ever be granted."""
+        return self.burst * (1.0 - HEADROOM[priority])
+
+    async def acquire(self, weight: float = 1.0, priority: Priority = Priority.MARKET_DATA) -> None:
+        """Wait until `weight` tokens (at most `capacity(priority)`) can be spent at `priority`."""
+        cap = self.capacity(priority)
+        if weight > cap:
+            logger.debug("[%s] weight %.0f capped to %.0f at %s", self.venue, weight, cap, priority.name)
+            weight = cap
+        self._refill()
+        # fast path: nothing queued ahead of us (or only lower classes) and room left
+        if (not self._queue or self._queue[0][0] > priority) and self._fits(priority, weight):
+            self.tokens -= weight
+            self.granted += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heapq.heappush(self._queue, (int(priority), self._seq, weight, fut))
+        self.max_queued = max(self.max_queued, len(self._queue))
+        t0 = latency.now_ns()
+        self._drain()
+        try:
+            await fut
+        finally:
+            latency.record(f"ratelimit_wait.{self.venue}.{priority.name.lower()}",
+                           latency.now_ns() - t0)
+
+    def _drain(self) -> None:
+        """Grant queued waiters in priority order while the bucket allows."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        self._refill()
+        q = self._queue
+        while q:
+            priority, _, weight, fut = q[0]
+            if fut.done():                       # cancelled while waiting
+                heapq.heappop(q)
+                continue
+            if not self._fits(priority, weight):
+                break
+            heapq.heappop(q)
+            self.tokens -= weight
+            self.granted += 1
+            fut.set_result(None)
+        if q:
+            priority, _, weight, _ = q[0]
+            need = weight + HEADROOM[priority] * self.burst - self.tokens
+            self._wakeup = asyncio.get_running_loop().call_later(
+                max(need / self.rate, 0.001), self._drain)
+
+    def queued(self) -> Dict[str, int]:
+        out = {p.name.lower(): 0 for p in Priority}
+        for priority, _, _, fut in self._queue:
+            if not fut.done():
+                out[Priority(priority).name.lower()] += 1
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {"tokens": round(self.tokens, 1), "queued": self.queued(),
+                "max_queued": self.max_queued, "granted": self.granted}
+
+
+LIMITERS: Dict[str, RateLimiter] = {}
+
+
+def limiter(venue: str) -> RateLimiter:
+    lim = LIMITERS.get(venue)
+    if lim is None:
+        rate, burst = VENUE_LIMITS.get(venue, DEFAULT_LIMIT)
+        lim = LIMITERS[venue] = RateLimiter(venue, rate, burst)
+    return lim
+
+
+def venue_of(url: str) -> str:
+    """Bucket name for a REST URL (its host when the venue is unknown)."""
+    host = urlsplit(url).hostname or ""
+    return HOSTS.get(host, host)
+
+
+async def acquire(venue: str, weight: float = 1.0,
+                  priority: Priority = Priority.MARKET_DATA) -> None:
+    await limiter(venue).acquire(weight, priority)
+
+
+# ─── Coalescing ──────────────────────────────────────────────────────────────
+_inflight: Dict[Hashable, asyncio.Future] = {}
+coalesced = 0
+
+
+async def coalesce(key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Run `fetch()` once per `key` at a time; concurrent callers share its result."""
+    global coalesced
+    fut = _inflight.get(key)
+    if fut is not None:
+        coalesced += 1
+        return await asyncio.shield(fut)
+    fut = _inflight[key] = asyncio.ensure_future(fetch())
+
+    def done(f: asyncio.Future) -> None:
+        _inflight.pop(key, None)
+        if not f.cancelled():
+            f.exception()        # retrieved, even if every caller went away
+    fut.add_done_callback(done)
+    return await asyncio.shield(fut)
+
+
+# ─── Metrics ─────────────────────────────────────────────────────────────────
+def stats() -> Dict[str, Any]:
+    return {"coalesced": coalesced, "inflight": len(_inflight),
+            "venues": {v: lim.stats() for v, lim in LIMITERS.items()}}
+
+
+async def report(interval: float = STATS_REPORT_INTERVAL) -> None:
+    """Log every bucket's queue depth and tokens every *interval* seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        for venue, s in sorted(stats()["venues"].items()):
+            logger.info("ratelimit %-10s tokens=%-7.1f queued=%s max_queued=%d granted=%d",
+                        venue, s["tokens"], s["queued"], s["max_queued"], s["granted"])
+        logger.info("ratelimit coalesced=%d inflight=%d", coalesced, len(_inflight))
@@ -0,0 +1,230 @@
+# exchanges/resilience.py
+"""
+Deadline-bound REST calls with hedging, retries and circuit breakers.
+
+`call(endpoint, attempt, deadline, ...)` runs `attempt(timeout)` – one HTTP
+round trip – under these rules:
+
+• deadline  – the whole call, retries and hedges included, ends after
+  `deadline` seconds; each attempt only gets what is left
+• hedging   – idempotent calls that are still pending after the endpoint's
+  recent p95 latency get a duplicate; the first good reply wins and the
+  loser is cancelled
+• retries   – transport errors, 5xx and 429 are retried up to MAX_RETRIES
+  times with full-jitter backoff (`backoff` · 2ⁿ, RETRY_DELAY by default),
+  if the deadline allows
+• breakers  – one per endpoint (host + path); after BREAKER_THRESHOLD
+  failures in a row it fails fast with `CircuitOpen` for BREAKER_COOLDOWN
+  seconds, then lets a single trial call through
+
+So a venue that stalls or errors costs its callers at most their deadline,
+then nothing at all, and never holds up quotes from the others.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config.settings import MAX_RETRIES, RETRY_DELAY
+
+logger = logging.getLogger(__name__)
+
+BREAKER_THRESHOLD = 5       # consecutive failures that open a breaker
+BREAKER_COOLDOWN  = 10.0    # seconds an open breaker fails fast
+HEDGE_DEFAULT     = 0.5     # seconds, until an endpoint has HEDGE_MIN_SAMPLES
+HEDGE_FLOOR       = 0.02    # never hedge sooner than this
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW      = 200     # recent latencies kept per endpoint
+MIN_ATTEMPT       = 0.05    # seconds; don't start an attempt with less left
+
+
+class CircuitOpen(Exception):
+    """The endpoint's breaker is open; the call was not sent."""
+
+
+def endpoint(url: str) -> str:
+    """Breaker / latency key for a URL: host[:port] + path, no query."""
+    u = urlsplit(url)
+    return f"{u.netloc}{u.path}"
+
+
+def retryable(exc: BaseException) -> bool:
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status >= 500 or exc.status in (418, 429)
+    return isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+# ─── Circuit breaker ─────────────────────────────────────────────────────────
+class CircuitBreaker:
+    """closed → (threshold failures) → open → (cooldown) → half-open → closed / open."""
+
+    def __init__(self, name: str, threshold: int = BREAKER_THRESHOLD,
+                 cooldown: float = BREAKER_COOLDOWN):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial = False
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.trial or time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.trial or time.monotonic() - self.opened_at < self.cooldown:
+            return False
+        self.trial = True                    # exactly one probe while half-open
+        return True
+
+    def success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("circuit %s closed", self.name)
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.trial or (self.opened_at is None and self.failures >= self.threshold):
+            if self.opened_at is None:
+                self.trips += 1
+                logger.warning("circuit %s open after %d failures", self.name, self.failures)
+            self.opened_at = time.monotonic()
+            self.trial = False
+
+
+# ─── Per-endpoint latency (hedge delay) ──────────────────────────────────────
+class _Latencies:
+    __slots__ = ("samples", "p95", "since")
+
+    def __init__(self):
+        self.samples: Deque[float] = deque(maxlen=HEDGE_WINDOW)
+        self.p95 = HEDGE_DEFAULT
+        self.since = 0
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.since += 1
+        if self.since >= HEDGE_MIN_SAMPLES:          # re-rank every N samples, not every call
+            self.since = 0
+            ranked = sorted(self.samples)
+            self.p95 = max(HEDGE_FLOOR, ranked[int(len(ranked) * 0.95) - 1])
+
+
+BREAKERS: Dict[str, CircuitBreaker] = {}
+LATENCIES: Dict[str, _Latencies] = {}
+COUNTERS = {"calls": 0, "hedged": 0, "hedge_wins": 0, "retries": 0, "rejected": 0, "timeouts": 0}
+
+
+def breaker(key: str) -> CircuitBreaker:
+    b = BREAKERS.get(key)
+    if b is None:
+        b = BREAKERS[key] = CircuitBreaker(key)
+    return b
+
+
+def _latencies(key: str) -> _Latencies:
+    s = LATENCIES.get(key)
+    if s is None:
+        s = LATENCIES[key] = _Latencies()
+    return s
+
+
+# ─── Calls ───────────────────────────────────────────────────────────────────
+async def _hedged(attempt: Callable[[float], Awaitable[Any]], timeout: float, delay: float) -> Any:
+    """`attempt`, plus a duplicate if the first is still pending after `delay`."""
+    first = asyncio.ensure_future(attempt(timeout))
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or timeout - delay < MIN_ATTEMPT:
+            return await first
+        COUNTERS["hedged"] += 1
+        tasks.add(asyncio.ensure_future(attempt(timeout - delay)))
+        error: Optional[BaseException] = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is None:
+                    if t is not first:
+                        COUNTERS["hedge_wins"] += 1
+                    return t.result()
+                error = error or t.exception()
+        raise error
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def call(
+    key: str,
+    attempt: Callable[[float], Awaitable[Any]],
+    deadline: float,
+    idempotent: bool = True,
+    hedge: bool = True,
+    retries: int = MAX_RETRIES,
+    backoff: float = RETRY_DELAY,
+) -> Any:
+    """
+    Run `attempt(timeout)` against endpoint `key` within `deadline` seconds.
+    Non-idempotent calls (orders) are sent once: no hedge, no retry.
+    """
+    COUNTERS["calls"] += 1
+    br = breaker(key)
+    lat = _latencies(key)
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+    if not idempotent:
+        hedge, retries = False, 0
+
+    for n in range(retries + 1):
+        if not br.allow():
+            COUNTERS["rejected"] += 1
+            raise CircuitOpen(key)
+        left = end - loop.time()
+        t0 = loop.time()
+        try:
+            if hedge:
+                result = await asyncio.wait_for(_hedged(attempt, left, lat.p95), left)
+            else:
+                result = await asyncio.wait_for(attempt(left), left)
+        except asyncio.CancelledError:
+            if br.trial:                     # don't leave the breaker waiting on a probe
+                br.trial = False
+            raise
+        except Exception as exc:
+            if not retryable(exc):
+                br.success()                 # the endpoint answered; the request was wrong
+                raise
+            br.failure()
+            if isinstance(exc, asyncio.TimeoutError):
+                COUNTERS["timeouts"] += 1
+            pause = random.uniform(0, backoff * 2 ** n)
+            if n == retries or end - loop.time() - pause < MIN_ATTEMPT:
+                raise
+            COUNTERS["retries"] += 1
+            logger.debug("%s failed (%s), retry %d in %.2fs", key, exc, n + 1, pause)
+            await asyncio.sleep(pause)
+            continue
+        br.success()
+        lat.add(loop.time() - t0)
+        return result
+
+
+def stats() -> Dict[str, Any]:
+    return {**COUNTERS,
+            "breakers": {k: {"state": b.state, "failures": b.failures, "trips": b.trips}
+                         for k, b in BREAKERS.items()},
+            "hedge_after": {k: round(s.p95, 4) for k, s in LATENCIES.items()}}
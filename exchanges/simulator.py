@@ -0,0 +1,675 @@
+# exchanges/simulator.py
+"""
+In-process paper exchange for offline runs and load tests.
+
+One local aiohttp server speaks the subset of the Binance and Bybit REST /
+WebSocket APIs the adapters use, so the real adapters, streams, parsers,
+rate limiter and order path run unchanged against it:
+
+• Binance  /api/v3/{time,exchangeInfo,ticker/bookTicker,depth,order,account}
+           /stream?streams=<pair>@bookTicker / <pair>@depth@100ms
+• Bybit    /v5/market/{time,instruments-info,tickers,orderbook}
+           /v5/order/{create,realtime}, /v5/account/wallet-balance, /v5/public/spot
+
+Prices: every symbol has a fair value following a random walk; each venue
+quotes it with its own noise plus occasional dislocations that decay, which
+is what produces cross-venue spreads. Books are `depth_levels` levels at
+every tick around the venue mid, with quantities fixed per price level, so a
+move only adds / removes levels at the edges (realistic diff sizes).
+
+Market orders wait `latency_ms` (± jitter), then fill against the current
+book at its VWAP, moved `slippage_bps` against the taker, and settle in the
+venue's paper balances; filled orders can be looked up again by their
+client order id. Signed calls are checked like the venues do (API key
+header and HMAC over the exact payload, `api_key` / `api_secret`), so the
+clients' signing code is exercised too.
+
+While running, the simulator's host gets an unthrottled rate-limit bucket and
+the venue clocks sample its time endpoints; `stop()` puts both back.
+
+    sim = ExchangeSimulator(SimConfig(quotes_per_sec=5000))
+    await sim.start()
+    clients = sim.adapters()          # {"binance": BinanceAdapter, "bybit": BybitAdapter}
+"""
+
+import asyncio
+import functools
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlsplit
+
+from aiohttp import WSMsgType, web
+
+from exchanges import clock, rate_limit
+from exchanges.adapter import BinanceAdapter, BybitAdapter, ExchangeAdapter
+from exchanges.parsing import loads
+
+logger = logging.getLogger(__name__)
+
+VENUES = ("binance", "bybit")
+TICK_INTERVAL = 0.001    # seconds between generator wake-ups
+MAX_BACKLOG   = 0.01     # seconds of updates one wake-up may catch up on
+SIM_LIMIT     = (1e9, 1e9)   # rate-limit bucket for the simulator's host
+START_PRICES = {"BTC/USDT": 65000.0, "ETH/USDT": 3200.0, "SOL/USDT": 150.0,
+                "BNB/USDT": 580.0, "XRP/USDT": 0.52, "DOGE/USDT": 0.12}
+
+
+@dataclass
+class SimConfig:
+    symbols: Sequence[str] = ("BTC/USDT", "ETH/USDT", "SOL/USDT")
+    quotes_per_sec: float = 1000.0   # book updates per venue per second, all symbols
+    volatility_bps: float = 0.1      # fair-value step per update (std dev)
+    noise_bps: float = 0.2           # venue-specific quote noise
+    dislocation_rate: float = 0.002  # chance per update that a venue's mid jumps
+    dislocation_bps: float = 40.0
+    dislocation_decay: float = 0.995
+    half_spread_bps: float = 0.5
+    depth_levels: int = 20
+    level_qty: float = 2.0           # mean base quantity per level, at a 65k price
+    latency_ms: float = 5.0          # order acknowledgement delay
+    latency_jitter_ms: float = 2.0
+    slippage_bps: float = 1.0
+    balances: Dict[str, float] = field(default_factory=lambda: {"USDT": 1_000_000.0})
+    base_balance_usd: float = 250_000.0   # per base asset, at the start price
+    taker_fee_pct: float = 0.10
+    api_key: str = "sim"             # what signed calls must carry / be signed with
+    api_secret: str = "sim"
+    seed: int = 1
+
+
+# ─── Books ───────────────────────────────────────────────────────────────────
+def _tick_for(price: float) -> float:
+    return 10.0 ** (math.floor(math.log10(price)) - 4)      # 0.1–1 bp
+
+
+def _shift(old: Optional[int], new: int, n: int) -> Tuple[range, range]:
+    """Levels (added, removed) when the window [old, old+n) moves to [new, new+n)."""
+    if old is None:
+        return range(new, new + n), range(0)
+    if new >= old:
+        return range(max(new, old + n), new + n), range(old, min(old + n, new))
+    return range(new, min(new + n, old)), range(max(old, new + n), old + n)
+
+
+def _decimals(tick: float) -> int:
+    return max(0, -int(round(math.log10(tick))))
+
+
+class _Book:
+    """One venue's book for one symbol: best bid / ask on the tick grid, with update ids."""
+    __slots__ = ("pair", "tick", "dec", "qty_scale", "levels", "offset", "bid_i", "ask_i", "u")
+
+    def __init__(self, pair: str, price: float, cfg: SimConfig):
+        self.pair = pair
+        self.tick = _tick_for(price)
+        self.dec = _decimals(self.tick)
+        self.qty_scale = cfg.level_qty * 65000.0 / price
+        self.levels = cfg.depth_levels
+        self.offset = 0.0            # dislocation, relative
+        self.bid_i = self.ask_i = 0
+        self.u = 1
+
+    def qty(self, i: int) -> float:
+        # fixed per price level, so levels that stay in the book never change
+        return self.qty_scale * (0.2 + ((i * 2654435761) & 0xFFFF) / 32768.0)
+
+    def fmt(self, i: int) -> str:
+        return f"{i * self.tick:.{self.dec}f}"
+
+    def fmt_qty(self, q: float) -> str:
+        return f"{q:.6f}"
+
+    def set_mid(self, mid: float, half_spread: float) -> Tuple[range, range, range, range]:
+        """Move the book; returns (bids added, bids removed, asks added, asks removed) level ids."""
+        bid_i = math.floor(mid * (1 - half_spread) / self.tick)
+        ask_i = max(math.ceil(mid * (1 + half_spread) / self.tick), bid_i + 1)
+        n = self.levels
+        first = self.u == 1
+        bids = _shift(None if first else self.bid_i - n + 1, bid_i - n + 1, n)
+        asks = _shift(None if first else self.ask_i, ask_i, n)
+        self.bid_i, self.ask_i = bid_i, ask_i
+        self.u += 1
+        return bids[0], bids[1], asks[0], asks[1]
+
+    def bids(self, limit: Optional[int] = None) -> List[List[str]]:
+        n = min(self.levels, limit or self.levels)
+        return [[self.fmt(i), self.fmt_qty(self.qty(i))] for i in range(self.bid_i, self.bid_i - n, -1)]
+
+    def asks(self, limit: Optional[int] = None) -> List[List[str]]:
+        n = min(self.levels, limit or self.levels)
+        return [[self.fmt(i), self.fmt_qty(self.qty(i))] for i in range(self.ask_i, self.ask_i + n)]
+
+    def diff(self, added: range, removed: range) -> List[List[str]]:
+        return ([[self.fmt(i), self.fmt_qty(self.qty(i))] for i in added]
+                + [[self.fmt(i), "0"] for i in removed])
+
+    def sweep(self, side: str, amount: float) -> Optional[float]:
+        """VWAP to buy (walk asks) / sell (walk bids) `amount`; None if the book is too thin."""
+        ids = (range(self.ask_i, self.ask_i + self.levels) if side == "buy"
+               else range(self.bid_i, self.bid_i - self.levels, -1))
+        left, cost = amount, 0.0
+        for i in ids:
+            take = min(left, self.qty(i))
+            cost += take * i * self.tick
+            left -= take
+            if left <= 1e-12:
+                return cost / amount
+        return None
+
+
+# ─── Simulator ───────────────────────────────────────────────────────────────
+class ExchangeSimulator:
+    """Local Binance + Bybit look-alike; see the module docstring."""
+
+    def __init__(self, cfg: Optional[SimConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.cfg = cfg or SimConfig()
+        self.host = host
+        self.port = port
+        self.rng = random.Random(self.cfg.seed)
+        self.fair: Dict[str, float] = {}
+        self.books: Dict[Tuple[str, str], _Book] = {}        # (venue, pair) → book
+        self.pairs: Dict[str, str] = {}                      # "BTCUSDT" → "BTC/USDT"
+        for s in self.cfg.symbols:
+            price = START_PRICES.get(s) or self.rng.uniform(1, 100)
+            self.fair[s] = price
+            self.pairs[s.replace("/", "")] = s
+        self.balances: Dict[str, Dict[str, float]] = {v: self._start_balances() for v in VENUES}
+        # subscribers: (venue, kind, pair) → websockets; kind is "book" or "depth"
+        self.subs: Dict[Tuple[str, str, str], Set[web.WebSocketResponse]] = {}
+        self.fills: List[dict] = []
+        self.orders: Dict[Tuple[str, str], dict] = {}        # (venue, client order id) → order reply
+        self.sent = 0
+        self.updates = 0
+        self._ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self._tasks: List[asyncio.Task] = []
+        self._saved_clock: Dict[str, str] = {}
+        self._saved_limit: Optional[Tuple[float, float]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _start_balances(self) -> Dict[str, float]:
+        bal = dict(self.cfg.balances)
+        for s, price in self.fair.items():
+            base = s.split("/")[0]
+            bal.setdefault(base, self.cfg.base_balance_usd / price)
+        return bal
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    # ─── Lifecycle ───────────────────────────────────────────────────────────
+    async def start(self) -> "ExchangeSimulator":
+        for venue in VENUES:
+            for s, price in self.fair.items():
+                book = self.books[(venue, s.replace("/", ""))] = _Book(s.replace("/", ""), price, self.cfg)
+                book.set_mid(price, self.cfg.half_spread_bps / 1e4)
+        app = web.Application()
+        r = app.router
+        r.add_get("/api/v3/time", self._binance_time)
+        r.add_get("/api/v3/exchangeInfo", self._binance_info)
+        r.add_get("/api/v3/ticker/bookTicker", self._binance_book_ticker)
+        r.add_get("/api/v3/depth", self._binance_depth)
+        r.add_post("/api/v3/order", self._binance_order)
+        r.add_get("/api/v3/order", self._binance_query)
+        r.add_get("/api/v3/account", self._binance_account)
+        r.add_get("/stream", self._binance_ws)
+        r.add_get("/v5/market/time", self._bybit_time)
+        r.add_get("/v5/market/instruments-info", self._bybit_instruments)
+        r.add_get("/v5/market/tickers", self._bybit_tickers)
+        r.add_get("/v5/market/orderbook", self._bybit_orderbook)
+        r.add_post("/v5/order/create", self._bybit_order)
+        r.add_get("/v5/order/realtime", self._bybit_query)
+        r.add_get("/v5/account/wallet-balance", self._bybit_balance)
+        r.add_get("/v5/public/spot", self._bybit_ws)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+
+        # the clients built by create_sim_adapter repoint the clocks and the
+        # host's bucket; remember what they replace
+        self._saved_limit = rate_limit.VENUE_LIMITS.get(self.host)
+        self._saved_clock = {v: clock.CLOCKS.clock(v).url for v in VENUES}
+        _unthrottle(self.url)
+        self._tasks = [asyncio.create_task(self._generate(v)) for v in VENUES]
+        logger.info("simulator on %s: %d symbols, %.0f updates/s per venue",
+                    self.url, len(self.fair), self.cfg.quotes_per_sec)
+        return self
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for venue, url in self._saved_clock.items():
+            clock.CLOCKS.clock(venue).url = url
+        if self._saved_limit is None:
+            rate_limit.VENUE_LIMITS.pop(self.host, None)
+        else:
+            rate_limit.VENUE_LIMITS[self.host] = self._saved_limit
+        rate_limit.LIMITERS.pop(self.host, None)     # built from the simulator's limit
+        for conns in self.subs.values():
+            for ws in list(conns):
+                await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def start_in_thread(self) -> "ExchangeSimulator":
+        """
+        Serve from a loop on a background thread, so a load test's own event
+        loop only spends time on the bot and not on generating its input.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="simulator", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), self._loop).result()
+        return self
+
+    def stop_thread(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._thread = None
+
+    # ─── Clients ─────────────────────────────────────────────────────────────
+    def factories(self) -> Dict[str, Callable[[dict], ExchangeAdapter]]:
+        """Picklable `cfg → adapter` factories (usable by spawned workers)."""
+        return {v: functools.partial(create_sim_adapter, v, self.url, self.ws_url) for v in VENUES}
+
+    def adapters(self) -> Dict[str, ExchangeAdapter]:
+        return {v: f({}) for v, f in self.factories().items()}
+
+    # ─── Price generator ─────────────────────────────────────────────────────
+    async def _generate(self, venue: str) -> None:
+        cfg, rng = self.cfg, self.rng
+        symbols = list(self.fair)
+        vol, noise, hs = cfg.volatility_bps / 1e4, cfg.noise_bps / 1e4, cfg.half_spread_bps / 1e4
+        due = 0.0
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(TICK_INTERVAL)
+            now = time.perf_counter()
+            # when the host can't keep up, drop the backlog rather than
+            # starving order handling with one long burst
+            due = min(due + (now - last) * cfg.quotes_per_sec, cfg.quotes_per_sec * MAX_BACKLOG + 1)
+            last = now
+            n, due = int(due), due - int(due)
+            for _ in range(n):
+                s = rng.choice(symbols)
+                self.fair[s] *= 1 + rng.gauss(0, vol)
+                book = self.books[(venue, s.replace("/", ""))]
+                book.offset *= cfg.dislocation_decay
+                if rng.random() < cfg.dislocation_rate:
+                    book.offset += rng.choice((-1, 1)) * cfg.dislocation_bps / 1e4
+                mid = self.fair[s] * (1 + book.offset + rng.gauss(0, noise))
+                changes = book.set_mid(mid, hs)
+                self.updates += 1
+                await self._publish(venue, book, changes)
+
+    async def _publish(self, venue: str, book: _Book, changes) -> None:
+        ms = int(time.time() * 1000)
+        for kind in ("book", "depth"):
+            conns = self.subs.get((venue, kind, book.pair))
+            if not conns:
+                continue
+            if venue == "binance":
+                msg = self._binance_frame(kind, book, changes, ms)
+            else:
+                msg = self._bybit_frame(kind, book, changes, ms)
+            for ws in list(conns):
+                try:
+                    await ws.send_str(msg)
+                    self.sent += 1
+                except ConnectionError:
+                    conns.discard(ws)
+
+    # ─── Binance ─────────────────────────────────────────────────────────────
+    def _binance_frame(self, kind: str, b: _Book, changes, ms: int) -> str:
+        if kind == "book":
+            return (f'{{"stream":"{b.pair.lower()}@bookTicker","data":{{"u":{b.u},"s":"{b.pair}",'
+                    f'"b":"{b.fmt(b.bid_i)}","B":"{b.fmt_qty(b.qty(b.bid_i))}",'
+                    f'"a":"{b.fmt(b.ask_i)}","A":"{b.fmt_qty(b.qty(b.ask_i))}"}}}}')
+        bid_add, bid_rm, ask_add, ask_rm = changes
+        return _dumps({"stream": f"{b.pair.lower()}@depth@100ms",
+                       "data": {"e": "depthUpdate", "E": ms, "s": b.pair, "U": b.u, "u": b.u,
+                                "b": b.diff(bid_add, bid_rm), "a": b.diff(ask_add, ask_rm)}})
+
+    async def _binance_time(self, _):
+        return web.json_response({"serverTime": int(time.time() * 1000)})
+
+    async def _binance_info(self, _):
+        symbols = []
+        for pair, s in self.pairs.items():
+            base, quote = s.split("/")
+            b = self.books[("binance", pair)]
+            step = _tick_for(self.cfg.level_qty * 65000.0 / self.fair[s]) * 10
+            symbols.append({"symbol": pair, "status": "TRADING", "baseAsset": base, "quoteAsset": quote,
+                            "filters": [{"filterType": "PRICE_FILTER", "tickSize": f"{b.tick:.{b.dec}f}"},
+                                        {"filterType": "LOT_SIZE", "stepSize": f"{step:.8f}",
+                                         "minQty": f"{step:.8f}"},
+                                        {"filterType": "NOTIONAL", "minNotional": "5.00000000"}]})
+        return web.json_response({"timezone": "UTC", "serverTime": int(time.time() * 1000),
+                                  "symbols": symbols})
+
+    def _binance_ticker(self, pair: str) -> dict:
+        b = self.books[("binance", pair)]
+        return {"symbol": pair, "bidPrice": b.fmt(b.bid_i), "bidQty": b.fmt_qty(b.qty(b.bid_i)),
+                "askPrice": b.fmt(b.ask_i), "askQty": b.fmt_qty(b.qty(b.ask_i))}
+
+    async def _binance_book_ticker(self, request):
+        pair = request.query.get("symbol")
+        if pair is None:
+            return web.json_response([self._binance_ticker(p) for p in self.pairs])
+        if pair not in self.pairs:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        return web.json_response(self._binance_ticker(pair))
+
+    async def _binance_depth(self, request):
+        pair = request.query.get("symbol", "")
+        if pair not in self.pairs:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        b = self.books[("binance", pair)]
+        limit = int(request.query.get("limit", 100))
+        return web.json_response({"lastUpdateId": b.u, "bids": b.bids(limit), "asks": b.asks(limit)})
+
+    async def _binance_unsigned(self, request) -> Optional[web.Response]:
+        """Error reply unless the API key and the signature over query + body check out."""
+        body = await request.text() if request.method == "POST" else ""
+        payload, _, signature = (request.query_string + body).rpartition("&signature=")
+        expected = hmac.new(self.cfg.api_secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        if request.headers.get("X-MBX-APIKEY") != self.cfg.api_key:
+            return web.json_response({"code": -2015, "msg": "Invalid API-key, IP, or permissions for action."},
+                                     status=401)
+        if not hmac.compare_digest(signature, expected):
+            return web.json_response({"code": -1022, "msg": "Signature for this request is not valid."},
+                                     status=400)
+        return None
+
+    async def _binance_order(self, request):
+        denied = await self._binance_unsigned(request)
+        if denied is not None:
+            return denied
+        q = dict(request.query)
+        q.update(await request.post())
+        pair, side = q.get("symbol", ""), q.get("side", "").lower()
+        if pair not in self.pairs or q.get("type") != "MARKET":
+            return web.json_response({"code": -1121, "msg": "Invalid symbol or type."}, status=400)
+        fill, err = await self._fill("binance", pair, side, float(q.get("quantity", 0)))
+        if err:
+            return web.json_response({"code": -2010, "msg": err}, status=400)
+        cid = q.get("newClientOrderId") or f"sim{fill['id']}"
+        order = self.orders[("binance", cid)] = {
+            "symbol": pair, "orderId": fill["id"], "clientOrderId": cid,
+            "transactTime": fill["ts"], "status": "FILLED", "type": "MARKET", "side": side.upper(),
+            "origQty": f"{fill['amount']:.8f}",
+            "executedQty": f"{fill['amount']:.8f}", "cummulativeQuoteQty": f"{fill['cost']:.8f}",
+            "fills": [{"price": f"{fill['price']:.8f}", "qty": f"{fill['amount']:.8f}",
+                       "commission": f"{fill['fee']:.8f}", "commissionAsset": fill["quote"]}]}
+        return web.json_response(order)
+
+    async def _binance_query(self, request):
+        denied = await self._binance_unsigned(request)
+        if denied is not None:
+            return denied
+        order = self.orders.get(("binance", request.query.get("origClientOrderId", "")))
+        if order is None:
+            return web.json_response({"code": -2013, "msg": "Order does not exist."}, status=400)
+        return web.json_response({k: v for k, v in order.items() if k != "fills"})
+
+    async def _binance_account(self, request):
+        denied = await self._binance_unsigned(request)
+        if denied is not None:
+            return denied
+        return web.json_response({"balances": [
+            {"asset": a, "free": f"{x:.8f}", "locked": "0.00000000"}
+            for a, x in self.balances["binance"].items()]})
+
+    async def _binance_ws(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        keys = []
+        for stream in request.query.get("streams", "").split("/"):
+            pair, _, kind = stream.partition("@")
+            pair = pair.upper()
+            if pair in self.pairs:
+                keys.append(("binance", "depth" if kind.startswith("depth") else "book", pair))
+        for k in keys:
+            self.subs.setdefault(k, set()).add(ws)
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            for k in keys:
+                self.subs[k].discard(ws)
+        return ws
+
+    # ─── Bybit ───────────────────────────────────────────────────────────────
+    def _bybit_frame(self, kind: str, b: _Book, changes, ms: int) -> str:
+        if kind == "book":
+            return (f'{{"topic":"orderbook.1.{b.pair}","type":"snapshot","ts":{ms},'
+                    f'"data":{{"s":"{b.pair}","b":[["{b.fmt(b.bid_i)}","{b.fmt_qty(b.qty(b.bid_i))}"]],'
+                    f'"a":[["{b.fmt(b.ask_i)}","{b.fmt_qty(b.qty(b.ask_i))}"]],"u":{b.u},"seq":{b.u}}},'
+                    f'"cts":{ms}}}')
+        bid_add, bid_rm, ask_add, ask_rm = changes
+        return _dumps({"topic": f"orderbook.50.{b.pair}", "type": "delta", "ts": ms,
+                       "data": {"s": b.pair, "b": b.diff(bid_add, bid_rm), "a": b.diff(ask_add, ask_rm),
+                                "u": b.u, "seq": b.u}, "cts": ms})
+
+    @staticmethod
+    def _ok(result: Any) -> web.Response:
+        return web.json_response({"retCode": 0, "retMsg": "OK", "result": result,
+                                  "retExtInfo": {}, "time": int(time.time() * 1000)})
+
+    async def _bybit_time(self, _):
+        ns = time.time_ns()
+        return self._ok({"timeSecond": str(ns // 10**9), "timeNano": str(ns)})
+
+    async def _bybit_instruments(self, _):
+        out = []
+        for pair, s in self.pairs.items():
+            base, quote = s.split("/")
+            b = self.books[("bybit", pair)]
+            step = _tick_for(self.cfg.level_qty * 65000.0 / self.fair[s])
+            out.append({"symbol": pair, "baseCoin": base, "quoteCoin": quote, "status": "Trading",
+                        "lotSizeFilter": {"basePrecision": f"{step:.8f}", "minOrderQty": f"{step * 10:.8f}",
+                                          "minOrderAmt": "1"},
+                        "priceFilter": {"tickSize": f"{b.tick:.{b.dec}f}"}})
+        return self._ok({"category": "spot", "list": out})
+
+    def _bybit_ticker(self, pair: str) -> dict:
+        b = self.books[("bybit", pair)]
+        return {"symbol": pair, "bid1Price": b.fmt(b.bid_i), "bid1Size": b.fmt_qty(b.qty(b.bid_i)),
+                "ask1Price": b.fmt(b.ask_i), "ask1Size": b.fmt_qty(b.qty(b.ask_i)),
+                "lastPrice": f"{(b.bid_i + b.ask_i) / 2 * b.tick:.{b.dec + 1}f}"}
+
+    async def _bybit_tickers(self, request):
+        pair = request.query.get("symbol")
+        if pair is not None and pair not in self.pairs:
+            return web.json_response({"retCode": 10001, "retMsg": "Not supported symbols", "result": {}})
+        pairs = [pair] if pair else list(self.pairs)
+        return self._ok({"category": "spot", "list": [self._bybit_ticker(p) for p in pairs]})
+
+    async def _bybit_orderbook(self, request):
+        pair = request.query.get("symbol", "")
+        if pair not in self.pairs:
+            return web.json_response({"retCode": 10001, "retMsg": "Not supported symbols", "result": {}})
+        b = self.books[("bybit", pair)]
+        limit = int(request.query.get("limit", 1))
+        return self._ok({"s": pair, "b": b.bids(limit), "a": b.asks(limit),
+                         "ts": int(time.time() * 1000), "u": b.u})
+
+    def _bybit_unsigned(self, request, payload: str) -> Optional[web.Response]:
+        """Error reply unless the v5 headers sign timestamp + key + recvWindow + `payload`."""
+        h = request.headers
+        if h.get("X-BAPI-API-KEY") != self.cfg.api_key:
+            return web.json_response({"retCode": 10003, "retMsg": "API key is invalid.", "result": {}})
+        signed = h.get("X-BAPI-TIMESTAMP", "") + self.cfg.api_key + h.get("X-BAPI-RECV-WINDOW", "") + payload
+        expected = hmac.new(self.cfg.api_secret.encode(), signed.encode(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(h.get("X-BAPI-SIGN", ""), expected):
+            return web.json_response({"retCode": 10004, "retMsg": "error sign!", "result": {}})
+        return None
+
+    async def _bybit_order(self, request):
+        raw = await request.text()
+        denied = self._bybit_unsigned(request, raw)
+        if denied is not None:
+            return denied
+        body = loads(raw)
+        pair, side = body.get("symbol", ""), str(body.get("side", "")).lower()
+        if pair not in self.pairs or body.get("orderType") != "Market":
+            return web.json_response({"retCode": 10001, "retMsg": "params error", "result": {}})
+        fill, err = await self._fill("bybit", pair, side, float(body.get("qty", 0)))
+        if err:
+            return web.json_response({"retCode": 170131, "retMsg": err, "result": {}})
+        cid = body.get("orderLinkId", "")
+        if cid:
+            self.orders[("bybit", cid)] = {
+                "orderId": str(fill["id"]), "orderLinkId": cid, "symbol": pair,
+                "side": side.capitalize(), "orderType": "Market", "orderStatus": "Filled",
+                "qty": f"{fill['amount']:.8f}", "cumExecQty": f"{fill['amount']:.8f}",
+                "avgPrice": f"{fill['price']:.8f}"}
+        return self._ok({"orderId": str(fill["id"]), "orderLinkId": cid})
+
+    async def _bybit_query(self, request):
+        denied = self._bybit_unsigned(request, request.query_string)
+        if denied is not None:
+            return denied
+        order = self.orders.get(("bybit", request.query.get("orderLinkId", "")))
+        return self._ok({"category": "spot", "list": [order] if order else []})
+
+    async def _bybit_balance(self, request):
+        denied = self._bybit_unsigned(request, request.query_string)
+        if denied is not None:
+            return denied
+        coins = [{"coin": c, "walletBalance": f"{x:.8f}", "locked": "0"}
+                 for c, x in self.balances["bybit"].items()]
+        return self._ok({"list": [{"accountType": "UNIFIED", "coin": coins}]})
+
+    async def _bybit_ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        keys = []
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                req = loads(msg.data)
+                op = req.get("op")
+                if op == "ping":
+                    await ws.send_str(_dumps({"success": True, "ret_msg": "pong", "op": "ping"}))
+                elif op == "subscribe":
+                    for topic in req.get("args", ()):
+                        name, _, pair = topic.rpartition(".")
+                        if pair not in self.pairs:
+                            continue
+                        k = ("bybit", "book" if name == "orderbook.1" else "depth", pair)
+                        keys.append(k)
+                        if k[1] == "depth":
+                            await ws.send_str(self._bybit_snapshot(self.books[("bybit", pair)], topic))
+                        self.subs.setdefault(k, set()).add(ws)
+                    await ws.send_str(_dumps({"success": True, "ret_msg": "", "op": "subscribe",
+                                              "conn_id": f"sim-{id(ws)}"}))
+        finally:
+            for k in keys:
+                self.subs[k].discard(ws)
+        return ws
+
+    @staticmethod
+    def _bybit_snapshot(b: _Book, topic: str) -> str:
+        ms = int(time.time() * 1000)
+        return _dumps({"topic": topic, "type": "snapshot", "ts": ms,
+                       "data": {"s": b.pair, "b": b.bids(), "a": b.asks(), "u": b.u, "seq": b.u},
+                       "cts": ms})
+
+    # ─── Matching ────────────────────────────────────────────────────────────
+    async def _fill(self, venue: str, pair: str, side: str, amount: float) -> Tuple[Optional[dict], str]:
+        cfg = self.cfg
+        await asyncio.sleep(max(0.0, cfg.latency_ms + self.rng.uniform(-1, 1) * cfg.latency_jitter_ms) / 1e3)
+        if side not in ("buy", "sell") or amount <= 0:
+            return None, "Invalid side or quantity."
+        book = self.books[(venue, pair)]
+        vwap = book.sweep(side, amount)
+        if vwap is None:
+            return None, "Insufficient liquidity."
+        slip = cfg.slippage_bps / 1e4
+        price = vwap * (1 + slip if side == "buy" else 1 - slip)
+        base, quote = self.pairs[pair].split("/")
+        bal = self.balances[venue]
+        cost = price * amount
+        fee = cost * cfg.taker_fee_pct / 100
+        if side == "buy":
+            if bal.get(quote, 0.0) < cost + fee:
+                return None, "Account has insufficient balance for requested action."
+            bal[quote] -= cost + fee
+            bal[base] = bal.get(base, 0.0) + amount
+        else:
+            if bal.get(base, 0.0) < amount:
+                return None, "Account has insufficient balance for requested action."
+            bal[base] -= amount
+            bal[quote] = bal.get(quote, 0.0) + cost - fee
+        fill = {"id": next(self._ids), "venue": venue, "symbol": self.pairs[pair], "side": side,
+                "amount": amount, "price": price, "top": book.ask_i * book.tick if side == "buy"
+                else book.bid_i * book.tick, "cost": cost, "fee": fee, "quote": quote,
+                "ts": int(time.time() * 1000)}
+        self.fills.append(fill)
+        return fill, ""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"updates": self.updates, "frames_sent": self.sent, "fills": len(self.fills),
+                "subscribers": sum(len(c) for c in self.subs.values())}
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"))
+
+
+# ─── Adapters onto the simulator ─────────────────────────────────────────────
+def _unthrottle(url: str) -> None:
+    """The transport's per-host bucket would throttle a local load test."""
+    host = urlsplit(url).hostname
+    if rate_limit.VENUE_LIMITS.get(host) != SIM_LIMIT:
+        rate_limit.VENUE_LIMITS[host] = SIM_LIMIT
+        rate_limit.LIMITERS.pop(host, None)
+
+
+def create_sim_adapter(venue: str, url: str, ws_url: str, cfg: dict) -> ExchangeAdapter:
+    """
+    Real `BinanceAdapter` / `BybitAdapter` with every endpoint pointed at the
+    simulator. Sets this process's overrides too (the venue clock follows the
+    client's base URL, the host's bucket is unthrottled), so it works the
+    same in a spawned worker as next to the simulator.
+    """
+    _unthrottle(url)
+    if venue == "binance":
+        from exchanges.binance import AsyncBinanceRestClient
+        a = BinanceAdapter(AsyncBinanceRestClient(cfg.get("apiKey", "sim"), cfg.get("secret", "sim"),
+                                                  base=url, clock=clock.CLOCKS.clock("binance")))
+        a.REST_URL = f"{url}/api/v3"
+        a.WS_URL = f"{ws_url}/stream"
+        a.DEPTH_URL = f"{url}/api/v3/depth"
+        return a
+    if venue == "bybit":
+        from exchanges.bybit import AsyncBybitRestClient
+        a = BybitAdapter(AsyncBybitRestClient(cfg.get("apiKey", "sim"), cfg.get("secret", "sim"),
+                                              base=url, clock=clock.CLOCKS.clock("bybit")))
+        a.MARKET_URL = f"{url}/v5/market"
+        a.WS_URL = f"{ws_url}/v5/public/spot"
+        return a
+    raise ValueError(f"simulator has no {venue!r} venue")
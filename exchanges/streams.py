@@ -0,0 +1,444 @@
+# exchanges/streams.py
+"""
+Streaming market-data layer.
+
+One persistent WebSocket per exchange pushes best bid/ask updates into an
+in-memory `QuoteStore`; consumers `await store.wait()` and react to every
+update instead of polling on a timer.
+
+• Binance → combined `<pair>@bookTicker` streams
+• Bybit   → v5 public spot `orderbook.1.<pair>` topics
+
+Depth variants maintain a local `OrderBook` per (venue, symbol) and publish
+the volume-weighted price to buy/sell a target size as the quote's ask/bid:
+
+• Binance → `<pair>@depth@100ms` diffs synced onto a REST `/api/v3/depth` snapshot
+• Bybit   → `orderbook.50.<pair>` snapshot + delta topics
+
+Frames are decoded through `exchanges.parsing`: top-of-book frames straight
+into a reused `BookTick`, depth frames with its fast `loads`.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import aiohttp
+
+from exchanges.http import get_json
+from exchanges.order_book import OrderBook
+from exchanges.parsing import BookTick, control_error, loads, parse_binance_book, parse_bybit_book
+from utils.latency import now_ns
+
+logger = logging.getLogger(__name__)
+
+BINANCE_WS_URL    = "wss://stream.binance.com:9443/stream"
+BINANCE_TESTNET_WS_URL = "wss://stream.testnet.binance.vision/stream"
+BYBIT_WS_URL      = "wss://stream-testnet.bybit.com/v5/public/spot"
+BINANCE_DEPTH_URL = "https://api.binance.com/api/v3/depth"
+
+BINANCE_DEPTH_LIMIT = 1000   # levels in the REST snapshot
+BINANCE_DEPTH_WEIGHT = 50    # its request weight at that limit
+BYBIT_DEPTH         = 50     # orderbook.<depth> topic
+
+RECONNECT_DELAY     = 1.0    # seconds, doubled per failure
+MAX_RECONNECT_DELAY = 30.0
+BYBIT_PING_INTERVAL = 20.0   # Bybit drops idle sockets after ~30 s
+BYBIT_MAX_ARGS      = 10     # topics per subscribe request (spot limit)
+
+
+# ─── Quote store ─────────────────────────────────────────────────────────────
+class Quote:
+    """Latest top-of-book for one (venue, symbol)."""
+    __slots__ = ("venue", "symbol", "bid", "ask", "last", "ts", "recv_ns", "exch_ts")
+
+    def __init__(self, venue: str, symbol: str):
+        self.venue  = venue
+        self.symbol = symbol
+        self.bid    = 0.0
+        self.ask    = 0.0
+        self.last   = 0.0
+        self.ts     = 0.0    # local receive time (time.time())
+        self.recv_ns = 0     # local receive time (monotonic ns, for latency)
+        self.exch_ts = 0.0   # exchange event time in ms on its clock, 0 if unknown
+
+    def __repr__(self) -> str:
+        return (f"Quote({self.venue} {self.symbol} "
+                f"bid={self.bid} ask={self.ask} last={self.last})")
+
+
+class QuoteStore:
+    """
+    In-memory best bid/ask per (venue, symbol).
+
+    Writers call `update`; a single consumer awaits `wait()`, which returns the
+    set of keys touched since the previous call. Bursts of updates are
+    coalesced, so a slow consumer never builds a backlog.
+
+    An optional `recorder` (see `data.recorder.TickRecorder`) gets every
+    update appended to its in-memory buffers.
+    """
+
+    def __init__(self, recorder=None):
+        self.recorder = recorder
+        self.quotes: Dict[Tuple[str, str], Quote] = {}
+        self.by_symbol: Dict[str, Dict[str, Quote]] = {}
+        self.books: Dict[Tuple[str, str], OrderBook] = {}   # filled by depth streams
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._spare: Set[Tuple[str, str]] = set()      # the set handed out by the last wait()
+        self._event = asyncio.Event()
+        self.updates = 0          # quotes received, for rate stats
+
+    def update(
+        self,
+        venue: str,
+        symbol: str,
+        bid: float,
+        ask: float,
+        last: Optional[float] = None,
+        exch_ts: float = 0.0,
+    ) -> Quote:
+        key = (venue, symbol)
+        q = self.quotes.get(key)
+        if q is None:
+            q = self.quotes[key] = Quote(venue, symbol)
+            self.by_symbol.setdefault(symbol, {})[venue] = q
+        q.bid  = bid
+        q.ask  = ask
+        q.last = last if last is not None else (bid + ask) / 2
+        q.ts   = time.time()
+        q.recv_ns = now_ns()
+        q.exch_ts = exch_ts
+        if self.recorder is not None:
+            self.recorder.record(venue, symbol, bid, ask, q.last, q.ts)
+        self.updates += 1
+        self._dirty.add(key)
+        self._event.set()
+        return q
+
+    def get(self, venue: str, symbol: str) -> Optional[Quote]:
+        return self.quotes.get((venue, symbol))
+
+    def for_symbol(self, symbol: str) -> Dict[str, Quote]:
+        """Venue → Quote for every venue that has quoted `symbol`."""
+        return self.by_symbol.get(symbol, {})
+
+    async def wait(self) -> Set[Tuple[str, str]]:
+        """
+        Block until at least one quote changed; return the changed keys.
+        The two key sets are swapped, not reallocated, so the returned set is
+        only valid until the next `wait()`.
+        """
+        await self._event.wait()
+        self._event.clear()
+        dirty = self._dirty
+        self._spare.clear()
+        self._dirty, self._spare = self._spare, dirty
+        return dirty
+
+
+# ─── Stream runners ──────────────────────────────────────────────────────────
+async def _run_forever(name: str, connect, *args) -> None:
+    """Keep `connect(*args)` alive, reconnecting with exponential back-off."""
+    delay = RECONNECT_DELAY
+    while True:
+        started = time.monotonic()
+        try:
+            await connect(*args)
+            logger.warning(f"[{name}] stream closed by server, reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning(f"[{name}] stream error: {exc}")
+        # a connection that lived a while resets the back-off
+        if time.monotonic() - started > MAX_RECONNECT_DELAY:
+            delay = RECONNECT_DELAY
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+async def _binance_session(
+    session: aiohttp.ClientSession,
+    store: QuoteStore,
+    venue: str,
+    pairs: Dict[str, str],
+    url: str,
+) -> None:
+    streams = "/".join(f"{p.lower()}@bookTicker" for p in pairs)
+    async with session.ws_connect(f"{url}?streams={streams}", heartbeat=30) as ws:
+        logger.info(f"[{venue}] bookTicker stream connected ({len(pairs)} symbols)")
+        tick = BookTick()
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+                continue
+            if not parse_binance_book(msg.data, tick):
+                continue
+            symbol = pairs.get(tick.symbol)
+            if symbol is not None:
+                store.update(venue, symbol, tick.bid, tick.ask)
+
+
+async def _bybit_ping(ws: aiohttp.ClientWebSocketResponse) -> None:
+    while True:
+        await asyncio.sleep(BYBIT_PING_INTERVAL)
+        await ws.send_str('{"op":"ping"}')
+
+
+async def _bybit_session(
+    session: aiohttp.ClientSession,
+    store: QuoteStore,
+    venue: str,
+    pairs: Dict[str, str],
+    url: str,
+) -> None:
+    async with session.ws_connect(url) as ws:
+        topics = [f"orderbook.1.{p}" for p in pairs]
+        for i in range(0, len(topics), BYBIT_MAX_ARGS):
+            await ws.send_str(json.dumps(
+                {"op": "subscribe", "args": topics[i:i + BYBIT_MAX_ARGS]}
+            ))
+        logger.info(f"[{venue}] orderbook.1 stream connected ({len(pairs)} symbols)")
+        pinger = asyncio.create_task(_bybit_ping(ws))
+        tick = BookTick()
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+                    continue
+                if not parse_bybit_book(msg.data, tick):
+                    # subscribe acks / pongs
+                    err = control_error(msg.data)
+                    if err is not None:
+                        logger.error(f"[{venue}] subscribe failed: {err}")
+                    continue
+                symbol = pairs.get(tick.symbol)
+                if symbol is None:
+                    continue
+                # level-1 deltas may omit an unchanged side
+                bid, ask = tick.bid, tick.ask
+                if not (bid and ask):
+                    prev = store.get(venue, symbol)
+                    bid = bid or (prev.bid if prev else 0.0)
+                    ask = ask or (prev.ask if prev else 0.0)
+                if bid and ask:
+                    store.update(venue, symbol, bid, ask, exch_ts=tick.ts)
+        finally:
+            pinger.cancel()
+
+
+async def _stream(
+    session_fn,
+    store: QuoteStore,
+    venue: str,
+    symbols: Iterable[str],
+    url: str,
+    session: Optional[aiohttp.ClientSession],
+    *extra,
+) -> None:
+    pairs = {s.replace("/", ""): s for s in symbols}
+    own = session is None
+    session = session or aiohttp.ClientSession()
+    try:
+        await _run_forever(venue, session_fn, session, store, venue, pairs, url, *extra)
+    finally:
+        if own:
+            await session.close()
+
+
+async def stream_binance_book(
+    store: QuoteStore,
+    symbols: Iterable[str],
+    venue: str = "binance",
+    url: str = BINANCE_WS_URL,
+    session: Optional[aiohttp.ClientSession] = None,
+) -> None:
+    """Push Binance best bid/ask for `symbols` into `store` until cancelled."""
+    await _stream(_binance_session, store, venue, symbols, url, session)
+
+
+async def stream_bybit_book(
+    store: QuoteStore,
+    symbols: Iterable[str],
+    venue: str = "bybit",
+    url: str = BYBIT_WS_URL,
+    session: Optional[aiohttp.ClientSession] = None,
+) -> None:
+    """Push Bybit best bid/ask for `symbols` into `store` until cancelled."""
+    await _stream(_bybit_session, store, venue, symbols, url, session)
+
+
+# ─── Depth streams ───────────────────────────────────────────────────────────
+def _publish_depth(store: QuoteStore, venue: str, symbol: str, book: OrderBook,
+                   amount: float, exch_ts: float = 0.0) -> None:
+    """Push the executable sell/buy VWAP for `amount` as the quote's bid/ask."""
+    bid = book.vwap_sell(amount)
+    ask = book.vwap_buy(amount)
+    if bid is not None and ask is not None:
+        store.update(venue, symbol, bid, ask, exch_ts=exch_ts)
+
+
+class _BinanceDepthSync:
+    """
+    Binance diff-depth bookkeeping for one pair: buffer diffs until the REST
+    snapshot arrives, drop diffs it already covers, then require each diff's
+    first update id to follow the previous one's last; any gap resyncs.
+    """
+    __slots__ = ("pair", "book", "rest_url", "last_u", "buffer", "snapshot")
+
+    def __init__(self, pair: str, book: OrderBook, rest_url: str):
+        self.pair = pair
+        self.book = book
+        self.rest_url = rest_url
+        self.last_u: Optional[int] = None
+        self.buffer = []
+        self.snapshot = None
+        self.resync()
+
+    def resync(self) -> None:
+        self.last_u = None
+        self.buffer = []
+        self.snapshot = asyncio.ensure_future(get_json(
+            self.rest_url, params={"symbol": self.pair, "limit": BINANCE_DEPTH_LIMIT},
+            weight=BINANCE_DEPTH_WEIGHT, hedge=False,
+        ))
+
+    def on_event(self, ev: dict) -> bool:
+        """Apply one diff; True when the book is synced and changed."""
+        if self.last_u is not None:
+            if ev["U"] != self.last_u + 1:
+                logger.warning("[binance] %s depth gap, resyncing", self.pair)
+                self.resync()
+                self.buffer.append(ev)
+                return False
+            self.book.apply_diff(ev["b"], ev["a"])
+            self.last_u = ev["u"]
+            return True
+
+        self.buffer.append(ev)
+        if not self.snapshot.done():
+            return False
+        snap = self.snapshot.result()     # raises → stream reconnects
+        last = snap["lastUpdateId"]
+        events = [e for e in self.buffer if e["u"] > last]
+        if events and events[0]["U"] > last + 1:
+            self.resync()                 # snapshot older than our first diff
+            self.buffer.extend(events)
+            return False
+        self.buffer = []
+        self.book.apply_snapshot(snap["bids"], snap["asks"])
+        for e in events:
+            self.book.apply_diff(e["b"], e["a"])
+        self.last_u = events[-1]["u"] if events else last
+        return True
+
+    def close(self) -> None:
+        if self.snapshot is not None:
+            self.snapshot.cancel()
+
+
+async def _binance_depth_session(
+    session: aiohttp.ClientSession,
+    store: QuoteStore,
+    venue: str,
+    pairs: Dict[str, str],
+    url: str,
+    amount: float,
+    rest_url: str,
+) -> None:
+    streams = "/".join(f"{p.lower()}@depth@100ms" for p in pairs)
+    async with session.ws_connect(f"{url}?streams={streams}", heartbeat=30) as ws:
+        logger.info(f"[{venue}] depth stream connected ({len(pairs)} symbols)")
+        syncs = {}
+        for p, symbol in pairs.items():
+            book = store.books[(venue, symbol)] = OrderBook()
+            syncs[p] = _BinanceDepthSync(p, book, rest_url)
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+                    continue
+                data = loads(msg.data).get("data")
+                if not data:
+                    continue
+                sync = syncs.get(data.get("s"))
+                if sync is not None and sync.on_event(data):
+                    symbol = pairs[sync.pair]
+                    _publish_depth(store, venue, symbol, sync.book, amount, data.get("E", 0.0))
+        finally:
+            for sync in syncs.values():
+                sync.close()
+
+
+async def _bybit_depth_session(
+    session: aiohttp.ClientSession,
+    store: QuoteStore,
+    venue: str,
+    pairs: Dict[str, str],
+    url: str,
+    amount: float,
+) -> None:
+    async with session.ws_connect(url) as ws:
+        topics = [f"orderbook.{BYBIT_DEPTH}.{p}" for p in pairs]
+        for i in range(0, len(topics), BYBIT_MAX_ARGS):
+            await ws.send_str(json.dumps(
+                {"op": "subscribe", "args": topics[i:i + BYBIT_MAX_ARGS]}
+            ))
+        logger.info(f"[{venue}] orderbook.{BYBIT_DEPTH} stream connected ({len(pairs)} symbols)")
+        books = {}
+        for p, symbol in pairs.items():
+            books[p] = store.books[(venue, symbol)] = OrderBook()
+        pinger = asyncio.create_task(_bybit_ping(ws))
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+                    continue
+                frame = loads(msg.data)
+                data = frame.get("data")
+                if not data:
+                    if frame.get("success") is False:
+                        logger.error(f"[{venue}] subscribe failed: {frame.get('ret_msg')}")
+                    continue
+                book = books.get(data.get("s"))
+                if book is None:
+                    continue
+                # u == 1 marks a service restart: the delta is a full snapshot
+                if frame.get("type") == "snapshot" or data.get("u") == 1:
+                    book.apply_snapshot(data.get("b", ()), data.get("a", ()))
+                else:
+                    book.apply_diff(data.get("b", ()), data.get("a", ()))
+                _publish_depth(store, venue, pairs[data["s"]], book, amount, frame.get("ts", 0.0))
+        finally:
+            pinger.cancel()
+
+
+async def stream_binance_depth(
+    store: QuoteStore,
+    symbols: Iterable[str],
+    amount: float,
+    venue: str = "binance",
+    url: str = BINANCE_WS_URL,
+    session: Optional[aiohttp.ClientSession] = None,
+    rest_url: str = BINANCE_DEPTH_URL,
+) -> None:
+    """Maintain Binance L2 books and push VWAP bid/ask for `amount` into `store`."""
+    await _stream(_binance_depth_session, store, venue, symbols, url, session, amount, rest_url)
+
+
+async def stream_bybit_depth(
+    store: QuoteStore,
+    symbols: Iterable[str],
+    amount: float,
+    venue: str = "bybit",
+    url: str = BYBIT_WS_URL,
+    session: Optional[aiohttp.ClientSession] = None,
+) -> None:
+    """Maintain Bybit L2 books and push VWAP bid/ask for `amount` into `store`."""
+    await _stream(_bybit_depth_session, store, venue, symbols, url, session, amount)
@@ -0,0 +1,177 @@
+# execution/positions.py
+"""
+Inventory-aware position book.
+
+• balances  – venue → asset → free amount, refreshed with one
+  `fetch_balance()` per venue (all assets at once, venues concurrently)
+• positions – every open (symbol, low, high) leg pair, several at a time
+
+`reserve` admits a new position only within the configured limits and the
+free inventory it needs (quote asset on the buy venue, base asset on the
+sell venue). It books the expected fills into the local balances at once,
+so back-to-back opens never spend the same funds twice; the next refresh
+replaces the estimate with the venues' own numbers.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from execution.trader import _call
+
+logger = logging.getLogger(__name__)
+
+BALANCE_REFRESH_INTERVAL = 30.0   # seconds
+
+PositionKey = Tuple[str, str, str]   # (symbol, low, high)
+
+
+@dataclass
+class Position:
+    """Bought `amount` of `symbol` on `low` at `price`, sold it on `high`."""
+    symbol: str
+    low: str
+    high: str
+    amount: float
+    price: float
+    spread: float = 0.0
+    opened: float = field(default_factory=time.time)
+
+    @property
+    def key(self) -> PositionKey:
+        return self.symbol, self.low, self.high
+
+    @property
+    def notional(self) -> float:
+        return self.amount * self.price
+
+
+class PositionManager:
+    """
+    Open positions plus per-venue free balances, with capital limits:
+      • max_positions  – open positions in total
+      • max_per_symbol – open positions per symbol
+      • max_notional   – summed quote-currency notional of open positions
+    """
+
+    def __init__(
+        self,
+        clients: Dict[str, Any],
+        max_positions: int = 4,
+        max_per_symbol: int = 1,
+        max_notional: Optional[float] = None,
+    ):
+        self.clients = clients
+        self.max_positions = max_positions
+        self.max_per_symbol = max_per_symbol
+        self.max_notional = max_notional
+        self.balances: Dict[str, Dict[str, float]] = {name: {} for name in clients}
+        self.refreshed: Dict[str, float] = {}
+        self.positions: Dict[PositionKey, Position] = {}
+        self._per_symbol: Dict[str, int] = {}
+        self._notional = 0.0
+
+    # ─── Balances ────────────────────────────────────────────────────────────
+    async def _refresh_one(self, name: str) -> None:
+        try:
+            bal = await _call(self.clients[name].fetch_balance)
+        except Exception as exc:
+            logger.warning("[%s] balance refresh failed: %s", name, exc)
+            return
+        self.balances[name] = {a: float(x) for a, x in (bal.get("free") or {}).items() if x}
+        self.refreshed[name] = time.time()
+
+    async def refresh(self, venues: Optional[Iterable[str]] = None) -> None:
+        """One balance call per venue, all venues concurrently."""
+        names = list(self.clients) if venues is None else list(venues)
+        await asyncio.gather(*(self._refresh_one(n) for n in names))
+
+    async def run(self, interval: float = BALANCE_REFRESH_INTERVAL) -> None:
+        """Refresh every venue's balances every *interval* seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh()
+
+    def free(self, venue: str, asset: str) -> float:
+        return self.balances.get(venue, {}).get(asset, 0.0)
+
+    def totals(self) -> Dict[str, float]:
+        """Free amount of every asset summed over venues."""
+        out: Dict[str, float] = {}
+        for bal in self.balances.values():
+            for asset, x in bal.items():
+                out[asset] = out.get(asset, 0.0) + x
+        return out
+
+    def _book(self, venue: str, asset: str, delta: float) -> None:
+        bal = self.balances.setdefault(venue, {})
+        bal[asset] = bal.get(asset, 0.0) + delta
+
+    # ─── Positions ───────────────────────────────────────────────────────────
+    @property
+    def exposure(self) -> float:
+        return self._notional
+
+    def get(self, symbol: str, low: str, high: str) -> Optional[Position]:
+        return self.positions.get((symbol, low, high))
+
+    def for_symbol(self, symbol: str) -> List[Position]:
+        return [p for p in self.positions.values() if p.symbol == symbol]
+
+    def can_open(self, symbol: str, low: str, high: str, amount: float, price: float) -> bool:
+        if amount <= 0 or price <= 0:        # no size, or no quote on the buy venue yet
+            return False
+        if (symbol, low, high) in self.positions:
+            return False
+        if len(self.positions) >= self.max_positions:
+            return False
+        if self._per_symbol.get(symbol, 0) >= self.max_per_symbol:
+            return False
+        notional = amount * price
+        if self.max_notional is not None and self._notional + notional > self.max_notional:
+            return False
+        base, quote = symbol.split("/")
+        return self.free(low, quote) >= notional and self.free(high, base) >= amount
+
+    def reserve(self, symbol: str, low: str, high: str, amount: float,
+                price: float, spread: float = 0.0) -> Optional[Position]:
+        """Admit and book a new position, or None if a limit or balance says no."""
+        if not self.can_open(symbol, low, high, amount, price):
+            return None
+        pos = Position(symbol, low, high, amount, price, spread)
+        base, quote = symbol.split("/")
+        self._book(low, quote, -pos.notional)
+        self._book(low, base, amount)
+        self._book(high, base, -amount)
+        self._book(high, quote, pos.notional * (1 + spread / 100))   # at bid[high]
+        self.positions[pos.key] = pos
+        self._per_symbol[symbol] = self._per_symbol.get(symbol, 0) + 1
+        self._notional += pos.notional
+        return pos
+
+    def release(self, symbol: str, low: str, high: str,
+                prices: Optional[Tuple[float, float]] = None) -> Optional[Position]:
+        """
+        Remove a position. With `prices` = (bid on low, ask on high) its
+        unwind is booked into the balances; without, the open is treated as
+        never filled and its own booking is reversed.
+        """
+        pos = self.positions.pop((symbol, low, high), None)
+        if pos is None:
+            return None
+        base, quote = symbol.split("/")
+        if prices is None:
+            prices = pos.price, pos.price * (1 + pos.spread / 100)
+        self._book(low, base, -pos.amount)
+        self._book(low, quote, pos.amount * prices[0])
+        self._book(high, base, pos.amount)
+        self._book(high, quote, -pos.amount * prices[1])
+        left = self._per_symbol[symbol] - 1
+        if left:
+            self._per_symbol[symbol] = left
+        else:
+            del self._per_symbol[symbol]
+        self._notional -= pos.notional
+        return pos
@@ -1,82 +1,227 @@
 # execution/trader.py
 
+import asyncio
 import logging
-from typing import Dict, Any
-import ccxt
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, List, Optional
+
+from exchanges.adapter import ExchangeAdapter, Unsupported
+from exchanges.http import OutcomeUnknown
+from exchanges.markets import MARKETS
+from utils import latency
 
 logger = logging.getLogger(__name__)
 
-def open_position(
+# blocking (ccxt) order calls get their own threads so they never queue
+# behind market-data work in the loop's default executor
+ORDER_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="orders")
+
+# an order sent without a reply is looked up by its client id until the venue
+# reports it, or until this long after the submit: past the venues' 5 s
+# recvWindow an order they have not seen can no longer execute
+RECONCILE_WINDOW = 6.0    # seconds
+RECONCILE_POLL   = 0.5    # seconds between lookups
+
+
+# ─── Results ─────────────────────────────────────────────────────────────────
+@dataclass
+class LegResult:
+    """
+    One order leg. `submitted` / `acked` are `time.perf_counter()` readings
+    taken right before the request and right after the venue replied;
+    `ts` is the wall-clock submit time. `unknown` marks an order that got
+    no reply and could not be looked up afterwards: it failed as far as we
+    know, but the venue may have filled it.
+    """
+    venue: str
+    side: str
+    symbol: str
+    amount: float
+    ts: float = 0.0
+    submitted: float = 0.0
+    acked: float = 0.0
+    order: Optional[dict] = None
+    error: Optional[str] = None
+    client_id: Optional[str] = None
+    unknown: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def latency(self) -> float:
+        return self.acked - self.submitted
+
+
+@dataclass
+class ExecutionResult:
+    """Both legs of an open/close plus the measured leg skew (seconds)."""
+    action: str
+    symbol: str
+    legs: List[LegResult] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(leg.ok for leg in self.legs)
+
+    @property
+    def unknown(self) -> bool:
+        """A leg may have filled unseen; whatever it reserved must stay reserved."""
+        return any(leg.unknown for leg in self.legs)
+
+    @property
+    def submit_skew(self) -> float:
+        return max(l.submitted for l in self.legs) - min(l.submitted for l in self.legs)
+
+    @property
+    def ack_skew(self) -> float:
+        return max(l.acked for l in self.legs) - min(l.acked for l in self.legs)
+
+
+# ─── Helpers ─────────────────────────────────────────────────────────────────
+async def _call(fn: Callable, *args):
+    """Await native async client methods; run blocking (ccxt) ones on ORDER_POOL."""
+    if asyncio.iscoroutinefunction(fn):
+        return await fn(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ORDER_POOL, lambda: fn(*args))
+
+async def _reconcile(client: ExchangeAdapter, leg: LegResult) -> None:
+    """
+    Settle a leg whose order got no reply by looking it up under its client
+    id: filled → the leg is ok after all; rejected, cancelled unfilled or
+    still unseen after RECONCILE_WINDOW → a plain failure. It stays
+    `unknown` while the lookups fail or the order is still open.
+    """
+    while True:
+        late = time.perf_counter() - leg.submitted >= RECONCILE_WINDOW
+        try:
+            order = await client.fetch_order(leg.symbol, leg.client_id)
+        except Unsupported:
+            return
+        except Exception as e:
+            logger.warning("%s order %s lookup failed: %s", leg.venue, leg.client_id, e)
+            if late:
+                return
+        else:
+            if order is not None and order.get("filled"):
+                leg.order, leg.error, leg.unknown = order, None, False
+                return
+            if order is not None and order.get("status") != "open":
+                leg.error, leg.unknown = f"{leg.error}; order {order.get('status')} unfilled", False
+                return
+            if late:
+                if order is None:
+                    leg.error, leg.unknown = f"{leg.error}; order never reached the venue", False
+                return
+        await asyncio.sleep(RECONCILE_POLL)
+
+async def _leg(client: Any, venue: str, side: str, symbol: str, amount: float) -> LegResult:
+    leg = LegResult(venue, side, symbol, amount)
+    fn = client.create_market_buy_order if side == "buy" else client.create_market_sell_order
+    # adapters take a client order id, so a lost reply can be looked up
+    if isinstance(client, ExchangeAdapter):
+        leg.client_id = f"arb{uuid.uuid4().hex[:24]}"
+        args = (symbol, amount, leg.client_id)
+    else:
+        args = (symbol, amount)
+    waited = latency.since("signal")
+    if waited is not None:
+        latency.record("signal_to_submit", waited)
+    leg.ts = time.time()
+    leg.submitted = time.perf_counter()
+    try:
+        leg.order = await _call(fn, *args)
+    except OutcomeUnknown as e:
+        leg.error, leg.unknown = str(e), True
+    except Exception as e:
+        leg.error = str(e)
+    leg.acked = time.perf_counter()
+    if leg.unknown:
+        if leg.client_id is not None:
+            await _reconcile(client, leg)
+    else:
+        latency.record(f"order_ack.{venue}", int((leg.acked - leg.submitted) * 1e9))
+    return leg
+
+async def _execute(
+    action: str,
+    clients: Dict[str, Any],
+    buy_ex: str,
+    sell_ex: str,
+    symbol: str,
+    amount: float,
+    price: Optional[float] = None
+) -> ExecutionResult:
+    # both legs trade the same size, floored to the coarser venue step
+    sized = MARKETS.size(symbol, (buy_ex, sell_ex), amount, price)
+    if not sized:
+        logger.error("%s %s: %s is below the minimum order size on %s/%s, not sent",
+                     action.upper(), symbol, amount, buy_ex, sell_ex)
+        return ExecutionResult(action, symbol, [
+            LegResult(buy_ex, "buy", symbol, amount, error="below minimum order size"),
+            LegResult(sell_ex, "sell", symbol, amount, error="below minimum order size"),
+        ])
+    amount = sized
+    logger.info("PLACING %s MARKET BUY %s %s on %s + MARKET SELL on %s",
+                action.upper(), amount, symbol, buy_ex, sell_ex)
+    legs = await asyncio.gather(
+        _leg(clients[buy_ex], buy_ex, "buy", symbol, amount),
+        _leg(clients[sell_ex], sell_ex, "sell", symbol, amount),
+    )
+    result = ExecutionResult(action, symbol, list(legs))
+
+    for leg in result.legs:
+        if leg.ok:
+            logger.info("%s %s on %s (%.1f ms): %s",
+                        action.upper(), leg.side.upper(), leg.venue, leg.latency * 1e3, leg.order)
+        elif leg.unknown:
+            logger.error("%s %s on %s: outcome unknown (client id %s), check the venue: %s",
+                         action.upper(), leg.side.upper(), leg.venue, leg.client_id, leg.error)
+        else:
+            logger.error("Error placing %s %s on %s: %s",
+                         action, leg.side.upper(), leg.venue, leg.error)
+    if not result.ok and any(leg.ok for leg in result.legs):
+        logger.error("%s %s is one-legged – manual hedge required", action.upper(), symbol)
+    logger.info("%s %s leg skew: submit %.2f ms, ack %.2f ms",
+                action.upper(), symbol, result.submit_skew * 1e3, result.ack_skew * 1e3)
+    return result
+
+
+# ─── Public API ──────────────────────────────────────────────────────────────
+async def open_position(
     clients: Dict[str, Any],
     low_ex: str,
     high_ex: str,
     symbol: str,
-    amount: float
-):
+    amount: float,
+    price: Optional[float] = None
+) -> ExecutionResult:
     """
-    Open an arbitrage position:
+    Open an arbitrage position, both legs fired concurrently:
     - Market buy on low_ex
     - Market sell on high_ex
+    The amount is floored to both venues' step size from the market cache;
+    with `price` it must also clear their minimum notional.
     """
-    buy_client = clients[low_ex]
-    sell_client = clients[high_ex]
+    return await _execute("open", clients, low_ex, high_ex, symbol, amount, price)
 
-    # BUY leg
-    try:
-        buy_client.load_markets()
-    except Exception as e:
-        logger.warning(f"[{low_ex}] could not load markets before buy: {e}")
-    try:
-        logger.info(f"PLACING MARKET BUY {amount} {symbol} on {low_ex}")
-        order = buy_client.create_market_buy_order(symbol, amount)
-        logger.info(f"BUY order placed on {low_ex}: {order}")
-    except Exception as e:
-        logger.error(f"Error placing BUY on {low_ex}: {e}")
-
-    # SELL leg
-    try:
-        sell_client.load_markets()
-    except Exception as e:
-        logger.warning(f"[{high_ex}] could not load markets before sell: {e}")
-    try:
-        logger.info(f"PLACING MARKET SELL {amount} {symbol} on {high_ex}")
-        order = sell_client.create_market_sell_order(symbol, amount)
-        logger.info(f"SELL order placed on {high_ex}: {order}")
-    except Exception as e:
-        logger.error(f"Error placing SELL on {high_ex}: {e}")
-
-def close_position(
+async def close_position(
     clients: Dict[str, Any],
     low_ex: str,
     high_ex: str,
     symbol: str,
-    amount: float
-):
+    amount: float,
+    price: Optional[float] = None
+) -> ExecutionResult:
     """
-    Close the arbitrage position:
+    Close the arbitrage position, both legs fired concurrently:
     - Market sell on low_ex (where we bought)
     - Market buy on high_ex (where we sold)
+    Sized like `open_position`.
     """
-    # Close SELL leg
-    try:
-        clients[low_ex].load_markets()
-    except Exception as e:
-        logger.warning(f"[{low_ex}] could not load markets before close-sell: {e}")
-    try:
-        logger.info(f"PLACING CLOSE MARKET SELL {amount} {symbol} on {low_ex}")
-        order = clients[low_ex].create_market_sell_order(symbol, amount)
-        logger.info(f"CLOSE SELL on {low_ex}: {order}")
-    except Exception as e:
-        logger.error(f"Error placing close SELL on {low_ex}: {e}")
-
-    # Close BUY leg
-    try:
-        clients[high_ex].load_markets()
-    except Exception as e:
-        logger.warning(f"[{high_ex}] could not load markets before close-buy: {e}")
-    try:
-        logger.info(f"PLACING CLOSE MARKET BUY {amount} {symbol} on {high_ex}")
-        order = clients[high_ex].create_market_buy_order(symbol, amount)
-        logger.info(f"CLOSE BUY on {high_ex}: {order}")
-    except Exception as e:
-        logger.error(f"Error placing close BUY on {high_ex}: {e}")
+    return await _execute("close", clients, high_ex, low_ex, symbol, amount, price)
@@ -3,59 +3,140 @@ main.py
 --------
 Entry-point for the arbitrage bot.
 
-• Configures logging (DEBUG heart-beats)  
-• Loads exchange configs & instantiates Binance + Bybit clients  
-• Pre-loads CCXT markets so order-calls won’t block  
-• Starts the asynchronous spread-monitor
+• Configures logging (INFO, formatted off the event loop) + latency reports  
+• Loads exchange configs & wraps each venue (Binance + Bybit by default,  
+  `--venues` for kraken / alpaca / ibkr) in an async `ExchangeAdapter`  
+• Reads market metadata (steps, minimums, fees) from the on-disk cache and
+  refreshes stale venues in the background, so order calls never wait on it  
+• Tracks each exchange's clock offset for signing and quote freshness  
+• Keeps per-venue balances and open positions, so several positions run at
+  once within capital limits  
+• Starts the asynchronous spread-monitor, or with `--scan` the multi-symbol
+  scanner over every symbol shared by the configured exchanges, or with
+  `--cycles` the triangular / cross-venue cycle detector (log only), or with
+  `--workers N` the spread monitor sharded over N worker processes
+• Watches config/strategy.yaml and exchanges.yaml and applies edits live;
+  serves stats and params on a local control port (config/runtime.py)  
+• `--simulate` runs all of it offline against the local paper exchange in
+  `exchanges/simulator.py` instead of the real venues
 """
 
+import argparse
 import asyncio
 import logging
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from utils.logger     import get_logger, setup_logging
 
 # ─── Global logging ──────────────────────────────────────────────────────────
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s %(levelname)-8s [%(name)s] %(message)s",
-)
+# records are formatted and written by a background thread; DEBUG would
+# create a record per quote, so the hot path stays at INFO
+setup_logging(logging.INFO)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 logging.getLogger("ccxt").setLevel(logging.WARNING)
 
 from config.settings  import LOGGER_NAME
 from config.loader    import load_exchanges_config
-from utils.logger     import get_logger
+from config.runtime   import CONTROL_PORT, Runtime
+from data.recorder    import TickRecorder
+from utils            import latency
 
-from exchanges.binance import create_binance_client
-from exchanges.bybit   import create_bybit_client
+from exchanges.adapter import ADAPTERS
+from exchanges.clock   import CLOCKS
+from exchanges.markets import MARKETS
+from exchanges.http    import close_session
+from exchanges         import rate_limit
+from exchanges.simulator import ExchangeSimulator, SimConfig
 
 from strategies.spread_strategy import monitor_spread
+from strategies.scanner         import monitor_scanner, shared_symbols
+from strategies.triangular      import monitor_cycles
+from strategies.supervisor      import supervise
 from execution.trader           import open_position, close_position
+from execution.positions        import PositionManager
+
+# every venue is wrapped in an `ExchangeAdapter`; add new ones in exchanges/adapter.py
+EXCHANGE_FACTORIES = ADAPTERS
+DEFAULT_VENUES     = ("binance", "bybit")
 
-EXCHANGE_FACTORIES = {
-    "binance": create_binance_client,
-    "bybit":   create_bybit_client,
-    # add "coinbase": create_coinbase_client later if you like
-}
+# symbol, trade size, thresholds and limits live in config/strategy.yaml
+# and can be changed while running (see config/runtime.py)
+CYCLE_MIN_PROFIT = 0.05  # % after fees for a logged cycle
+LATENCY_REPORT_INTERVAL = 60.0   # seconds between histogram dumps
 
-TRADE_AMOUNT = 0.001  # BTC per leg
+# amount each open position was entered with, so a later `trade_amount`
+# change never closes a different size
+opened = {}
 
 # ─── Callback hooks ──────────────────────────────────────────────────────────
-def on_open(low_ex: str, high_ex: str, spread: float):
-    logger.info(f"OPEN ▸ buy on {low_ex}, sell on {high_ex}  (spread={spread:.2f} %)")
-    open_position(clients, low_ex, high_ex, "BTC/USDT", TRADE_AMOUNT)
+async def on_open(low_ex: str, high_ex: str, spread: float, symbol: Optional[str] = None):
+    symbol = symbol or runtime.started_with.symbol
+    # the reservation holds the size and the ask it was admitted at; the
+    # price lets the order be checked against the venues' minimum notional
+    pos = runtime.positions.get(symbol, low_ex, high_ex) if runtime.positions else None
+    amount = opened[(symbol, low_ex, high_ex)] = pos.amount if pos else runtime.trade_amount
+    logger.info("OPEN ▸ %s buy on %s, sell on %s  (spread=%.2f %%)", symbol, low_ex, high_ex, spread)
+    result = await open_position(clients, low_ex, high_ex, symbol, amount, pos.price if pos else None)
+    if not result.ok and not result.unknown:   # monitor_spread releases the reservation
+        opened.pop((symbol, low_ex, high_ex), None)
+    return result
+
+async def on_close(low_ex: str, high_ex: str, spread: float, symbol: Optional[str] = None):
+    symbol = symbol or runtime.started_with.symbol
+    amount = opened.pop((symbol, low_ex, high_ex), runtime.trade_amount)
+    logger.info("CLOSE ▸ %s exiting %s/%s  (spread %.2f %%)", symbol, low_ex, high_ex, spread)
+    return await close_position(clients, low_ex, high_ex, symbol, amount)
 
-def on_close(low_ex: str, high_ex: str, spread: float):
-    logger.info(f"CLOSE ▸ exiting {low_ex}/{high_ex}  (spread {spread:.2f} %)")
-    close_position(clients, low_ex, high_ex, "BTC/USDT", TRADE_AMOUNT)
+def on_cycle(cycle):
+    logger.info("CYCLE ▸ %s", cycle)
 
 # ─── Main routine ────────────────────────────────────────────────────────────
 def main() -> None:
-    global logger, clients
+    global logger, clients, runtime
+    parser = argparse.ArgumentParser(description="Cross-exchange arbitrage bot")
+    parser.add_argument("--scan", action="store_true",
+                        help="scan every symbol shared by all exchanges")
+    parser.add_argument("--cycles", action="store_true",
+                        help="watch every market for profitable currency cycles")
+    parser.add_argument("--venues", nargs="+", default=list(DEFAULT_VENUES),
+                        choices=list(EXCHANGE_FACTORIES),
+                        help="exchanges to connect (default: binance bybit)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="shard every shared symbol over N worker processes")
+    parser.add_argument("--record", action="store_true",
+                        help="record every quote into data/raw")
+    parser.add_argument("--simulate", action="store_true",
+                        help="trade against the local paper exchange (no network, no keys)")
+    parser.add_argument("--sim-rate", type=float, default=2000.0,
+                        help="simulated book updates per second per venue")
+    parser.add_argument("--control-port", type=int, default=CONTROL_PORT,
+                        help="local control / stats endpoint port (0 = off)")
+    args = parser.parse_args()
+
     logger = get_logger(LOGGER_NAME)
     logger.info("Starting arbitrage bot")
+    try:
+        runtime = Runtime()
+    except Exception as exc:
+        logger.error(f"Failed to load strategy params: {exc}")
+        return
+    params = runtime.params
+
+    loop = asyncio.get_event_loop()
+    sim, factories = None, EXCHANGE_FACTORIES
+    if args.simulate:
+        sim = ExchangeSimulator(SimConfig(symbols=(params.symbol, "ETH/USDT"), quotes_per_sec=args.sim_rate))
+        loop.run_until_complete(sim.start())
+        # keep simulated listings out of the real market cache
+        MARKETS.path = Path(tempfile.mkdtemp(prefix="sim-markets-")) / "markets.json"
+        factories = sim.factories()
+        args.venues = list(factories)
 
     # 1) read config ----------------------------------------------------------
     try:
-        cfg = load_exchanges_config()
+        cfg = {n: {} for n in args.venues} if sim else load_exchanges_config()
         logger.info(f"Configs found: {list(cfg)}")
     except Exception as exc:
         logger.error(f"Failed to load configs: {exc}")
@@ -63,12 +144,12 @@ def main() -> None:
 
     # 2) spin-up exchange clients --------------------------------------------
     clients = {}
-    for name in ("binance", "bybit"):
+    for name in args.venues:
         if name not in cfg:
             logger.warning(f"No config for {name}, skip")
             continue
         try:
-            clients[name] = EXCHANGE_FACTORIES[name](cfg[name])
+            clients[name] = factories[name](cfg[name])
             logger.info(f"Client ready → {name}")
         except Exception as exc:
             logger.error(f"{name} init failed: {exc}")
@@ -77,27 +158,100 @@ def main() -> None:
         logger.error("Need at least two exchanges, aborting.")
         return
 
-    # 3) pre-load markets so CCXT orders work ---------------------------------
-    for n, c in clients.items():
-        try:
-            c.load_markets()
-            logger.info(f"Markets loaded for {n}")
-        except Exception as exc:
-            logger.warning(f"Couldn’t load markets for {n}: {exc}")
+    # 3) market metadata from disk; stale venues refresh in the background ----
+    MARKETS.load()
+    market_refresh = loop.create_task(MARKETS.run(clients))
+    cached = {n: len(MARKETS.markets(n)) for n in clients}
+    logger.info(f"Market cache: {cached}, refreshing {MARKETS.stale(clients)}")
 
-    # 4) fire-up spread monitor ----------------------------------------------
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(
-        monitor_spread(
+    # 4) balances once up front, then refreshed in the background -----------
+    positions = PositionManager(clients, max_positions=params.max_positions,
+                                max_per_symbol=params.max_per_symbol)
+    runtime.bind(positions=positions, clients=clients)
+    runtime.exchanges = cfg
+    if sim is not None:
+        runtime.exchanges_path = None            # no keys to rotate
+    loop.run_until_complete(positions.refresh())
+
+    # 5) fire-up spread monitor / scanner ------------------------------------
+    recorder = TickRecorder() if args.record else None
+    if args.scan:
+        runner = monitor_scanner(
             clients         = clients,
-            symbol          = "BTC/USDT",
-            threshold_open  = 0.2,     # open ≥ 0 .2 %
-            threshold_close = 0.1,     # close ≤ 0 .1 %
+            threshold_open  = params.threshold_open,
+            threshold_close = params.threshold_close,
+            on_open         = on_open,
+            on_close        = on_close,
+            poll_interval   = params.poll_interval,
+            recorder        = recorder,
+        )
+    elif args.workers:
+        symbols = loop.run_until_complete(shared_symbols(clients))
+        # workers quote depth and get positions sized for the startup amount
+        runtime.depth_amount = params.trade_amount
+        runner = supervise(
+            cfg             = {n: cfg[n] for n in clients},
+            factories       = factories,
+            symbols         = symbols,
+            workers         = args.workers,
+            threshold_open  = params.threshold_open,
+            threshold_close = params.threshold_close,
             on_open         = on_open,
             on_close        = on_close,
-            poll_interval   = 1.0,     # seconds
+            poll_interval   = params.poll_interval,
+            amount          = params.trade_amount,
+            recorder        = recorder,
+            max_quote_age   = params.max_quote_age,
+            positions       = positions,
+        )
+    elif args.cycles:
+        runner = monitor_cycles(
+            clients         = clients,
+            on_cycle        = on_cycle,
+            min_profit_pct  = CYCLE_MIN_PROFIT,
+            poll_interval   = params.poll_interval,
+            recorder        = recorder,
         )
-    )
+    else:
+        runner = monitor_spread(
+            clients         = clients,
+            symbol          = params.symbol,
+            threshold_open  = params.threshold_open,
+            threshold_close = params.threshold_close,
+            on_open         = on_open,
+            on_close        = on_close,
+            poll_interval   = params.poll_interval,
+            amount          = params.trade_amount,    # depth-aware fill prices
+            recorder        = recorder,
+            max_quote_age   = params.max_quote_age,
+            positions       = positions,
+            runtime         = runtime,
+        )
+    if recorder is not None:
+        flusher = loop.create_task(recorder.run())
+    reporter = loop.create_task(latency.report(LATENCY_REPORT_INTERVAL))
+    limits   = loop.create_task(rate_limit.report(LATENCY_REPORT_INTERVAL))
+    clock_sync = loop.create_task(CLOCKS.run(clients))
+    balances = loop.create_task(positions.run())
+    watcher  = loop.create_task(runtime.watch())
+    control  = loop.run_until_complete(runtime.serve(port=args.control_port)) if args.control_port else None
+    try:
+        loop.run_until_complete(runner)
+    finally:
+        reporter.cancel()
+        limits.cancel()
+        clock_sync.cancel()
+        market_refresh.cancel()
+        balances.cancel()
+        watcher.cancel()
+        if control is not None:
+            loop.run_until_complete(control.cleanup())
+        if recorder is not None:
+            flusher.cancel()
+            recorder.close()
+        loop.run_until_complete(close_session())
+        if sim is not None:
+            loop.run_until_complete(sim.stop())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,105 @@
+"""
+Per-call latency of the Bybit REST client against a local aiohttp mock.
+
+Compares the old path (module-level `requests` in the default executor,
+a new connection per call) with the pooled `AsyncBybitRestClient`.
+
+    python -m scripts.bench_http --calls 2000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import requests
+from aiohttp import web
+
+from exchanges import rate_limit
+from exchanges.bybit import AsyncBybitRestClient
+from exchanges.http import close_session
+
+TICKER = {"retCode": 0, "result": {"list": [{"symbol": "BTCUSDT", "lastPrice": "65000.1"}]}}
+ORDER  = {"retCode": 0, "result": {"orderId": "1", "orderLinkId": ""}}
+
+
+async def _start_mock(port: int) -> web.AppRunner:
+    async def tickers(_):
+        return web.json_response(TICKER)
+
+    async def order(request):
+        await request.read()
+        return web.json_response(ORDER)
+
+    app = web.Application()
+    app.router.add_get("/v5/market/tickers", tickers)
+    app.router.add_post("/v5/order/create", order)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+def _pct(samples, q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] * 1e3
+
+
+async def _measure(label: str, call, calls: int, concurrency: int) -> None:
+    samples = []
+
+    async def worker(n: int):
+        for _ in range(n):
+            t0 = time.perf_counter()
+            await call()
+            samples.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(calls // concurrency) for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    print(f"{label:<28} p50={_pct(samples, .50):7.3f} ms  p99={_pct(samples, .99):7.3f} ms  "
+          f"{len(samples) / wall:8.0f} calls/s")
+
+
+async def run(calls: int, concurrency: int, port: int) -> None:
+    runner = await _start_mock(port)
+    base = f"http://127.0.0.1:{port}"
+    rate_limit.VENUE_LIMITS["127.0.0.1"] = (1e9, 1e9)   # measure the transport, not the limiter
+    loop = asyncio.get_running_loop()
+    client = AsyncBybitRestClient("key", "secret", base=base)
+
+    def legacy_ticker():
+        res = requests.get(f"{base}/v5/market/tickers",
+                           params={"symbol": "BTCUSDT", "category": "spot"}, timeout=5)
+        return res.json()
+
+    def legacy_order():
+        res = requests.post(f"{base}/v5/order/create",
+                            data=json.dumps({"symbol": "BTCUSDT"}), timeout=5)
+        return res.json()
+
+    try:
+        await _measure("ticker  requests+executor",
+                       lambda: loop.run_in_executor(None, legacy_ticker), calls, concurrency)
+        await _measure("ticker  aiohttp pool",
+                       lambda: client.fetch_ticker("BTC/USDT"), calls, concurrency)
+        await _measure("order   requests+executor",
+                       lambda: loop.run_in_executor(None, legacy_order), calls, concurrency)
+        await _measure("order   aiohttp pool",
+                       lambda: client.create_market_buy_order("BTC/USDT", 0.001), calls, concurrency)
+    finally:
+        await close_session()
+        await runner.cleanup()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--calls",       type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--port",        type=int, default=18080)
+    args = ap.parse_args()
+    asyncio.run(run(args.calls, args.concurrency, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Microbenchmark for OrderBook diff application and VWAP fill estimation.
+
+Diffs are Binance/Bybit-shaped ([["price", "qty"], ...] strings), clustered
+near the touch like real depth streams.
+
+    python -m scripts.bench_order_book --levels 1000 --diffs 200000
+"""
+
+import argparse
+import random
+import time
+
+from exchanges.order_book import OrderBook
+
+
+def synthetic_diffs(n: int, levels: int, tick: float = 0.01, mid: float = 65000.0, seed: int = 3):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        side = rng.random() < 0.5
+        depth = int(rng.expovariate(1 / 20)) % levels
+        price = mid - tick * (depth + 1) if side else mid + tick * (depth + 1)
+        qty = 0.0 if rng.random() < 0.3 else round(rng.uniform(0.001, 2.0), 3)
+        level = [[f"{price:.2f}", f"{qty}"]]
+        out.append((level, []) if side else ([], level))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--levels", type=int, default=1000)
+    ap.add_argument("--diffs",  type=int, default=200_000)
+    ap.add_argument("--amount", type=float, default=0.5)
+    args = ap.parse_args()
+
+    mid, tick = 65000.0, 0.01
+    book = OrderBook(max_depth=args.levels)
+    book.apply_snapshot(
+        [[f"{mid - tick * (i + 1):.2f}", "1.0"] for i in range(args.levels)],
+        [[f"{mid + tick * (i + 1):.2f}", "1.0"] for i in range(args.levels)],
+    )
+    diffs = synthetic_diffs(args.diffs, args.levels, tick, mid)
+
+    t0 = time.perf_counter()
+    for bids, asks in diffs:
+        book.apply_diff(bids, asks)
+    apply_s = time.perf_counter() - t0
+
+    n_vwap = 100_000
+    t0 = time.perf_counter()
+    for _ in range(n_vwap):
+        book.vwap_buy(args.amount)
+        book.vwap_sell(args.amount)
+    vwap_s = time.perf_counter() - t0
+
+    print(f"apply_diff : {apply_s * 1e6 / len(diffs):6.2f} µs/diff   ({len(book)} levels held)")
+    print(f"vwap x2    : {vwap_s * 1e6 / n_vwap:6.2f} µs/quote  (amount={args.amount})")
+
+
+if __name__ == "__main__":
+    main()
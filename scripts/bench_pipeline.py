@@ -0,0 +1,136 @@
+"""
+End-to-end throughput and latency of the bot against the local paper exchange.
+
+Starts `exchanges.simulator.ExchangeSimulator`, connects the real Binance and
+Bybit adapters to it, and runs `monitor_spread` over the simulated symbols
+with a `PositionManager`, opening and closing positions through
+`execution.trader` exactly like `main.py`. Everything goes over local HTTP /
+WebSocket, so it runs offline. Reports the quote rate the pipeline absorbed,
+the latency histograms the bot records (quote→decision, signal→submit,
+order acks, rate-limit waits) and the simulated fills and slippage. With
+`--depth` the venues stream diff-depth books instead of top of book. The
+simulator serves from its own thread unless `--same-loop` is given.
+
+    python -m scripts.bench_pipeline --seconds 20 --rate 5000 --symbols 6
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from exchanges.http import close_session
+from exchanges.markets import MARKETS
+from exchanges.simulator import START_PRICES, ExchangeSimulator, SimConfig
+from execution.positions import PositionManager
+from execution.trader import close_position, open_position
+from strategies.spread_strategy import monitor_spread
+from utils import latency
+
+
+class _Counter:
+    """Recorder stand-in: counts the quotes that reach the `QuoteStore`."""
+
+    def __init__(self):
+        self.quotes = 0
+
+    def record(self, *_):
+        self.quotes += 1
+
+
+async def bench(args) -> None:
+    symbols = tuple(list(START_PRICES)[:args.symbols])
+    sim = ExchangeSimulator(SimConfig(symbols=symbols, quotes_per_sec=args.rate,
+                                      dislocation_rate=args.dislocation_rate,
+                                      latency_ms=args.order_latency, seed=args.seed))
+    if args.same_loop:
+        await sim.start()
+    else:
+        sim.start_in_thread()
+    MARKETS.path = Path(tempfile.mkdtemp(prefix="sim-markets-")) / "markets.json"
+    clients = sim.adapters()
+    for name, client in clients.items():
+        await MARKETS.refresh(name, client)
+    positions = PositionManager(clients, max_positions=args.max_positions)
+    await positions.refresh()
+
+    amounts = {s: args.notional / START_PRICES[s] for s in symbols}
+    signals = Counter()
+
+    def callbacks(symbol):
+        async def on_open(low, high, spread):
+            signals["open"] += 1
+            pos = positions.get(symbol, low, high)
+            return await open_position(clients, low, high, symbol, amounts[symbol], pos and pos.price)
+
+        async def on_close(low, high, spread):
+            signals["close"] += 1
+            return await close_position(clients, low, high, symbol, amounts[symbol])
+        return on_open, on_close
+
+    counter = _Counter()
+    latency.snapshot_all(reset=True)
+    # one monitor per symbol, so each reserves (and with --depth, quotes) its own size
+    runner = asyncio.gather(*(monitor_spread(
+        clients, sym, args.threshold_open, args.threshold_close, *callbacks(sym),
+        amount=amounts[sym], depth=args.depth,
+        recorder=counter, max_quote_age=2.0, positions=positions) for sym in symbols))
+    balances = asyncio.ensure_future(positions.run())
+    await asyncio.sleep(args.warmup)
+    q0, u0, t0 = counter.quotes, sim.updates, time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    elapsed = time.perf_counter() - t0
+    quotes, updates = counter.quotes - q0, sim.updates - u0
+    hists = latency.snapshot_all()
+    for t in (runner, balances):
+        t.cancel()
+    await asyncio.gather(runner, balances, return_exceptions=True)
+    await close_session()
+    if args.same_loop:
+        await sim.stop()
+    else:
+        sim.stop_thread()
+
+    print(f"{len(symbols)} symbols × 2 venues, {args.rate:.0f} book updates/s per venue, "
+          f"{elapsed:.1f}s measured")
+    print(f"generated {updates / elapsed:9.0f} updates/s   "
+          f"into the store {quotes / elapsed:9.0f} quotes/s   "
+          f"signals {dict(signals)}")
+    print(f"{'histogram':<34} {'count':>7} {'p50 µs':>9} {'p99 µs':>9} {'max µs':>10}")
+    for name, h in sorted(hists.items()):
+        print(f"{name:<34} {h['count']:>7} {h['p50']:>9.1f} {h['p99']:>9.1f} {h['max']:>10.1f}")
+    fills = sim.fills
+    if fills:
+        slip = [abs(f["price"] / f["top"] - 1) * 1e4 for f in fills]
+        by_venue = Counter(f["venue"] for f in fills)
+        print(f"fills {len(fills)} {dict(by_venue)}   slippage vs top of book: "
+              f"mean {sum(slip) / len(slip):.2f} bps, max {max(slip):.2f} bps")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--seconds",          type=float, default=10.0)
+    ap.add_argument("--warmup",           type=float, default=2.0)
+    ap.add_argument("--rate",             type=float, default=2000.0, help="updates/s per venue")
+    ap.add_argument("--symbols",          type=int,   default=3, choices=range(1, len(START_PRICES) + 1))
+    ap.add_argument("--notional",         type=float, default=500.0, help="USDT per leg")
+    ap.add_argument("--threshold-open",   type=float, default=0.2)
+    ap.add_argument("--threshold-close",  type=float, default=0.1)
+    ap.add_argument("--dislocation-rate", type=float, default=0.002)
+    ap.add_argument("--order-latency",    type=float, default=5.0, help="ms")
+    ap.add_argument("--max-positions",    type=int,   default=4)
+    ap.add_argument("--depth",            action="store_true",
+                    help="stream full books (depth-weighted prices) instead of top of book")
+    ap.add_argument("--same-loop",        action="store_true",
+                    help="run the simulator on the bot's event loop instead of its own thread")
+    ap.add_argument("--seed",             type=int,   default=1)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Throughput of the sharded supervisor path on a local synthetic feed.
+
+Each worker process decodes Binance-shaped bookTicker JSON for its shard of
+symbols, runs it through a `SpreadEngine` and publishes quotes and signals
+into its shared-memory ring; the parent drains every ring like
+`strategies.supervisor.supervise` does. Every worker gets the same number of
+messages, so with enough cores the aggregate rate should grow ~linearly.
+
+    python -m scripts.bench_sharding --workers 1,2,4 --symbols 400 --messages 200000
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+
+from strategies.spread_engine import SpreadEngine
+from strategies.supervisor import QUOTE, RECORD, RingPublisher, shard
+from utils.shm_ring import ShmRing
+
+VENUES = ("binance", "bybit")
+DONE = 255
+CAPACITY = 1 << 16
+
+
+def synthetic_messages(symbols, n: int, seed: int):
+    rng = random.Random(seed)
+    mids = {s: 10 + rng.random() * 1000 for s in symbols}
+    out = []
+    for _ in range(n):
+        sym = rng.choice(symbols)
+        mids[sym] *= 1 + rng.gauss(0, 2e-4)
+        mid = mids[sym] * (1 + rng.gauss(0, 1e-3))
+        out.append((rng.choice(VENUES), json.dumps({
+            "u": rng.randrange(10**9), "s": sym.replace("/", ""),
+            "b": f"{mid * 0.99995:.8f}", "B": "1.00000000",
+            "a": f"{mid * 1.00005:.8f}", "A": "1.00000000",
+        })))
+    return out
+
+
+def _feed_worker(ring_name: str, symbols, shard_symbols, n: int, seed: int, barrier) -> None:
+    ring = ShmRing.attach(ring_name, RECORD, CAPACITY)
+    pub = RingPublisher(ring, VENUES, symbols)
+    pairs = {s.replace("/", ""): s for s in shard_symbols}
+    msgs = synthetic_messages(shard_symbols, n, seed)
+    engine = SpreadEngine(0.2, 0.1)
+    barrier.wait()
+    for venue, raw in msgs:
+        d = json.loads(raw)
+        sym = pairs[d["s"]]
+        bid, ask = float(d["b"]), float(d["a"])
+        while not ring.push(QUOTE, pub.venue_code[venue], 0, pub.symbol_code[sym],
+                            bid, ask, time.time()):
+            time.sleep(0)
+        for sig in engine.update_all(sym, venue, bid, ask):
+            while not pub.signal(1 if sig.kind == "open" else 2, sig.low, sig.high,
+                                 sig.spread, sym):
+                time.sleep(0)
+    while not ring.push(DONE, 0, 0, 0, 0.0, 0.0, 0.0):
+        time.sleep(0)
+    ring.close()
+
+
+def run(workers: int, symbols, n: int):
+    ctx = mp.get_context("spawn")
+    shards = shard(symbols, workers)
+    rings = [ShmRing.create(RECORD, CAPACITY) for _ in shards]
+    barrier = ctx.Barrier(workers + 1)
+    procs = [ctx.Process(target=_feed_worker,
+                         args=(r.name, symbols, s, n, i, barrier))
+             for i, (r, s) in enumerate(zip(rings, shards))]
+    for p in procs:
+        p.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    quotes = signals = done = 0
+    while done < workers:
+        idle = True
+        for ring in rings:
+            for kind, *_ in ring.pop_all():
+                idle = False
+                if kind == QUOTE:
+                    quotes += 1
+                elif kind == DONE:
+                    done += 1
+                else:
+                    signals += 1
+        if idle:
+            time.sleep(0.0002)
+    elapsed = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+    for r in rings:
+        r.close()
+    return quotes, signals, elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--workers",  default="1,2,4")
+    ap.add_argument("--symbols",  type=int, default=400)
+    ap.add_argument("--messages", type=int, default=200_000, help="per worker")
+    args = ap.parse_args()
+
+    symbols = [f"S{i}/USDT" for i in range(args.symbols)]
+    print(f"{os.cpu_count()} CPUs")
+    base = None
+    for w in (int(x) for x in args.workers.split(",")):
+        quotes, signals, elapsed = run(w, symbols, args.messages)
+        rate = quotes / elapsed
+        base = base or rate / w
+        print(f"{w:>3} workers: {rate:>12,.0f} quotes/s  ({signals} signals)  "
+              f"scaling {rate / base:.2f}x of {w}")
+
+
+if __name__ == "__main__":
+    main()
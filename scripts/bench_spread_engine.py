@@ -0,0 +1,90 @@
+"""
+Benchmark the incremental SpreadEngine against the naive O(n²) pair scan.
+
+Synthetic quote stream: every venue random-walks around a shared mid price;
+each update moves one (symbol, venue).
+
+    python -m scripts.bench_spread_engine --venues 8 --symbols 50 --updates 500000
+"""
+
+import argparse
+import random
+import time
+
+from strategies.spread_engine import SpreadEngine
+
+
+def synthetic_updates(n_venues: int, n_symbols: int, n_updates: int, seed: int = 7):
+    rng = random.Random(seed)
+    venues  = [f"v{i}" for i in range(n_venues)]
+    symbols = [f"S{i}/USDT" for i in range(n_symbols)]
+    mids = {s: 100.0 + 10 * i for i, s in enumerate(symbols)}
+    out = []
+    for _ in range(n_updates):
+        sym = rng.choice(symbols)
+        mids[sym] *= 1 + rng.gauss(0, 2e-4)
+        mid = mids[sym] * (1 + rng.gauss(0, 1e-3))
+        half = mid * 5e-5
+        out.append((sym, rng.choice(venues), mid - half, mid + half))
+    return out
+
+
+def run_engine(updates, threshold_open: float, threshold_close: float):
+    engine = SpreadEngine(threshold_open, threshold_close)
+    signals = 0
+    t0 = time.perf_counter()
+    for sym, venue, bid, ask in updates:
+        if engine.update(sym, venue, bid, ask) is not None:
+            signals += 1
+    return time.perf_counter() - t0, signals
+
+
+def run_naive(updates, threshold_open: float, threshold_close: float):
+    quotes = {}
+    positions = {}
+    signals = 0
+    t0 = time.perf_counter()
+    for sym, venue, bid, ask in updates:
+        book = quotes.setdefault(sym, {})
+        book[venue] = (bid, ask)
+        if len(book) < 2:
+            continue
+        pos = positions.get(sym)
+        if pos is not None:
+            b, a = book[pos[1]][0], book[pos[0]][1]
+            if (b - a) / a * 100 <= threshold_close:
+                positions[sym] = None
+                signals += 1
+            continue
+        best, best_pair = None, None
+        for ex1, (_, a) in book.items():
+            for ex2, (b, _) in book.items():
+                if ex1 == ex2:
+                    continue
+                s = (b - a) / a * 100
+                if best is None or s > best:
+                    best, best_pair = s, (ex1, ex2)
+        if best >= threshold_open:
+            positions[sym] = best_pair
+            signals += 1
+    return time.perf_counter() - t0, signals
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--venues",  type=int, default=8)
+    ap.add_argument("--symbols", type=int, default=50)
+    ap.add_argument("--updates", type=int, default=500_000)
+    ap.add_argument("--open",    type=float, default=0.2)
+    ap.add_argument("--close",   type=float, default=0.1)
+    args = ap.parse_args()
+
+    updates = synthetic_updates(args.venues, args.symbols, args.updates)
+    for name, fn in (("engine", run_engine), ("naive", run_naive)):
+        elapsed, signals = fn(updates, args.open, args.close)
+        print(f"{name:>6}: {len(updates) / elapsed:>12,.0f} updates/s  "
+              f"({elapsed * 1e6 / len(updates):.2f} µs/update, {signals} signals)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark incremental negative-cycle detection in ArbGraph.
+
+Synthetic market: assets with a hidden fair price, every venue lists each
+asset against a few quote assets plus random crosses, quotes jitter around
+fair with a small spread and now and then one is knocked off fair to open a
+cycle. update() and the settle() that finishes deferred repairs are timed
+separately; the run is replayed `--repeat` times and each update keeps its
+fastest time, so host preemption does not show up as the worst case. A sample of updates is cross-checked against a full Bellman-Ford.
+
+    python -m scripts.bench_triangular --venues 3 --edges 2000 --updates 200000
+"""
+
+import argparse
+import math
+import random
+import time
+
+from strategies.triangular import INF, REPAIR_BUDGET, ArbGraph
+
+QUOTES = ("USDT", "BTC", "ETH")
+
+
+def synthetic_markets(n_venues: int, n_edges: int, seed: int = 11):
+    rng = random.Random(seed)
+    per_venue = n_edges // (2 * n_venues)
+    n_assets = max(4, per_venue // 2)
+    fair = {"USDT": 1.0, "BTC": 65000.0, "ETH": 3500.0}
+    for i in range(n_assets):
+        fair[f"A{i}"] = math.exp(rng.uniform(-4, 6))
+    assets = list(fair)
+    markets = []
+    for v in range(n_venues):
+        pairs = set()
+        for a in assets:
+            for q in QUOTES:
+                if a != q and len(pairs) < per_venue and (a, q) not in pairs and (q, a) not in pairs:
+                    pairs.add((a, q))
+                    break
+        while len(pairs) < per_venue:
+            a, q = rng.sample(assets, 2)
+            if (q, a) not in pairs:
+                pairs.add((a, q))
+        markets += [(f"v{v}", f"{a}/{q}") for a, q in sorted(pairs)]
+    return fair, markets
+
+
+def synthetic_updates(fair, markets, n_updates: int, shock_rate: float, seed: int = 5):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n_updates):
+        venue, symbol = rng.choice(markets)
+        base, quote = symbol.split("/")
+        mid = fair[base] / fair[quote] * (1 + rng.gauss(0, 2e-4))
+        if rng.random() < shock_rate:
+            mid *= 1 + rng.choice((-1, 1)) * rng.uniform(0.003, 0.01)
+        half = mid * 1e-4
+        out.append((venue, symbol, mid - half, mid + half))
+    return out
+
+
+def bellman_ford_has_cycle(graph: ArbGraph) -> bool:
+    n = len(graph.assets)
+    edges = [(e.u, e.v, e.w) for pair in graph.markets.values() for e in pair if e.w < INF]
+    d = [0.0] * n
+    for _ in range(n):
+        changed = False
+        for u, v, w in edges:
+            if d[u] + w < d[v] - 1e-12:
+                d[v] = d[u] + w
+                changed = True
+        if not changed:
+            return False
+    return True
+
+
+def build(fair, markets, args) -> ArbGraph:
+    graph = ArbGraph(args.fee, repair_budget=args.budget)
+    for venue, symbol, bid, ask in synthetic_updates(fair, markets, len(markets), 0.0, seed=1):
+        graph.update(venue, symbol, bid, ask)
+    for venue, symbol in markets:       # every market quoted at least once
+        base, quote = symbol.split("/")
+        mid = fair[base] / fair[quote]
+        graph.update(venue, symbol, mid * (1 - 1e-4), mid * (1 + 1e-4))
+    graph.settle()
+    return graph
+
+
+def replay(graph: ArbGraph, updates):
+    """(update times, settle times, cycles from update, cycles from settle), ns."""
+    times = []
+    settles = []
+    found = late = 0
+    clock = time.perf_counter_ns
+    for venue, symbol, bid, ask in updates:
+        t = clock()
+        found += len(graph.update(venue, symbol, bid, ask))
+        times.append(clock() - t)
+        if graph.deferred:
+            t = clock()
+            late += len(graph.settle())
+            settles.append(clock() - t)
+    return times, settles, found, late
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--venues",  type=int, default=3)
+    ap.add_argument("--edges",   type=int, default=2000)
+    ap.add_argument("--updates", type=int, default=200_000)
+    ap.add_argument("--shock",   type=float, default=0.001, help="share of dislocated quotes")
+    ap.add_argument("--fee",     type=float, default=0.10)
+    ap.add_argument("--check",   type=int, default=300, help="updates cross-checked with Bellman-Ford")
+    ap.add_argument("--budget",  type=int, default=REPAIR_BUDGET, help="edges scanned per update")
+    ap.add_argument("--repeat",  type=int, default=2, help="replays; each update keeps its fastest time")
+    args = ap.parse_args()
+
+    fair, markets = synthetic_markets(args.venues, args.edges, )
+    t0 = time.perf_counter()
+    graph = build(fair, markets, args)
+    print(f"built {len(graph)} edges over {len(graph.assets)} assets "
+          f"in {(time.perf_counter() - t0) * 1e3:.1f} ms")
+
+    updates = synthetic_updates(fair, markets, args.updates, args.shock)
+    runs = []
+    for i in range(args.repeat):
+        if i:
+            graph = build(fair, markets, args)
+        runs.append(replay(graph, updates))
+    # every run applies the same updates to the same graph, so per-update
+    # minimum across runs drops host preemption but keeps the algorithm's work
+    times = sorted(map(min, zip(*(r[0] for r in runs))))
+    settles, found, late = runs[0][1:]
+    n = len(times)
+    print(f"{n:,} updates (best of {args.repeat}): mean {sum(times) / n / 1e3:.1f} µs  "
+          f"p50 {times[n // 2] / 1e3:.1f} µs  p99 {times[int(n * 0.99)] / 1e3:.1f} µs  "
+          f"p99.9 {times[int(n * 0.999)] / 1e3:.1f} µs  max {times[-1] / 1e3:.1f} µs")
+    if settles:
+        settles.sort()
+        print(f"{len(settles):,} deferred repairs ({len(settles) / n:.3%} of updates): "
+              f"settle p50 {settles[len(settles) // 2] / 1e3:.1f} µs  max {settles[-1] / 1e3:.1f} µs, "
+              f"{late} cycles found there")
+    print(f"{found + late} cycles opened, {len(graph.clamped)} open at the end")
+
+    mismatches = 0
+    bf_time = 0.0
+    for venue, symbol, bid, ask in updates[:args.check]:
+        graph.update(venue, symbol, bid, ask)
+        graph.settle()
+        t = time.perf_counter()
+        expected = bellman_ford_has_cycle(graph)
+        bf_time += time.perf_counter() - t
+        mismatches += expected != bool(graph.clamped)
+    if args.check:
+        print(f"Bellman-Ford per update: {bf_time / args.check * 1e3:.2f} ms, "
+              f"{mismatches} mismatches in {args.check} checked updates")
+
+
+if __name__ == "__main__":
+    main()
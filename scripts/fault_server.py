@@ -0,0 +1,157 @@
+"""
+Fault-injecting mock venue for the resilient transport.
+
+Serves Binance-shaped `/api/v3/ticker/bookTicker` and `/api/v3/time` with
+configurable latency, slow tail, 503 errors and stalls (requests that never
+answer). Faults can be changed at runtime with
+`GET /fault?error_rate=0.5&stall_rate=0&tail_rate=0.05`.
+
+Without `--serve`, starts one healthy and one degraded venue locally and
+polls both through `exchanges.http.get_json` concurrently, then prints each
+venue's latency and outcome counts plus the hedge / retry / breaker stats –
+the healthy venue should be unaffected by its neighbour.
+
+    python -m scripts.fault_server --seconds 10 --error-rate 0.3 --stall-rate 0.05
+    python -m scripts.fault_server --serve --port 18090 --error-rate 0.2
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+from aiohttp import web
+
+from exchanges import rate_limit, resilience
+from exchanges.http import close_session, get_json
+
+
+class Faults:
+    def __init__(self, latency_ms: float = 2.0, tail_ms: float = 800.0, tail_rate: float = 0.0,
+                 error_rate: float = 0.0, stall_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.tail_ms = tail_ms
+        self.tail_rate = tail_rate
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+
+    async def inject(self) -> None:
+        r = random.random()
+        if r < self.stall_rate:
+            await asyncio.sleep(3600)
+        if r < self.stall_rate + self.error_rate:
+            raise web.HTTPServiceUnavailable()
+        slow = random.random() < self.tail_rate
+        await asyncio.sleep((self.tail_ms if slow else self.latency_ms) / 1e3)
+
+
+async def start(faults: Faults, host: str, port: int) -> web.AppRunner:
+    async def book_ticker(request):
+        await faults.inject()
+        bid = 65000 + random.random()
+        return web.json_response({"symbol": request.query.get("symbol", "BTCUSDT"),
+                                  "bidPrice": f"{bid:.2f}", "bidQty": "1.0",
+                                  "askPrice": f"{bid + 0.01:.2f}", "askQty": "1.0"})
+
+    async def server_time(_):
+        await faults.inject()
+        return web.json_response({"serverTime": int(time.time() * 1000)})
+
+    async def fault(request):
+        for k, v in request.query.items():
+            if hasattr(faults, k):
+                setattr(faults, k, float(v))
+        return web.json_response(vars(faults))
+
+    app = web.Application()
+    app.router.add_get("/api/v3/ticker/bookTicker", book_ticker)
+    app.router.add_get("/api/v3/time", server_time)
+    app.router.add_get("/fault", fault)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def _pct(samples, q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] * 1e3 if samples else float("nan")
+
+
+async def _poll(url: str, tag: int, seconds: float, interval: float, samples, outcomes: Counter) -> None:
+    end = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < end:
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            # a distinct symbol per call, so coalescing doesn't hide the faults
+            await get_json(url, params={"symbol": f"S{tag}X{i}USDT"})
+            outcomes["ok"] += 1
+        except resilience.CircuitOpen:
+            outcomes["circuit_open"] += 1
+        except Exception as exc:
+            outcomes[type(exc).__name__] += 1
+        samples.append(time.perf_counter() - t0)
+        await asyncio.sleep(interval)
+
+
+async def demo(args) -> None:
+    healthy = Faults(args.latency, args.tail_ms, args.tail_rate)
+    degraded = Faults(args.latency, args.tail_ms, max(args.tail_rate, 0.05),
+                      args.error_rate, args.stall_rate)
+    venues = {"healthy": ("127.0.0.1", args.port, healthy),
+              "degraded": ("localhost", args.port + 1, degraded)}
+    runners = [await start(f, h, p) for h, p, f in venues.values()]
+    for host, _, _ in venues.values():
+        rate_limit.VENUE_LIMITS[host] = (1e6, 1e6)
+    stats = {name: ([], Counter()) for name in venues}
+    try:
+        await asyncio.gather(*(
+            _poll(f"http://{h}:{p}/api/v3/ticker/bookTicker", tag, args.seconds, args.interval,
+                  *stats[name])
+            for tag in range(args.pollers)
+            for name, (h, p, _) in venues.items()))
+    finally:
+        await close_session()
+        for r in runners:
+            await r.cleanup()
+
+    for name, (samples, outcomes) in stats.items():
+        print(f"{name:<9} n={len(samples):<6} p50={_pct(samples, .5):8.2f} ms  "
+              f"p99={_pct(samples, .99):8.2f} ms  max={_pct(samples, 1):8.2f} ms  {dict(outcomes)}")
+    s = resilience.stats()
+    print({k: v for k, v in s.items() if not isinstance(v, dict)})
+    for key, b in s["breakers"].items():
+        print(f"  {key:<45} {b}  hedge after {s['hedge_after'].get(key, 0) * 1e3:.1f} ms")
+
+
+async def serve(args) -> None:
+    await start(Faults(args.latency, args.tail_ms, args.tail_rate, args.error_rate, args.stall_rate),
+                "127.0.0.1", args.port)
+    print(f"serving on http://127.0.0.1:{args.port}  (Ctrl-C to stop)")
+    await asyncio.Event().wait()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--serve",      action="store_true", help="only run one mock venue")
+    ap.add_argument("--port",       type=int,   default=18090)
+    ap.add_argument("--seconds",    type=float, default=10.0)
+    ap.add_argument("--pollers",    type=int,   default=4, help="concurrent pollers per venue")
+    ap.add_argument("--interval",   type=float, default=0.01, help="seconds between polls")
+    ap.add_argument("--latency",    type=float, default=2.0, help="ms, normal reply")
+    ap.add_argument("--tail-ms",    type=float, default=800.0, help="ms, slow reply")
+    ap.add_argument("--tail-rate",  type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.3, help="503s (degraded venue)")
+    ap.add_argument("--stall-rate", type=float, default=0.05, help="no reply (degraded venue)")
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args) if args.serve else demo(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
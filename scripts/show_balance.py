@@ -0,0 +1,54 @@
+"""
+Consolidated balance snapshot across every configured exchange.
+
+One `fetch_balance()` per venue, all venues concurrently, printed as an
+asset × venue table of free amounts with a cross-venue total.
+
+    python -m scripts.show_balance
+    python -m scripts.show_balance --venues binance bybit --min 0.0001
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Tuple
+
+from config.loader import load_exchanges_config
+from exchanges.adapter import ADAPTERS
+from exchanges.http import close_session
+from execution.positions import PositionManager
+
+async def snapshot(names: List[str]) -> Tuple[PositionManager, float]:
+    cfg = load_exchanges_config()
+    clients = {n: ADAPTERS[n](cfg[n]) for n in names if n in cfg and n in ADAPTERS}
+    manager = PositionManager(clients)
+    t0 = time.perf_counter()
+    try:
+        await manager.refresh()
+    finally:
+        await close_session()
+    return manager, time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--venues", nargs="+", default=["binance", "bybit"], choices=list(ADAPTERS))
+    ap.add_argument("--min", type=float, default=0.0, help="hide totals below this")
+    args = ap.parse_args()
+
+    manager, elapsed = asyncio.run(snapshot(args.venues))
+    venues = list(manager.clients)
+    totals = manager.totals()
+    print(f"{'asset':<10}" + "".join(f"{v:>18}" for v in venues) + f"{'total':>18}")
+    for asset in sorted(totals):
+        if totals[asset] < args.min:
+            continue
+        row = "".join(f"{manager.free(v, asset):>18.8g}" for v in venues)
+        print(f"{asset:<10}{row}{totals[asset]:>18.8g}")
+    missing = [v for v in venues if v not in manager.refreshed]
+    print(f"\n{len(venues)} venues in {elapsed * 1e3:.0f} ms"
+          + (f" (failed: {', '.join(missing)})" if missing else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Backtester for the spread strategy over ticks recorded in data/raw.
+
+• replay() – streams ticks through the same `SpreadEngine` that drives
+  `monitor_spread`, one update at a time
+• sweep()  – evaluates a whole (threshold_open × threshold_close) grid from
+  per-threshold crossing indices: one vectorised pass over the ticks per
+  threshold, then a few `searchsorted` calls per grid point, so the tick
+  count never multiplies the grid size. Each directed venue pair is
+  evaluated independently (one position per pair, where the engine holds
+  one per symbol), so confirm a chosen grid point with replay().
+
+Cost model, per round trip (4 market fills):
+    pnl % = entry spread + exit spread − 4 × (fee % + slippage %)
+where entry = (bid[high] − ask[low]) / ask[low] and
+      exit  = (bid[low]  − ask[high]) / ask[low] at the close tick.
+
+    python -m strategies.backtest --symbol BTC/USDT --start 2025-07-01
+    python -m strategies.backtest --symbol BTC/USDT --sweep \\
+        --open-grid 0.02:0.5:40 --close-grid -0.2:0.2:25
+"""
+
+import argparse
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from data.recorder import load_ticks
+from strategies.spread_engine import OPEN, SpreadEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEE_PCT      = 0.10   # taker fee per fill, %
+DEFAULT_SLIPPAGE_PCT = 0.02   # extra slippage per fill, %
+
+
+def round_trip_cost(fee_pct: float = DEFAULT_FEE_PCT,
+                    slippage_pct: float = DEFAULT_SLIPPAGE_PCT) -> float:
+    return 4 * (fee_pct + slippage_pct)
+
+
+# ─── Panels ──────────────────────────────────────────────────────────────────
+class QuotePanel:
+    """
+    Forward-filled bid/ask of every venue at every tick of one symbol.
+    `bids` / `asks` have shape (ticks, venues); NaN until a venue first quotes.
+    """
+
+    def __init__(self, ts: np.ndarray, venue: np.ndarray, bid: np.ndarray,
+                 ask: np.ndarray, venues: List[str]):
+        self.ts = ts
+        self.venue = venue
+        self.raw_bid = bid
+        self.raw_ask = ask
+        self.venues = venues
+        n = len(ts)
+        self.bids = np.full((n, len(venues)), np.nan)
+        self.asks = np.full((n, len(venues)), np.nan)
+        rows = np.arange(n)
+        for v in range(len(venues)):
+            last = np.where(venue == v, rows, -1)
+            np.maximum.accumulate(last, out=last)
+            seen = last >= 0
+            self.bids[seen, v] = bid[last[seen]]
+            self.asks[seen, v] = ask[last[seen]]
+
+    def pair_series(self, low: int, high: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Entry and exit % spread series for buying on `low`, selling on `high`."""
+        ask_l, bid_h = self.asks[:, low], self.bids[:, high]
+        entry = (bid_h - ask_l) / ask_l * 100
+        exit_ = (self.bids[:, low] - self.asks[:, high]) / ask_l * 100
+        return entry, exit_
+
+    def pairs(self) -> List[Tuple[int, int]]:
+        n = len(self.venues)
+        return [(i, j) for i in range(n) for j in range(n) if i != j]
+
+
+def load_panel(symbol: str, start: Optional[str] = None, end: Optional[str] = None,
+               ticks: Optional[Dict[str, Any]] = None) -> QuotePanel:
+    """Build a `QuotePanel` for `symbol` from data/raw (or preloaded `ticks`)."""
+    ticks = ticks if ticks is not None else load_ticks(start, end)
+    if symbol not in ticks["symbols"]:
+        raise KeyError(f"no recorded ticks for {symbol}")
+    m = ticks["symbol"] == ticks["symbols"].index(symbol)
+    order = np.argsort(ticks["ts"][m], kind="stable")
+    ts = ticks["ts"][m][order]
+    venue_codes = ticks["venue"][m][order]
+    # compact venue codes to 0..V-1 for this symbol
+    used, venue = np.unique(venue_codes, return_inverse=True)
+    venues = [ticks["venues"][c] for c in used]
+    return QuotePanel(ts, venue, ticks["bid"][m][order], ticks["ask"][m][order], venues)
+
+
+# ─── Event replay ────────────────────────────────────────────────────────────
+def replay(
+    panel: QuotePanel,
+    symbol: str,
+    threshold_open: float,
+    threshold_close: float,
+    cost: float = round_trip_cost(),
+) -> Dict[str, Any]:
+    """
+    Feed every tick into a `SpreadEngine` exactly as `monitor_spread` would
+    and book each OPEN → CLOSE round trip under the cost model.
+    """
+    engine = SpreadEngine(threshold_open, threshold_close)
+    venues = panel.venues
+    quotes: Dict[str, Tuple[float, float]] = {}
+    trades, entry = [], None
+
+    for t, v, bid, ask in zip(panel.ts, panel.venue, panel.raw_bid, panel.raw_ask):
+        name = venues[v]
+        quotes[name] = (bid, ask)
+        sig = engine.update(symbol, name, bid, ask)
+        if sig is None:
+            continue
+        if sig.kind == OPEN:
+            entry = (t, sig.low, sig.high, sig.spread)
+            continue
+        t0, low, high, spread_in = entry
+        bid_l, ask_h = quotes[low][0], quotes[high][1]
+        ask_l_now = quotes[low][1]
+        exit_pct = (bid_l - ask_h) / ask_l_now * 100
+        trades.append((t0, t, low, high, spread_in, exit_pct, spread_in + exit_pct - cost))
+        entry = None
+
+    pnl = np.array([tr[-1] for tr in trades])
+    return {
+        "trades":  trades,
+        "n":       len(trades),
+        "pnl_pct": float(pnl.sum()) if len(pnl) else 0.0,
+        "open":    entry,
+    }
+
+
+# ─── Vectorised sweep ────────────────────────────────────────────────────────
+def _run_starts(mask: np.ndarray) -> np.ndarray:
+    """Indices where `mask` turns True."""
+    starts = mask.copy()
+    starts[1:] &= ~mask[:-1]
+    return np.flatnonzero(starts)
+
+
+def sweep_pair(entry: np.ndarray, exit_: np.ndarray, opens: np.ndarray,
+               closes: np.ndarray, cost: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    P&L % and trade counts, shape (len(opens), len(closes)), for one directed
+    venue pair. Grid points with close ≥ open are NaN / 0. Positions still
+    open at the last tick are marked to market.
+
+    With close < open the "entry ≥ open" and "entry ≤ close" triggers never
+    fire on the same tick, so the engine's state only flips where one of them
+    *starts* a run: an open-run start opens a position iff a close-run
+    started since the previous open-run start, and that position closes at
+    the first close-run start after it. Each grid point therefore costs a
+    couple of `searchsorted` calls over crossing indices, never a tick loop.
+    """
+    n_o, n_c = len(opens), len(closes)
+    pnl = np.full((n_o, n_c), np.nan)
+    trades = np.zeros((n_o, n_c), dtype=np.int64)
+    end = len(entry)
+    if end == 0:
+        return pnl, trades
+
+    open_runs  = [_run_starts(entry >= o) for o in opens]     # NaN compares False
+    close_runs = [_run_starts(entry <= c) for c in closes]
+    last_exit = exit_[end - 1]
+
+    for i, o in enumerate(opens):
+        a = open_runs[i]
+        for j, c in enumerate(closes):
+            if c >= o:
+                continue
+            if not len(a):
+                pnl[i, j] = 0.0
+                continue
+            b = close_runs[j]
+            k = np.searchsorted(b, a)                 # close-runs started before each a
+            is_open = np.empty(len(a), dtype=bool)
+            is_open[0] = True
+            is_open[1:] = k[1:] > k[:-1]
+            t_open = a[is_open]
+            k_open = k[is_open]
+            closed = k_open < len(b)
+            t_close = b[k_open[closed]]
+            total = (entry[t_open].sum() + exit_[t_close].sum()
+                     + last_exit * (~closed).sum() - cost * len(t_open))
+            pnl[i, j] = total
+            trades[i, j] = len(t_open)
+    return pnl, trades
+
+
+def sweep(panel: QuotePanel, opens: Sequence[float], closes: Sequence[float],
+          cost: float = round_trip_cost()) -> Tuple[np.ndarray, np.ndarray]:
+    """Grid P&L % and trade counts summed over every directed venue pair."""
+    opens, closes = np.asarray(opens, float), np.asarray(closes, float)
+    pnl = np.zeros((len(opens), len(closes)))
+    trades = np.zeros_like(pnl, dtype=np.int64)
+    for low, high in panel.pairs():
+        entry, exit_ = panel.pair_series(low, high)
+        p, n = sweep_pair(entry, exit_, opens, closes, cost)
+        pnl += p
+        trades += n
+    return pnl, trades
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────────────
+def _grid(spec: str) -> np.ndarray:
+    lo, hi, n = spec.split(":")
+    return np.linspace(float(lo), float(hi), int(n))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Backtest the spread strategy on data/raw ticks")
+    ap.add_argument("--symbol", default="BTC/USDT")
+    ap.add_argument("--start")
+    ap.add_argument("--end")
+    ap.add_argument("--open",  type=float, default=0.2)
+    ap.add_argument("--close", type=float, default=0.1)
+    ap.add_argument("--fee",      type=float, default=DEFAULT_FEE_PCT)
+    ap.add_argument("--slippage", type=float, default=DEFAULT_SLIPPAGE_PCT)
+    ap.add_argument("--sweep", action="store_true")
+    ap.add_argument("--open-grid",  default="0.02:0.5:40")
+    ap.add_argument("--close-grid", default="-0.2:0.2:25")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-8s %(message)s")
+
+    t0 = time.perf_counter()
+    panel = load_panel(args.symbol, args.start, args.end)
+    cost = round_trip_cost(args.fee, args.slippage)
+    logger.info(f"{len(panel.ts):,} ticks for {args.symbol} on {panel.venues} "
+                f"loaded in {time.perf_counter() - t0:.2f}s")
+
+    if not args.sweep:
+        res = replay(panel, args.symbol, args.open, args.close, cost)
+        logger.info(f"open={args.open} close={args.close}: {res['n']} trades, "
+                    f"P&L {res['pnl_pct']:.4f} %")
+        return
+
+    opens, closes = _grid(args.open_grid), _grid(args.close_grid)
+    t0 = time.perf_counter()
+    pnl, trades = sweep(panel, opens, closes, cost)
+    logger.info(f"{pnl.size} grid points in {time.perf_counter() - t0:.2f}s")
+    ranked = np.argsort(np.nan_to_num(pnl, nan=-np.inf), axis=None)[::-1]
+    for flat in ranked[:10]:
+        i, j = np.unravel_index(flat, pnl.shape)
+        logger.info(f"open={opens[i]:.3f} close={closes[j]:.3f}  "
+                    f"trades={trades[i, j]}  P&L={pnl[i, j]:.4f} %")
+
+
+if __name__ == "__main__":
+    main()
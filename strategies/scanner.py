@@ -0,0 +1,178 @@
+"""
+Multi-symbol scanner.
+
+Watches every symbol listed on all configured venues from one event loop:
+  • one bulk all-tickers request per venue per batch
+  • best bid/ask land in (symbols × venues) NumPy arrays
+  • a (symbols × venues × venues) executable-spread matrix is recomputed per
+    batch and thresholds are applied to every symbol at once
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from exchanges.adapter import ExchangeAdapter
+from utils import latency
+
+logger = logging.getLogger(__name__)
+
+# ─── Bulk tickers ────────────────────────────────────────────────────────────
+async def fetch_all_tickers(
+    name: str,
+    exchange: ExchangeAdapter,
+    symbols: Optional[List[str]] = None,
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Symbol → (bid, ask) for every market on `exchange`: a single request
+    where the venue has a batch endpoint (`Capability.BATCH_TICKERS`),
+    concurrent per-symbol requests otherwise.
+    """
+    t0 = latency.now_ns()
+    out = await exchange.fetch_tickers(symbols)
+    latency.record(f"fetch_all.{exchange.id}", latency.now_ns() - t0)
+    return out
+
+
+async def shared_symbols(clients: Dict[str, ExchangeAdapter]) -> List[str]:
+    """Sorted symbols that every client currently quotes."""
+    names = list(clients)
+    books = await asyncio.gather(*(fetch_all_tickers(n, clients[n]) for n in names))
+    common = set(books[0])
+    for book in books[1:]:
+        common &= set(book)
+    return sorted(common)
+
+
+# ─── Spread matrix ───────────────────────────────────────────────────────────
+class SpreadMatrix:
+    """
+    Best bid/ask per (symbol, venue) and the derived executable spreads.
+
+    `spreads[s, i, j]` is the % spread for buying `symbols[s]` at the ask on
+    `venues[i]` and selling at the bid on `venues[j]`; the diagonal and any
+    missing quote are -inf.
+    """
+
+    def __init__(self, symbols: List[str], venues: List[str]):
+        self.symbols = list(symbols)
+        self.venues  = list(venues)
+        self.index   = {s: k for k, s in enumerate(self.symbols)}
+        shape = (len(self.symbols), len(self.venues))
+        self.bids = np.full(shape, np.nan)
+        self.asks = np.full(shape, np.nan)
+        self.spreads = np.full(shape + (len(self.venues),), -np.inf)
+        self._diag = np.eye(len(self.venues), dtype=bool)
+
+    def load(self, venue_idx: int, tickers: Dict[str, Tuple[float, float]]) -> None:
+        """Overwrite one venue's column from a bulk ticker response."""
+        rows, bids, asks = [], [], []
+        index = self.index
+        for symbol, (bid, ask) in tickers.items():
+            k = index.get(symbol)
+            if k is not None:
+                rows.append(k)
+                bids.append(bid)
+                asks.append(ask)
+        self.bids[:, venue_idx] = np.nan
+        self.asks[:, venue_idx] = np.nan
+        self.bids[rows, venue_idx] = bids
+        self.asks[rows, venue_idx] = asks
+
+    def compute(self) -> np.ndarray:
+        ask = self.asks[:, :, None]
+        bid = self.bids[:, None, :]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sp = (bid - ask) / ask * 100
+        sp[np.isnan(sp)] = -np.inf
+        sp[:, self._diag] = -np.inf
+        self.spreads = sp
+        return sp
+
+    def best(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per symbol: (buy venue idx, sell venue idx, spread)."""
+        n_v = len(self.venues)
+        flat = self.spreads.reshape(len(self.symbols), n_v * n_v)
+        arg = flat.argmax(axis=1)
+        return arg // n_v, arg % n_v, flat[np.arange(len(self.symbols)), arg]
+
+
+# ─── Scanner loop ────────────────────────────────────────────────────────────
+async def monitor_scanner(
+    clients: Dict[str, ExchangeAdapter],
+    threshold_open: float,
+    threshold_close: float,
+    on_open: Callable[..., None],
+    on_close: Callable[..., None],
+    poll_interval: float = 1.0,
+    symbols: Optional[List[str]] = None,
+    recorder: Optional[Any] = None,
+) -> None:
+    """
+    Every *poll_interval* seconds:
+      • pull one bulk ticker snapshot per venue, concurrently
+      • recompute the full spread matrix
+      • fire `on_open(low, high, spread, symbol=...)` /
+        `on_close(low, high, spread, symbol=...)` per symbol on threshold
+        crossings (one position per symbol)
+
+    *symbols* defaults to every symbol shared by all clients; every
+    snapshot row is handed to *recorder* if given.
+    """
+    names = list(clients)
+    if symbols is None:
+        symbols = await shared_symbols(clients)
+    logger.info(f"Scanning {len(symbols)} symbols across {names}")
+    if not symbols:
+        return
+
+    matrix = SpreadMatrix(symbols, names)
+    rows   = np.arange(len(symbols))
+    pos_low  = np.full(len(symbols), -1)
+    pos_high = np.full(len(symbols), -1)
+
+    while True:
+        books = await asyncio.gather(
+            *(fetch_all_tickers(n, clients[n], symbols) for n in names),
+            return_exceptions=True,
+        )
+        for i, (n, book) in enumerate(zip(names, books)):
+            if isinstance(book, Exception):
+                logger.warning("[%s] bulk ticker error: %s", n, book)
+                book = {}
+            matrix.load(i, book)
+            if recorder is not None:
+                ts = time.time()
+                for sym, (bid, ask) in book.items():
+                    recorder.record(n, sym, bid, ask, (bid + ask) / 2, ts)
+
+        t_batch = latency.now_ns()
+        sp = matrix.compute()
+        low, high, best = matrix.best()
+        held = pos_low >= 0
+        latency.record("scan_decision", latency.now_ns() - t_batch)
+
+        # close: held pair's spread has converged
+        held_spread = sp[rows, pos_low, pos_high]
+        closing = held & np.isfinite(held_spread) & (held_spread <= threshold_close)
+        for k in np.flatnonzero(closing):
+            latency.mark("signal")
+            res = on_close(names[pos_low[k]], names[pos_high[k]], float(held_spread[k]),
+                           symbol=symbols[k])
+            if inspect.isawaitable(res):
+                await res
+            pos_low[k] = pos_high[k] = -1
+
+        # open: flat symbols whose best pair crossed the open threshold
+        for k in np.flatnonzero(~held & (best >= threshold_open)):
+            latency.mark("signal")
+            res = on_open(names[low[k]], names[high[k]], float(best[k]), symbol=symbols[k])
+            if inspect.isawaitable(res):
+                await res
+            pos_low[k], pos_high[k] = low[k], high[k]
+
+        await asyncio.sleep(poll_interval)
@@ -0,0 +1,231 @@
+"""
+Incremental cross-venue spread engine.
+
+Keeps, per symbol, a min-heap of asks and a max-heap of bids across venues so
+one venue's quote change costs O(log n) instead of recomputing every pair.
+Signals are edge-triggered: `update` returns an OPEN when the best pair's
+executable spread crosses `threshold_open`, a CLOSE when the open pair's
+spread falls to `threshold_close`, and `None` otherwise. With
+`max_pairs > 1` a symbol may hold that many venue pairs at once and
+`update_all` returns every close plus at most one open per update.
+
+With `max_age`, each quote carries its origin time (local epoch seconds,
+already corrected for exchange clock offset) and venues whose last quote is
+older than `max_age` drop out of the book before every evaluation, so a
+frozen feed can neither open nor close a position.
+"""
+
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+OPEN  = "open"
+CLOSE = "close"
+
+COMPACT_FACTOR = 4    # rebuild a heap once stale entries outnumber live ones
+COMPACT_SLACK  = 64
+
+
+class SpreadSignal:
+    """Open/close decision for one symbol: buy on *low*, sell on *high*."""
+    __slots__ = ("kind", "symbol", "low", "high", "spread")
+
+    def __init__(self, kind: str, symbol: str, low: str, high: str, spread: float):
+        self.kind   = kind
+        self.symbol = symbol
+        self.low    = low
+        self.high   = high
+        self.spread = spread
+
+    def __repr__(self) -> str:
+        return (f"SpreadSignal({self.kind} {self.symbol} "
+                f"{self.low}->{self.high} {self.spread:.4f}%)")
+
+
+class _SymbolBook:
+    """Lazy-deletion heaps over the live quote of every venue for one symbol."""
+    __slots__ = ("live", "asks", "bids", "positions")
+
+    def __init__(self):
+        self.live: Dict[str, Tuple[int, float, float, float]] = {}   # venue → (seq, bid, ask, ts)
+        self.asks: List[Tuple[float, int, str]] = []          # (ask, seq, venue)
+        self.bids: List[Tuple[float, int, str]] = []          # (-bid, seq, venue)
+        self.positions: List[Tuple[str, str]] = []           # open (low, high) pairs
+
+    def _clean(self, heap: List[Tuple[float, int, str]]) -> None:
+        live = self.live
+        while heap:
+            _, seq, venue = heap[0]
+            cur = live.get(venue)
+            if cur is not None and cur[0] == seq:
+                return
+            heapq.heappop(heap)
+
+    def _top2(self, heap) -> Tuple[Optional[tuple], Optional[tuple]]:
+        """Best and second-best live entries of `heap`."""
+        self._clean(heap)
+        if not heap:
+            return None, None
+        first = heapq.heappop(heap)
+        self._clean(heap)
+        second = heap[0] if heap else None
+        heapq.heappush(heap, first)
+        return first, second
+
+    def compact(self) -> None:
+        self.asks = [(ask, seq, v) for v, (seq, _, ask, _) in self.live.items()]
+        self.bids = [(-bid, seq, v) for v, (seq, bid, _, _) in self.live.items()]
+        heapq.heapify(self.asks)
+        heapq.heapify(self.bids)
+
+    def expire(self, cutoff: float) -> None:
+        """Drop venues whose last quote originated before `cutoff`."""
+        stale = [v for v, entry in self.live.items() if entry[3] < cutoff]
+        for v in stale:
+            del self.live[v]
+
+    def pair_spread(self, low: str, high: str) -> Optional[float]:
+        buy, sell = self.live.get(low), self.live.get(high)
+        if buy is None or sell is None:
+            return None
+        return (sell[1] - buy[2]) / buy[2] * 100
+
+    def best_pair(self) -> Optional[Tuple[str, str, float]]:
+        """(low, high, spread) maximising bid[high] - ask[low], low != high."""
+        self._clean(self.asks)
+        self._clean(self.bids)
+        if len(self.live) < 2 or not self.asks or not self.bids:
+            return None
+        ask, _, low = self.asks[0]
+        nbid, _, high = self.bids[0]
+        if low == high:
+            # same venue tops both sides: pair it with the runner-up on either side
+            _, ask2 = self._top2(self.asks)
+            _, bid2 = self._top2(self.bids)
+            cands = []
+            if ask2 is not None:
+                cands.append((ask2[0], -nbid, ask2[2], high))
+            if bid2 is not None:
+                cands.append((ask, -bid2[0], low, bid2[2]))
+            if not cands:
+                return None
+            a, b, low, high = max(cands, key=lambda c: (c[1] - c[0]) / c[0])
+            return low, high, (b - a) / a * 100
+        return low, high, (-nbid - ask) / ask * 100
+
+
+class SpreadEngine:
+    """
+    Running best buy/sell venue per symbol with hysteresis signals.
+
+    • update(symbol, venue, bid, ask, ts=None) → Optional[SpreadSignal]
+    • update_all(...)                  – same, every signal as a list
+    • remove(symbol, venue)            – drop a venue that went stale/offline
+    • release(symbol, low, high)       – forget a position without a signal
+    • best(symbol)                     – current (low, high, spread) or None
+    • configure(...)                   – new thresholds / max age, applied together
+    """
+
+    def __init__(self, threshold_open: float, threshold_close: float,
+                 max_age: Optional[float] = None, max_pairs: int = 1):
+        self.threshold_open  = threshold_open
+        self.threshold_close = threshold_close
+        self.max_age = max_age
+        self.max_pairs = max_pairs
+        self._books: Dict[str, _SymbolBook] = {}
+        self._seq = 0
+
+    def configure(self, threshold_open: float, threshold_close: float,
+                  max_age: Optional[float] = None) -> None:
+        """
+        Swap in new parameters between two updates. Open positions are kept;
+        they close against the new `threshold_close` from the next quote on.
+        """
+        self.threshold_open  = threshold_open
+        self.threshold_close = threshold_close
+        self.max_age = max_age
+
+    def _book(self, symbol: str) -> _SymbolBook:
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _SymbolBook()
+        return book
+
+    def update(self, symbol: str, venue: str, bid: float, ask: float,
+               ts: Optional[float] = None) -> Optional[SpreadSignal]:
+        signals = self.update_all(symbol, venue, bid, ask, ts)
+        return signals[0] if signals else None
+
+    def update_all(self, symbol: str, venue: str, bid: float, ask: float,
+                   ts: Optional[float] = None) -> List[SpreadSignal]:
+        """`ts` is the quote's origin time (epoch seconds); defaults to now."""
+        book = self._book(symbol)
+        self._seq += 1
+        seq = self._seq
+        if ts is None or self.max_age is not None:
+            now = time.time()
+            ts = now if ts is None else ts
+        book.live[venue] = (seq, bid, ask, ts)
+        heapq.heappush(book.asks, (ask, seq, venue))
+        heapq.heappush(book.bids, (-bid, seq, venue))
+        if len(book.asks) > COMPACT_FACTOR * len(book.live) + COMPACT_SLACK:
+            book.compact()
+        if self.max_age is not None:
+            book.expire(now - self.max_age)
+        return self._evaluate(symbol, book, venue)
+
+    def remove(self, symbol: str, venue: str) -> List[SpreadSignal]:
+        book = self._books.get(symbol)
+        if book is None or book.live.pop(venue, None) is None:
+            return []
+        return self._evaluate(symbol, book, None)
+
+    def release(self, symbol: str, low: str, high: str) -> bool:
+        """Drop an open pair, e.g. when its OPEN was refused or failed."""
+        book = self._books.get(symbol)
+        if book is None or (low, high) not in book.positions:
+            return False
+        book.positions.remove((low, high))
+        return True
+
+    def hold(self, symbol: str, low: str, high: str) -> bool:
+        """Mark a pair open without a signal, e.g. one a restarted worker inherits; its CLOSE follows."""
+        book = self._book(symbol)
+        if (low, high) in book.positions:
+            return False
+        book.positions.append((low, high))
+        return True
+
+    def best(self, symbol: str) -> Optional[Tuple[str, str, float]]:
+        book = self._books.get(symbol)
+        return book.best_pair() if book is not None else None
+
+    def position(self, symbol: str) -> Optional[Tuple[str, str]]:
+        """First open pair of `symbol`, or None."""
+        book = self._books.get(symbol)
+        return book.positions[0] if book is not None and book.positions else None
+
+    def open_pairs(self, symbol: str) -> List[Tuple[str, str]]:
+        book = self._books.get(symbol)
+        return list(book.positions) if book is not None else []
+
+    def _evaluate(self, symbol: str, book: _SymbolBook, venue: Optional[str]) -> List[SpreadSignal]:
+        signals = []
+        for low, high in list(book.positions):
+            if venue is not None and venue != low and venue != high:
+                continue
+            spread = book.pair_spread(low, high)
+            if spread is not None and spread <= self.threshold_close:
+                book.positions.remove((low, high))
+                signals.append(SpreadSignal(CLOSE, symbol, low, high, spread))
+        if signals or len(book.positions) >= self.max_pairs:
+            return signals
+
+        best = book.best_pair()
+        if best is None:
+            return signals
+        low, high, spread = best
+        if spread >= self.threshold_open and (low, high) not in book.positions:
+            book.positions.append((low, high))
+            signals.append(SpreadSignal(OPEN, symbol, low, high, spread))
+        return signals
@@ -1,104 +1,223 @@
 """
-Spread-monitor logic (Binance + Bybit).
+Spread-monitor logic over any venues with an `ExchangeAdapter`.
 """
 
 import asyncio
+import functools
 import logging
-from typing import Dict, Callable, Any
-import requests
+import inspect
+from typing import Dict, Callable, Any, List, Optional, Sequence, Set, Tuple, Union
+
+from exchanges.adapter import Capability, ExchangeAdapter
+from exchanges.clock import CLOCKS, ClockService
+from exchanges.streams import QuoteStore
+from execution.positions import PositionManager
+from strategies.spread_engine import OPEN, SpreadEngine
+from utils import latency
 
 logger = logging.getLogger(__name__)
 
 # ─── Price helpers ───────────────────────────────────────────────────────────
-async def fetch_price(exchange: Any, symbol: str) -> float:
+async def fetch_price(exchange: ExchangeAdapter, symbol: str) -> float:
+    """Return the latest *last* price for `symbol` through the venue's adapter."""
+    t0 = latency.now_ns()
+    price = (await exchange.fetch_ticker(symbol))["last"]
+    latency.record(f"fetch.{exchange.id}", latency.now_ns() - t0)
+    return price
+
+# ─── Feeds ───────────────────────────────────────────────────────────────────
+def start_feeds(
+    store: QuoteStore,
+    clients: Dict[str, ExchangeAdapter],
+    symbols: List[str],
+    poll_interval: float = 1.0,
+    amount: Optional[float] = None,
+) -> List[asyncio.Task]:
     """
-    Return the latest *last* price for `symbol`.
+    One quote feed per venue, over the fastest path its adapter offers: a
+    WebSocket where it streams, batched or per-symbol REST polling every
+    *poll_interval* seconds otherwise.
 
-    • Binance → REST `/api/v3/ticker/price`   
-    • Bybit   → REST `/v5/market/tickers` (testnet)   
-    • Anything else → `exchange.fetch_ticker`
+    With *amount*, venues that stream depth keep a local L2 book and quote
+    the VWAP to sell/buy *amount* as bid/ask instead of the top of book.
+    """
+    tasks = []
+    for name, client in clients.items():
+        if amount is not None and client.supports(Capability.STREAM_DEPTH):
+            feed = client.stream_depth(store, symbols, amount, venue=name)
+        else:
+            feed = client.stream_quotes(store, symbols, venue=name, poll_interval=poll_interval)
+        tasks.append(asyncio.create_task(feed))
+    return tasks
+
+# ─── Trade ordering ──────────────────────────────────────────────────────────
+def open_filled(task: asyncio.Task) -> bool:
+    """True if a finished OPEN callback task neither failed nor returned a result that is not `.ok`."""
+    if task.cancelled() or task.exception() is not None:
+        return False
+    return bool(getattr(task.result(), "ok", True))
+
+
+def open_unknown(task: asyncio.Task) -> bool:
+    """True if a finished OPEN callback returned a result that is `.unknown`: an order may have filled unseen."""
+    if task.cancelled() or task.exception() is not None:
+        return False
+    return bool(getattr(task.result(), "unknown", False))
+
+
+async def after_open(opening: asyncio.Task, close: Callable[[], Any]) -> Any:
     """
-    loop = asyncio.get_running_loop()
-    pair = symbol.replace("/", "")
-
-    # Binance
-    if getattr(exchange, "id", None) == "binance":
-        url = f"https://api.binance.com/api/v3/ticker/price?symbol={pair}"
-        res = await loop.run_in_executor(None, lambda: requests.get(url, timeout=5))
-        res.raise_for_status()
-        return float(res.json()["price"])
-
-    # Bybit (test-net)
-    if getattr(exchange, "id", None) == "bybit":
-        url = (
-            f"https://api-testnet.bybit.com/v5/market/tickers"
-            f"?symbol={pair}&category=spot"
-        )
-        res = await loop.run_in_executor(None, lambda: requests.get(url, timeout=5))
-        res.raise_for_status()
-        data = res.json()
-        return float(data["result"]["list"][0]["lastPrice"])
-
-    # Fallback → ccxt
-    ticker = await loop.run_in_executor(None, lambda: exchange.fetch_ticker(symbol))
-    return ticker["last"]
+    Run `close()` once the pair's in-flight OPEN has settled, so the exit
+    orders never go out before (or without) the entry. An OPEN that did not
+    fill has already been released, so there is nothing to close; one whose
+    outcome is unknown keeps its reservation and is not closed blindly.
+    """
+    await asyncio.wait((opening,))
+    if not open_filled(opening):
+        logger.warning("CLOSE dropped: its OPEN %s", "outcome is unknown" if open_unknown(opening)
+                       else "did not fill")
+        return None
+    res = close()
+    return await res if inspect.isawaitable(res) else res
+
 
 # ─── Spread loop ─────────────────────────────────────────────────────────────
 async def monitor_spread(
-    clients: Dict[str, Any],
-    symbol: str,
+    clients: Dict[str, ExchangeAdapter],
+    symbol: Union[str, Sequence[str]],
     threshold_open: float,
     threshold_close: float,
-    on_open: Callable[[str, str, float], None],
-    on_close: Callable[[str, str, float], None],
+    on_open: Callable[..., None],
+    on_close: Callable[..., None],
     poll_interval: float = 1.0,
+    amount: Optional[float] = None,
+    recorder: Optional[Any] = None,
+    max_quote_age: Optional[float] = None,
+    clocks: ClockService = CLOCKS,
+    positions: Optional[PositionManager] = None,
+    runtime: Optional[Any] = None,
+    depth: bool = True,
+    engine: Optional[SpreadEngine] = None,
 ) -> None:
     """
-    Every *poll_interval* seconds:
-      • fetch prices on all provided exchanges  
-      • find the pair with the widest absolute % spread  
+    On every quote update:
+      • feed the changed venue into the incremental `SpreadEngine`
+        (buy at the ask on *low*, sell at the bid on *high*)
       • fire `on_open` / `on_close` when thresholds are crossed
+        (coroutine callbacks are awaited)
+
+    Venues that can stream are streamed; the rest are polled every
+    *poll_interval* seconds. With *amount* (and *depth*), the streamed bid/ask
+    are the depth-weighted prices to fill *amount*, so spreads reflect what
+    that size can actually trade. Every quote is also handed to *recorder* if
+    given.
+
+    With *max_quote_age* (seconds), venues whose latest quote is older than
+    that are left out of the spread. A quote's age is taken from its exchange
+    timestamp, mapped to local time through *clocks*, when the feed has one,
+    else from when it was received.
+
+    *symbol* may be a list; callbacks then also get `symbol=` (as in
+    `monitor_scanner`). With a *positions* manager, several positions (up to
+    its `max_per_symbol` venue pairs per symbol) stay open at once: an OPEN
+    only fires if the manager admits *amount* within its limits and free
+    balances, and coroutine callbacks run as tasks so one order round trip
+    never holds up the next signal. *amount* is then required (it is what
+    gets reserved). An `on_open` that raises, or returns a result that is
+    not `.ok` (an `ExecutionResult` with a failed leg), gives its
+    reservation and venue pair back – unless its result is `.unknown` (an
+    order got no reply and may have filled): that reservation stays booked
+    and the pair is never closed automatically. A CLOSE for a pair whose
+    OPEN is still in flight waits for it (see `after_open`).
+
+    With a *runtime* (`config.runtime.Runtime`), its params drive the engine
+    and are re-applied whenever they change; new positions are sized from
+    its current `trade_amount`, which stays at *amount* while depth feeds
+    quote for that size.
+
+    *engine* feeds an existing `SpreadEngine` instead of building one from
+    the thresholds, for callers that release its pairs from elsewhere.
     """
-    names         = list(clients)
-    position_open = False
-    opened_pair   = (None, None)
-
-    while True:
-        logger.debug(f"Polling {symbol} prices on {names}…")
-
-        # fetch concurrently
-        tasks  = {n: asyncio.create_task(fetch_price(clients[n], symbol)) for n in names}
-        prices = {}
-        for n, t in tasks.items():
-            try:
-                prices[n] = await t
-            except Exception as exc:
-                logger.warning(f"[{n}] fetch error: {exc}")
-
-        # need at least two valid quotes
-        if len(prices) < 2:
-            await asyncio.sleep(poll_interval)
-            continue
-
-        # locate max spread
-        best_pair, best_spread = None, 0.0
-        for ex1, p1 in prices.items():
-            for ex2, p2 in prices.items():
-                if ex1 == ex2:
-                    continue
-                spread = (p2 - p1) / p1 * 100
-                if abs(spread) > abs(best_spread):
-                    best_pair, best_spread = (ex1, ex2), spread
-
-        low, high = best_pair
-        logger.debug(f"Best spread: {low} vs {high} = {best_spread:.4f}%")
-
-        if not position_open and abs(best_spread) >= threshold_open:
-            on_open(low, high, best_spread)
-            position_open, opened_pair = True, best_pair
-
-        elif position_open and abs(best_spread) <= threshold_close:
-            on_close(*opened_pair, best_spread)
-            position_open = False
-
-        await asyncio.sleep(poll_interval)
+    if positions is not None and amount is None and runtime is None:
+        raise ValueError("monitor_spread: `amount` is required with `positions`")
+    symbols = [symbol] if isinstance(symbol, str) else list(symbol)
+    extra   = lambda sym: {} if isinstance(symbol, str) else {"symbol": sym}
+    store  = QuoteStore(recorder)
+    if engine is None:
+        engine = SpreadEngine(threshold_open, threshold_close, max_quote_age,
+                              max_pairs=positions.max_per_symbol if positions else 1)
+    feeds  = start_feeds(store, clients, symbols, poll_interval, amount if depth else None)
+    decision_hist = latency.histogram("quote_to_decision")
+    inflight: Set[asyncio.Task] = set()
+    opening: Dict[Tuple[str, str, str], asyncio.Task] = {}   # in-flight OPEN per (sym, low, high)
+    unknown: Set[Tuple[str, str, str]] = set()                # OPENs that may have filled unseen
+    if runtime is not None:
+        runtime.bind(engine=engine, store=store)
+        sized = depth and amount is not None and any(
+            c.supports(Capability.STREAM_DEPTH) for c in clients.values())
+        runtime.depth_amount = amount if sized else None
+
+    def settled(task: asyncio.Task, kind: str, sym: str, low: str, high: str) -> None:
+        inflight.discard(task)
+        if kind == OPEN and opening.get((sym, low, high)) is task:
+            del opening[(sym, low, high)]
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            logger.error("%s %s %s/%s callback failed: %r", kind, sym, low, high, exc)
+        if kind == OPEN and open_unknown(task):
+            # an order may have filled: keep the slot and the funds booked
+            unknown.add((sym, low, high))
+            logger.error("OPEN %s %s/%s outcome unknown, reservation kept", sym, low, high)
+        elif kind == OPEN and not open_filled(task):
+            # nothing (or one leg) filled: the slot and the funds are free again
+            positions.release(sym, low, high)
+            engine.release(sym, low, high)
+            logger.warning("OPEN %s %s/%s did not fill, reservation released", sym, low, high)
+
+    def close(sym: str, low: str, high: str, spread: float) -> Any:
+        if positions is not None:
+            positions.release(sym, low, high, (store.get(low, sym).bid, store.get(high, sym).ask))
+        return on_close(low, high, spread, **extra(sym))
+
+    try:
+        while True:
+            for venue, sym in await store.wait():
+                q = store.get(venue, sym)
+                origin = clocks.to_local(venue, q.exch_ts) if q.exch_ts else q.ts
+                signals = engine.update_all(sym, venue, q.bid, q.ask, origin)
+                decided = latency.now_ns()
+                decision_hist.record(decided - q.recv_ns)
+                for signal in signals:
+                    low, high, key = signal.low, signal.high, (sym, signal.low, signal.high)
+                    if positions is not None and signal.kind == OPEN:
+                        price = store.get(low, sym).ask
+                        size = runtime.trade_amount if runtime is not None else amount
+                        if positions.reserve(sym, low, high, size, price, signal.spread) is None:
+                            engine.release(sym, low, high)
+                            continue
+                    latency.mark("signal", decided)
+                    if signal.kind == OPEN:
+                        res = on_open(low, high, signal.spread, **extra(sym))
+                    elif key in unknown:
+                        logger.error("CLOSE %s %s/%s skipped: its OPEN outcome is unknown", sym, low, high)
+                        continue
+                    elif key in opening:
+                        res = after_open(opening[key], functools.partial(close, sym, low, high, signal.spread))
+                    else:
+                        res = close(sym, low, high, signal.spread)
+                    if not inspect.isawaitable(res):
+                        continue
+                    if positions is None:
+                        await res
+                    else:
+                        task = asyncio.ensure_future(res)
+                        inflight.add(task)
+                        if signal.kind == OPEN:
+                            opening[key] = task
+                        task.add_done_callback(functools.partial(settled, kind=signal.kind,
+                                                                 sym=sym, low=low, high=high))
+    finally:
+        for t in feeds:
+            t.cancel()
@@ -0,0 +1,306 @@
+"""
+Supervisor mode: shard symbols across worker processes.
+
+Each worker is a separate process (spawned, so it starts clean) with its own
+event loop, exchange clients and WebSocket connections, running
+`monitor_spread` over its slice of the symbols. Instead of trading, it
+publishes every quote and every OPEN/CLOSE signal as a fixed 32-byte record
+into its own shared-memory ring (`utils.shm_ring`); nothing is pickled on the
+hot path.
+
+The main process drains all rings, keeps the latest price per (venue, symbol),
+records quotes, applies the `PositionManager` limits and runs the trade
+callbacks – execution and capital stay in one place. An OPEN it refuses, or
+whose `on_open` fails, goes back to the worker as a RELEASE record on a
+second, parent-to-worker ring, so the worker's `SpreadEngine` frees the pair
+and can signal it again. A CLOSE whose OPEN is still in flight waits for it.
+When a worker dies, the pairs the parent still holds open for its symbols
+are replayed to its replacement as OPEN records on that ring, so its fresh
+engine signals their CLOSE like the old one would have.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import multiprocessing as mp
+import struct
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from exchanges.clock import CLOCKS
+from exchanges.http import close_session
+from execution.positions import PositionManager
+from strategies.spread_engine import SpreadEngine
+from strategies.spread_strategy import after_open, monitor_spread, open_filled, open_unknown
+from utils import latency
+from utils.logger import setup_logging
+from utils.shm_ring import ShmRing
+
+logger = logging.getLogger(__name__)
+
+# kind, venue (or low), high, symbol, bid (or spread), ask, ts
+RECORD = struct.Struct("<BBBxIddd")
+QUOTE, SIG_OPEN, SIG_CLOSE, RELEASE = 0, 1, 2, 3
+
+RING_CAPACITY  = 1 << 16
+CONTROL_CAPACITY = 1 << 10
+IDLE_SLEEP     = 0.001   # seconds the supervisor naps when every ring is empty
+RING_BACKOFF   = 0.0005  # seconds a worker waits for room to publish a signal
+HEALTH_INTERVAL = 1.0    # seconds between worker liveness checks
+CONTROL_POLL   = 0.005   # seconds between a worker's control-ring checks
+
+
+def shard(symbols: Sequence[str], n: int) -> List[List[str]]:
+    """Round-robin `symbols` into `n` shards."""
+    return [list(symbols[i::n]) for i in range(n)]
+
+
+# ─── Worker side ─────────────────────────────────────────────────────────────
+class RingPublisher:
+    """
+    Writes quotes and signals into a worker's ring using venue / symbol codes
+    (their index in the supervisor's lists). Doubles as the `QuoteStore`
+    recorder, so every quote is published as it lands.
+    """
+
+    def __init__(self, ring: ShmRing, venues: Sequence[str], symbols: Sequence[str]):
+        self.ring = ring
+        self.venue_code = {v: i for i, v in enumerate(venues)}
+        self.symbol_code = {s: i for i, s in enumerate(symbols)}
+
+    def record(self, venue: str, symbol: str, bid: float, ask: float,
+               last: float, ts: float) -> None:
+        # a full ring drops quotes (counted in ring.dropped); a newer one follows
+        self.ring.push(QUOTE, self.venue_code[venue], 0, self.symbol_code[symbol], bid, ask, ts)
+
+    def signal(self, kind: int, low: str, high: str, spread: float, symbol: str) -> bool:
+        return self.ring.push(kind, self.venue_code[low], self.venue_code[high],
+                              self.symbol_code[symbol], spread, 0.0, time.time())
+
+    async def _publish(self, kind: int, low: str, high: str, spread: float, symbol: str) -> None:
+        while not self.signal(kind, low, high, spread, symbol):
+            await asyncio.sleep(RING_BACKOFF)
+
+    async def on_open(self, low: str, high: str, spread: float, symbol: str) -> None:
+        await self._publish(SIG_OPEN, low, high, spread, symbol)
+
+    async def on_close(self, low: str, high: str, spread: float, symbol: str) -> None:
+        await self._publish(SIG_CLOSE, low, high, spread, symbol)
+
+
+async def _apply_control(control: ShmRing, engine: SpreadEngine,
+                         venues: Sequence[str], symbols: Sequence[str]) -> None:
+    """Free the pairs the supervisor refused or failed to open; hold the ones it replays."""
+    while True:
+        for kind, lo, hi, sym, *_ in control.pop_all():
+            if kind == RELEASE:
+                engine.release(symbols[sym], venues[lo], venues[hi])
+            elif kind == SIG_OPEN:
+                engine.hold(symbols[sym], venues[lo], venues[hi])
+        await asyncio.sleep(CONTROL_POLL)
+
+
+async def _run_worker(pub: RingPublisher, control: ShmRing, clients: Dict[str, Any],
+                      venues: List[str], symbols: List[str], shard_symbols: List[str],
+                      params: Dict[str, Any]) -> None:
+    params = dict(params)
+    engine = SpreadEngine(params.pop("threshold_open"), params.pop("threshold_close"),
+                          params["max_quote_age"], max_pairs=params.pop("max_pairs"))
+    clock_sync = asyncio.create_task(CLOCKS.run(clients))
+    releases = asyncio.create_task(_apply_control(control, engine, venues, symbols))
+    try:
+        await monitor_spread(
+            clients, shard_symbols, engine.threshold_open, engine.threshold_close,
+            on_open=pub.on_open, on_close=pub.on_close, recorder=pub, engine=engine, **params,
+        )
+    finally:
+        clock_sync.cancel()
+        releases.cancel()
+        await close_session()
+
+
+def _worker_main(idx: int, ring_name: str, control_name: str, cfg: Dict[str, dict],
+                 factories: Dict[str, Callable], venues: List[str],
+                 symbols: List[str], shard_symbols: List[str],
+                 params: Dict[str, Any]) -> None:
+    setup_logging(logging.INFO)
+    ring = ShmRing.attach(ring_name, RECORD, RING_CAPACITY)
+    control = ShmRing.attach(control_name, RECORD, CONTROL_CAPACITY)
+    pub = RingPublisher(ring, venues, symbols)
+    clients = {n: factories[n](cfg[n]) for n in venues}
+    logger.info("worker %d: %d symbols on %s", idx, len(shard_symbols), venues)
+    try:
+        asyncio.run(_run_worker(pub, control, clients, venues, symbols, shard_symbols, params))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+        control.close()
+
+
+# ─── Supervisor side ─────────────────────────────────────────────────────────
+async def supervise(
+    cfg: Dict[str, dict],
+    factories: Dict[str, Callable],
+    symbols: Sequence[str],
+    workers: int,
+    threshold_open: float,
+    threshold_close: float,
+    on_open: Callable[..., None],
+    on_close: Callable[..., None],
+    poll_interval: float = 1.0,
+    amount: Optional[float] = None,
+    recorder: Optional[Any] = None,
+    max_quote_age: Optional[float] = None,
+    positions: Optional[PositionManager] = None,
+) -> None:
+    """
+    Run `workers` processes over round-robin shards of *symbols* (venues are
+    the keys of *cfg* that have a factory) and act on their signals here:
+    callbacks get `symbol=` and run as tasks; with *positions* an OPEN only
+    fires if the manager admits *amount* (required then), and a CLOSE only
+    for a position it holds. A refused or failed OPEN is handed back to its
+    worker, whose engine may then signal the pair again; one whose outcome
+    is `.unknown` keeps its reservation and is never closed automatically.
+    Dead workers are
+    restarted on their existing rings, with the pairs still open for their
+    symbols replayed to them.
+    """
+    if positions is not None and amount is None:
+        raise ValueError("supervise: `amount` is required with `positions`")
+    venues  = [n for n in cfg if n in factories]
+    symbols = list(symbols)
+    shards  = [s for s in shard(symbols, workers) if s]
+    params  = dict(threshold_open=threshold_open, threshold_close=threshold_close,
+                   poll_interval=poll_interval, amount=amount, max_quote_age=max_quote_age,
+                   max_pairs=positions.max_per_symbol if positions else 1)
+    ctx = mp.get_context("spawn")
+    rings = [ShmRing.create(RECORD, RING_CAPACITY) for _ in shards]
+    controls = [ShmRing.create(RECORD, CONTROL_CAPACITY) for _ in shards]
+
+    def spawn(i: int) -> mp.Process:
+        p = ctx.Process(target=_worker_main, name=f"shard-{i}", daemon=True,
+                        args=(i, rings[i].name, controls[i].name, cfg, factories,
+                              venues, symbols, shards[i], params))
+        p.start()
+        return p
+
+    owner = {symbols.index(s): i for i, syms in enumerate(shards) for s in syms}
+    procs = [spawn(i) for i in range(len(shards))]
+    logger.info("supervising %d workers over %d symbols", len(procs), len(symbols))
+
+    prices: Dict[Tuple[int, int], Tuple[float, float]] = {}   # (venue, symbol) → (bid, ask)
+    inflight: Set[asyncio.Task] = set()
+    opening: Dict[Tuple[int, int, int], asyncio.Task] = {}   # in-flight OPEN per (lo, hi, sym)
+    held: Set[Tuple[int, int, int]] = set()                   # pairs opened and not yet closed
+    unknown: Set[Tuple[int, int, int]] = set()                # OPENs that may have filled unseen
+    transit = latency.histogram("shard_signal_transit")
+    checked = time.monotonic()
+
+    def give_back(w: int, lo: int, hi: int, sym: int) -> None:
+        held.discard((lo, hi, sym))
+        if not controls[w].push(RELEASE, lo, hi, sym, 0.0, 0.0, time.time()):
+            logger.error("worker %d control ring full, %s %s/%s stays taken until restart",
+                         w, symbols[sym], venues[lo], venues[hi])
+
+    def restart(w: int) -> mp.Process:
+        inherited = [k for k in held if owner[k[2]] == w]
+        for lo, hi, sym in inherited:
+            if not controls[w].push(SIG_OPEN, lo, hi, sym, 0.0, 0.0, time.time()):
+                logger.error("worker %d control ring full, open %s %s/%s will not be closed",
+                             w, symbols[sym], venues[lo], venues[hi])
+        if inherited:
+            logger.warning("worker %d takes over %d open pair(s)", w, len(inherited))
+        return spawn(w)
+
+    def settled(task: asyncio.Task, kind: int, w: int, lo: int, hi: int, sym: int) -> None:
+        inflight.discard(task)
+        if kind == SIG_OPEN and opening.get((lo, hi, sym)) is task:
+            del opening[(lo, hi, sym)]
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            logger.error("%s %s callback failed: %r", "OPEN" if kind == SIG_OPEN else "CLOSE",
+                         symbols[sym], exc)
+        if kind == SIG_OPEN and positions is not None and open_unknown(task):
+            # an order may have filled: the reservation and the worker's pair stay
+            unknown.add((lo, hi, sym))
+            logger.error("OPEN %s %s/%s outcome unknown, reservation kept",
+                         symbols[sym], venues[lo], venues[hi])
+        elif kind == SIG_OPEN and positions is not None and not open_filled(task):
+            positions.release(symbols[sym], venues[lo], venues[hi])
+            give_back(w, lo, hi, sym)
+
+    def close(lo: int, hi: int, sym: int, spread: float) -> Any:
+        symbol, low, high = symbols[sym], venues[lo], venues[hi]
+        held.discard((lo, hi, sym))
+        if positions is not None:
+            bid = prices.get((lo, sym), (0.0, 0.0))[0]
+            ask = prices.get((hi, sym), (0.0, 0.0))[1]
+            if positions.release(symbol, low, high, (bid, ask)) is None:
+                return None
+        return on_close(low, high, spread, symbol=symbol)
+
+    def act(w: int, kind: int, lo: int, hi: int, sym: int, spread: float) -> None:
+        symbol, low, high, key = symbols[sym], venues[lo], venues[hi], (lo, hi, sym)
+        if positions is not None and kind == SIG_OPEN:
+            ask = prices.get((lo, sym), (0.0, 0.0))[1]
+            if positions.reserve(symbol, low, high, amount, ask, spread) is None:
+                give_back(w, lo, hi, sym)
+                return
+        latency.mark("signal")
+        if kind == SIG_OPEN:
+            held.add(key)
+            res = on_open(low, high, spread, symbol=symbol)
+        elif key in unknown:
+            held.discard(key)
+            logger.error("CLOSE %s %s/%s skipped: its OPEN outcome is unknown", symbol, low, high)
+            return
+        elif key in opening:
+            res = after_open(opening[key], functools.partial(close, lo, hi, sym, spread))
+        else:
+            res = close(lo, hi, sym, spread)
+        if inspect.isawaitable(res):
+            task = asyncio.ensure_future(res)
+            inflight.add(task)
+            if kind == SIG_OPEN:
+                opening[key] = task
+            task.add_done_callback(functools.partial(settled, kind=kind, w=w, lo=lo, hi=hi, sym=sym))
+
+    try:
+        while True:
+            busy = False
+            for w, ring in enumerate(rings):
+                rows = ring.pop_all()
+                if not rows:
+                    continue
+                busy = True
+                for kind, a, b, sym, x, y, ts in rows:
+                    if kind == QUOTE:
+                        prices[(a, sym)] = (x, y)
+                        if recorder is not None:
+                            recorder.record(venues[a], symbols[sym], x, y, (x + y) / 2, ts)
+                    else:
+                        transit.record(int((time.time() - ts) * 1e9))
+                        act(w, kind, a, b, sym, x)
+
+            now = time.monotonic()
+            if now - checked > HEALTH_INTERVAL:
+                checked = now
+                for i, p in enumerate(procs):
+                    if not p.is_alive():
+                        logger.warning("worker %d exited (code %s), restarting", i, p.exitcode)
+                        procs[i] = restart(i)
+            if not busy:
+                await asyncio.sleep(IDLE_SLEEP)
+            else:
+                await asyncio.sleep(0)
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join(timeout=5)
+        for ring in rings + controls:
+            ring.close()
@@ -0,0 +1,139 @@
+"""Local stand-ins for venue endpoints, shared by the tests."""
+
+import asyncio
+from pathlib import Path
+from typing import Dict, List
+
+from aiohttp import web
+
+from exchanges.adapter import Capability
+
+DATA = Path(__file__).parent / "data"
+
+
+def recorded(name: str) -> List[str]:
+    """Frames of a recorded session in tests/data, one per line."""
+    return [line for line in (DATA / name).read_text().splitlines() if line.strip()]
+
+
+class ReplayServer:
+    """
+    WebSocket server that sends `frames` to every connection, then closes it
+    (after `hold` seconds), so clients have to reconnect to get more.
+    """
+
+    def __init__(self, frames: List[str], hold: float = 0.0):
+        self.frames = frames
+        self.hold = hold
+        self.connections = 0
+        self.received: List[str] = []
+        self.url = ""
+        self._runner = None
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        for frame in self.frames:
+            await ws.send_str(frame)
+        try:
+            msg = await ws.receive(timeout=self.hold) if self.hold else None
+            while msg is not None and msg.type == web.WSMsgType.TEXT:
+                self.received.append(msg.data)
+                msg = await ws.receive(timeout=self.hold)
+        except asyncio.TimeoutError:
+            pass
+        await ws.close()
+        return ws
+
+    async def __aenter__(self) -> "ReplayServer":
+        app = web.Application()
+        app.router.add_get("/ws", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"ws://{host}:{port}/ws"
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._runner.cleanup()
+
+
+async def eventually(check, timeout: float = 5.0, interval: float = 0.01):
+    """Poll `check()` until it returns something truthy; AssertionError on timeout."""
+    end = asyncio.get_running_loop().time() + timeout
+    while True:
+        result = check()
+        if result:
+            return result
+        if asyncio.get_running_loop().time() > end:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(interval)
+
+
+class QueueFeed:
+    """
+    Adapter stand-in whose quote stream is whatever the test puts in `queue`;
+    with `depth` it claims STREAM_DEPTH and serves the same queue there.
+    """
+
+    def __init__(self, venue: str, depth: bool = False):
+        self.id = venue
+        self.depth = depth
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def supports(self, capability) -> bool:
+        return self.depth and capability == Capability.STREAM_DEPTH
+
+    async def stream_quotes(self, store, symbols, venue=None, poll_interval=1.0):
+        while True:
+            symbol, bid, ask = await self.queue.get()
+            store.update(venue or self.id, symbol, bid, ask)
+
+    async def stream_depth(self, store, symbols, amount, venue=None):
+        await self.stream_quotes(store, symbols, venue)
+
+
+class FaultServer:
+    """
+    HTTP endpoints that misbehave on purpose; `hits` counts requests per path.
+
+    /flaky   503 while `failing`, else 200
+    /slow    503 after `delay` seconds
+    /stall   the first request hangs for `stall` seconds, later ones answer at once
+    """
+
+    def __init__(self, delay: float = 0.1, stall: float = 5.0):
+        self.failing = True
+        self.delay = delay
+        self.stall = stall
+        self.hits: Dict[str, int] = {}
+        self.url = ""
+        self._runner = None
+
+    async def _handle(self, request):
+        path = request.path
+        n = self.hits[path] = self.hits.get(path, 0) + 1
+        if path == "/flaky" and self.failing:
+            return web.json_response({"error": "unavailable"}, status=503)
+        if path == "/slow":
+            await asyncio.sleep(self.delay)
+            return web.json_response({"error": "unavailable"}, status=503)
+        if path == "/stall" and n == 1:
+            await asyncio.sleep(self.stall)
+        return web.json_response({"ok": True, "n": n})
+
+    async def __aenter__(self) -> "FaultServer":
+        app = web.Application()
+        app.router.add_get("/{name}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", 0).start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._runner.cleanup()
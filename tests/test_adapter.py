@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from exchanges import adapter
+from exchanges.adapter import (BinanceAdapter, BybitAdapter, Capability, ExchangeAdapter,
+                               IbkrAdapter, Unsupported)
+from exchanges.markets import MARKETS, MarketInfo
+from strategies.scanner import shared_symbols
+
+
+def test_adapter_without_required_calls_cannot_be_built():
+    class Partial(ExchangeAdapter):
+        async def fetch_quote(self, symbol):
+            return 1.0, 2.0
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_depth_calls_need_their_capability():
+    ibkr = IbkrAdapter(object())
+    assert not ibkr.supports(Capability.STREAM_DEPTH)
+    assert not ibkr.supports(Capability.BOOK_SNAPSHOT)
+    with pytest.raises(Unsupported, match="ibkr does not support fetch_book"):
+        asyncio.run(ibkr.fetch_book("BTC/USD"))
+    with pytest.raises(NotImplementedError):
+        asyncio.run(ibkr.stream_depth(None, ["BTC/USD"], 1.0))
+    for cls in (BinanceAdapter, BybitAdapter):
+        assert Capability.STREAM_DEPTH | Capability.BOOK_SNAPSHOT in cls.capabilities
+
+
+def test_tickers_are_named_from_the_cached_markets(monkeypatch):
+    listed = [("BTC", "USDT"), ("BTC", "PLN"), ("ETH", "BTC")]      # PLN is no known quote suffix
+    monkeypatch.setattr(MARKETS, "venues", {
+        v: {f"{b}/{q}": MarketInfo(f"{b}/{q}", b, q) for b, q in listed} for v in ("binance", "bybit")})
+    ids = ["BTCUSDT", "BTCPLN", "ETHBTC", "SOLUSDT"]                  # SOL is not in the cache
+
+    async def get_json(url, params=None, **kw):
+        rows = [{"symbol": i, "bidPrice": "1", "askPrice": "2", "bid1Price": "1", "ask1Price": "2"}
+                for i in ids]
+        return rows if url.endswith("/bookTicker") else {"result": {"list": rows}}
+
+    monkeypatch.setattr(adapter, "get_json", get_json)
+    clients = {"binance": BinanceAdapter(), "bybit": BybitAdapter()}
+    assert asyncio.run(shared_symbols(clients)) == ["BTC/PLN", "BTC/USDT", "ETH/BTC"]
+    # no cached markets: the quote-suffix guess, which cannot place PLN
+    MARKETS.venues = {}
+    assert sorted(asyncio.run(clients["binance"].fetch_tickers())) == ["BTC/USDT", "ETH/BTC", "SOL/USDT"]
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import hmac
+from urllib.parse import parse_qsl
+
+from aiohttp import web
+
+from exchanges.adapter import ExchangeAdapter
+from exchanges.binance import AsyncBinanceRestClient
+from exchanges.clock import VenueClock
+from exchanges.http import OutcomeUnknown, close_session
+from exchanges.markets import MARKETS, MarketInfo
+from execution import trader
+from execution.trader import open_position
+
+
+async def _serve(handler):
+    app = web.Application()
+    app.router.add_route("*", "/api/v3/{name}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}"
+
+
+def test_order_is_signed_over_its_exact_query():
+    seen = {}
+
+    async def handler(request):
+        seen["key"] = request.headers.get("X-MBX-APIKEY")
+        seen["body"] = await request.text()
+        return web.json_response({"orderId": 7, "status": "FILLED",
+                                  "executedQty": "0.01000000", "cummulativeQuoteQty": "650.00000000"})
+
+    async def run():
+        runner, url = await _serve(handler)
+        clock = VenueClock("binance")
+        try:
+            client = AsyncBinanceRestClient("key", "secret", base=url, clock=clock)
+            order = await client.create_order("BTC/USDT", "market", "buy", 0.01)
+        finally:
+            await close_session()
+            await runner.cleanup()
+        return order, clock
+
+    order, clock = asyncio.run(run())
+    query, signature = seen["body"].rsplit("&signature=", 1)
+    assert signature == hmac.new(b"secret", query.encode(), hashlib.sha256).hexdigest()
+    params = dict(parse_qsl(query))
+    assert params["symbol"] == "BTCUSDT" and params["side"] == "BUY" and params["type"] == "MARKET"
+    assert params["quantity"] == "0.01" and "timestamp" in params
+    assert seen["key"] == "key"
+    assert (order["id"], order["filled"], order["average"], order["status"]) == ("7", 0.01, 65000.0, "closed")
+    assert clock.url.endswith("/api/v3/time")       # the clock follows the signing host
+
+
+def test_open_below_min_notional_is_not_sent(monkeypatch):
+    monkeypatch.setattr(MARKETS, "venues", {
+        v: {"BTC/USDT": MarketInfo("BTC/USDT", "BTC", "USDT", 0.01, 0.0001, 0.0001, 10.0)}
+        for v in ("a", "b")})
+    sent = []
+
+    class Client:
+        async def create_market_buy_order(self, symbol, amount):
+            sent.append(amount)
+
+        create_market_sell_order = create_market_buy_order
+
+    clients = {"a": Client(), "b": Client()}
+    # 0.0001 BTC at 65 000 is 6.5 USDT, under the 10 USDT minimum
+    result = asyncio.run(open_position(clients, "a", "b", "BTC/USDT", 0.0001, 65000.0))
+    assert not result.ok and sent == []
+    assert asyncio.run(open_position(clients, "a", "b", "BTC/USDT", 0.001, 65000.0)).ok
+    assert sent == [0.001, 0.001]
+
+
+def test_sandbox_config_never_reaches_production(monkeypatch):
+    from exchanges import adapter, binance, clock
+    from exchanges.adapter import create_binance_adapter
+    monkeypatch.setattr(clock.CLOCKS.clock("binance"), "url", clock.CLOCKS.clock("binance").url)
+    urls = []
+
+    async def get_json(url, params=None, **kw):
+        urls.append(url)
+        if url.endswith("/account") or "/account?" in url:
+            return {"balances": []}
+        if url.endswith("/depth"):
+            return {"bids": [], "asks": []}
+        return {"bidPrice": "1", "askPrice": "2"}
+
+    async def post_json(url, data, **kw):
+        urls.append(url)
+        return {"orderId": 1, "status": "FILLED", "executedQty": "1", "cummulativeQuoteQty": "2"}
+
+    monkeypatch.setattr(adapter, "get_json", get_json)
+    monkeypatch.setattr(binance, "get_json", get_json)
+    monkeypatch.setattr(binance, "post_json", post_json)
+    a = create_binance_adapter({"apiKey": "k", "secret": "s", "sandbox": True})
+
+    async def run():
+        await a.fetch_quote("BTC/USDT")
+        await a.fetch_book("BTC/USDT")
+        await a.create_order("BTC/USDT", "buy", 0.01)
+        await a.fetch_balance()
+    asyncio.run(run())
+
+    urls += [a.WS_URL, a.DEPTH_URL, clock.CLOCKS.clock("binance").url]
+    assert len(urls) == 7
+    assert not [u for u in urls if "api.binance.com" in u or "stream.binance.com" in u]
+    assert all("testnet.binance.vision" in u for u in urls)
+    live = create_binance_adapter({"apiKey": "k", "secret": "s"})
+    assert live.REST_URL == "https://api.binance.com/api/v3"
+
+
+class _Unanswered(ExchangeAdapter):
+    """Every order goes out and gets no reply; `lookup(client_id)` answers the reconciliation."""
+    id = "v"
+
+    def __init__(self, lookup):
+        super().__init__()
+        self.lookup = lookup
+        self.sent = []
+
+    async def fetch_quote(self, symbol):
+        return 1.0, 1.0
+
+    async def fetch_balance(self):
+        return {"free": {}}
+
+    async def create_order(self, symbol, side, amount, client_id=None):
+        self.sent.append(client_id)
+        raise OutcomeUnknown("no reply")
+
+    async def fetch_order(self, symbol, client_id):
+        return self.lookup(client_id)
+
+
+def test_order_without_reply_is_reconciled_by_client_id(monkeypatch):
+    monkeypatch.setattr(trader, "RECONCILE_WINDOW", 0.05)
+    monkeypatch.setattr(trader, "RECONCILE_POLL", 0.01)
+
+    def down(client_id):
+        raise ConnectionError("venue down")
+
+    def run(lookup):
+        clients = {"a": _Unanswered(lookup), "b": _Unanswered(lookup)}
+        return asyncio.run(open_position(clients, "a", "b", "BTC/USDT", 0.01)), clients
+
+    filled, clients = run(lambda cid: {"id": "1", "client_id": cid, "status": "closed", "filled": 0.01})
+    assert filled.ok and not filled.unknown
+    assert [leg.order["client_id"] for leg in filled.legs] == clients["a"].sent + clients["b"].sent
+    never_seen, _ = run(lambda cid: None)
+    assert not never_seen.ok and not never_seen.unknown
+    # the venue cannot be asked: the orders may have filled, so the outcome stays unknown
+    unreachable, _ = run(down)
+    assert not unreachable.ok and unreachable.unknown
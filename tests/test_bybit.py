@@ -0,0 +1,23 @@
+import json
+
+from exchanges.bybit import AsyncBybitRestClient
+from exchanges.markets import MARKETS, MarketInfo, amount_str
+
+
+def _qty(amount: float) -> str:
+    _, body, _ = AsyncBybitRestClient("k", "s")._order_request("BTC/USDT", amount, "Buy")
+    return json.loads(body)["qty"]
+
+
+def test_small_sizes_are_sent_as_plain_decimals(monkeypatch):
+    monkeypatch.setattr(MARKETS, "venues", {})
+    assert _qty(1e-05) == "0.00001"
+    assert _qty(0.5) == "0.5" and _qty(3.0) == "3"
+
+
+def test_sizes_follow_the_market_step(monkeypatch):
+    monkeypatch.setattr(MARKETS, "venues", {
+        "bybit": {"BTC/USDT": MarketInfo("BTC/USDT", "BTC", "USDT", 0.01, 0.000001)}})
+    assert _qty(0.000123) == "0.000123"
+    assert _qty(MARKETS.get("bybit", "BTC/USDT").round_amount(1.23e-05)) == "0.000012"
+    assert amount_str(50.0, 10.0) == "50"
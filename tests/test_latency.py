@@ -0,0 +1,27 @@
+import asyncio
+
+from utils import latency
+
+
+def test_concurrent_signals_keep_their_own_mark():
+    async def submit(results, key):
+        await asyncio.sleep(0.02)              # the order call starts after the next signal
+        results[key] = latency.since("signal")
+
+    async def run():
+        results = {}
+        first = latency.mark("signal", latency.now_ns() - 50_000_000)     # 50 ms ago
+        t1 = asyncio.ensure_future(submit(results, "first"))
+        latency.mark("signal")                                           # now
+        t2 = asyncio.ensure_future(submit(results, "second"))
+        await asyncio.gather(t1, t2)
+        assert results["first"] >= 50_000_000 + 20_000_000 - 1
+        assert results["second"] < 50_000_000
+        assert latency.since("signal") < latency.now_ns() - first
+    asyncio.run(run())
+
+
+def test_since_without_mark_is_none():
+    async def run():
+        return latency.since("never_marked")
+    assert asyncio.run(run()) is None
@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+import pytest
+
+from exchanges import rate_limit
+from exchanges.rate_limit import DEFAULT_LIMIT, Priority, acquire
+
+
+@pytest.fixture(autouse=True)
+def fresh_buckets(monkeypatch):
+    monkeypatch.setattr(rate_limit, "LIMITERS", {})
+
+
+@pytest.mark.parametrize("priority", list(Priority))
+def test_heavy_call_on_an_unmapped_host_is_granted(priority):
+    # a 50-weight depth snapshot can never fit DEFAULT_LIMIT's bucket of 20
+    assert 50 > DEFAULT_LIMIT[1]
+
+    async def run():
+        await asyncio.wait_for(acquire("unmapped.example", 50, priority), 1.0)
+    asyncio.run(run())
+    assert rate_limit.limiter("unmapped.example").granted == 1
+
+
+def test_capped_calls_still_pace_the_bucket():
+    async def run():
+        await acquire("unmapped.example", 50)
+        t0 = time.monotonic()
+        await asyncio.wait_for(acquire("unmapped.example", 50), 5.0)
+        return time.monotonic() - t0
+    rate, burst = DEFAULT_LIMIT
+    # the second call waits for the class's whole allowance to refill
+    assert asyncio.run(run()) >= burst * 0.9 / rate * 0.9
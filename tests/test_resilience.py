@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from exchanges import http, resilience
+from exchanges.http import close_session, get_json, get_session
+from exchanges.resilience import CircuitOpen
+from tests.fakes import FaultServer
+
+
+async def _get(url: str, left: float):
+    async with get_session().get(url, timeout=aiohttp.ClientTimeout(total=left)) as resp:
+        resp.raise_for_status()
+        return await resp.json()
+
+
+def _run(test, **faults):
+    async def run():
+        try:
+            async with FaultServer(**faults) as server:
+                return await test(server)
+        finally:
+            await close_session()
+    return asyncio.run(run())
+
+
+def test_breaker_opens_then_lets_one_probe_through():
+    async def test(server):
+        url = f"{server.url}/flaky"
+        key = resilience.endpoint(url)
+        attempt = lambda left: _get(url, left)
+        for _ in range(resilience.BREAKER_THRESHOLD):
+            with pytest.raises(Exception):
+                await resilience.call(key, attempt, 1.0, retries=0, hedge=False)
+        br = resilience.breaker(key)
+        assert br.state == "open"
+        with pytest.raises(CircuitOpen):                 # fails fast, nothing sent
+            await resilience.call(key, attempt, 1.0, retries=0, hedge=False)
+        assert server.hits["/flaky"] == resilience.BREAKER_THRESHOLD
+
+        br.opened_at -= br.cooldown                      # cooldown over: half-open
+        assert br.state == "half-open"
+        with pytest.raises(Exception):                   # the probe fails: open again
+            await resilience.call(key, attempt, 1.0, retries=0, hedge=False)
+        assert br.state == "open" and br.trips == 1
+
+        br.opened_at -= br.cooldown
+        server.failing = False
+        assert (await resilience.call(key, attempt, 1.0, retries=0, hedge=False))["ok"]
+        assert br.state == "closed" and br.failures == 0
+        assert server.hits["/flaky"] == resilience.BREAKER_THRESHOLD + 2
+    _run(test)
+
+
+def test_retries_stay_within_the_deadline():
+    async def test(server):
+        url = f"{server.url}/slow"                       # 503 after 0.1 s, every time
+        deadline = 0.45
+        t0 = time.monotonic()
+        with pytest.raises(Exception):
+            await resilience.call(resilience.endpoint(url), lambda left: _get(url, left),
+                                  deadline, retries=10, hedge=False, backoff=0.01)
+        elapsed = time.monotonic() - t0
+        assert elapsed < deadline + 0.05
+        assert 2 <= server.hits["/slow"] < 10             # retried, but not all 10 times
+    _run(test)
+
+
+def test_hedge_wins_against_a_stalled_request(monkeypatch):
+    taken = []
+
+    async def acquire(venue, weight, priority):
+        taken.append(weight)
+
+    monkeypatch.setattr(http, "acquire", acquire)
+
+    async def test(server):
+        url = f"{server.url}/stall"                      # first request hangs 1 s
+        resilience._latencies(resilience.endpoint(url)).p95 = 0.05
+        wins = resilience.COUNTERS["hedge_wins"]
+        t0 = time.monotonic()
+        reply = await get_json(url, timeout=2.0, weight=3)
+        assert reply == {"ok": True, "n": 2}             # the duplicate answered
+        assert time.monotonic() - t0 < 0.5
+        assert resilience.COUNTERS["hedge_wins"] == wins + 1
+        assert taken == [3]                              # the hedge took no weight of its own
+    _run(test, stall=1.0)
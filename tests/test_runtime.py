@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+
+import aiohttp
+
+from config import runtime as runtime_mod
+from config.runtime import Runtime, StrategyParams
+from execution.positions import PositionManager
+from strategies.spread_strategy import monitor_spread
+from tests.fakes import QueueFeed, eventually
+
+SYMBOL = "BTC/USDT"
+
+
+def _runtime(tmp_path) -> Runtime:
+    return Runtime(StrategyParams(trade_amount=0.01), strategy_path=tmp_path / "strategy.yaml",
+                   exchanges_path=None)
+
+
+def test_trade_amount_is_live_without_depth_feeds(tmp_path):
+    rt = _runtime(tmp_path)
+    assert rt.update({"trade_amount": 0.5}) == ["trade_amount"]
+    assert rt.trade_amount == 0.5 and rt.pending() == []
+
+
+def test_trade_amount_waits_for_restart_under_depth_feeds(tmp_path):
+    rt = _runtime(tmp_path)
+    rt.depth_amount = 0.01
+    rt.update({"trade_amount": 0.5, "threshold_open": 0.3})
+    assert rt.params.threshold_open == 0.3
+    assert rt.trade_amount == 0.01 and rt.pending() == ["trade_amount"]
+
+
+def test_quote_rate_does_not_depend_on_who_asks(tmp_path, monkeypatch):
+    clock = SimpleNamespace(t=0.0)
+    monkeypatch.setattr(runtime_mod.time, "monotonic", lambda: clock.t)
+    rt = _runtime(tmp_path)
+    rt.store = SimpleNamespace(updates=0)
+    for _ in range(3):
+        clock.t += 1.0
+        rt.store.updates += 100
+        rt.sample()
+    clock.t += 0.5
+    rt.store.updates += 50
+    # any number of /stats readers see the same window
+    assert [rt.stats()["quotes_per_sec"] for _ in range(3)] == [100.0] * 3
+    for _ in range(runtime_mod.RATE_WINDOW + 5):
+        clock.t += 1.0
+        rt.store.updates += 200
+        rt.sample()
+    assert rt.stats()["quotes_per_sec"] == 200.0        # old samples rolled out
+
+
+def test_monitor_spread_sizes_from_the_runtime(tmp_path):
+    async def run(depth: bool):
+        clients = {"a": QueueFeed("a", depth), "b": QueueFeed("b", depth)}
+        pm = PositionManager(clients)
+        pm.balances = {name: {"BTC": 10.0, "USDT": 1e6} for name in clients}
+        rt = _runtime(tmp_path)
+        rt.bind(positions=pm)
+        opened = []
+
+        async def on_open(low, high, spread):
+            opened.append(pm.get(SYMBOL, low, high).amount)
+            return SimpleNamespace(ok=True)
+
+        task = asyncio.ensure_future(monitor_spread(
+            clients, SYMBOL, 0.2, 0.1, on_open, None, amount=0.01, positions=pm,
+            runtime=rt, depth=depth))
+        try:
+            await asyncio.sleep(0)
+            rt.update({"trade_amount": 0.02})
+            await clients["a"].queue.put((SYMBOL, 100.0, 100.01))
+            await clients["b"].queue.put((SYMBOL, 101.0, 101.01))
+            await eventually(lambda: opened)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        return opened[0], rt.pending()
+
+    # depth feeds quote for 0.01, so positions stay at 0.01 until a restart
+    assert asyncio.run(run(depth=True)) == (0.01, ["trade_amount"])
+    assert asyncio.run(run(depth=False)) == (0.02, [])
+
+
+def test_post_params_rejects_counts_that_are_not_whole(tmp_path):
+    async def run():
+        rt = _runtime(tmp_path)
+        runner = await rt.serve(port=0)
+        host, port = runner.addresses[0][:2]
+        replies = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                for value in (2.9, "3.5", True, 3.0, "2"):
+                    async with session.post(f"http://{host}:{port}/params",
+                                            json={"max_positions": value}) as resp:
+                        replies.append((resp.status, await resp.json()))
+        finally:
+            await runner.cleanup()
+        return replies, rt.params
+
+    replies, params = asyncio.run(run())
+    for (status, body), value in zip(replies[:3], (2.9, "3.5", True)):
+        assert status == 400 and body["error"] == f"max_positions: expected int, got {value!r}"
+    assert [status for status, _ in replies[3:]] == [200, 200]
+    assert params.max_positions == 2
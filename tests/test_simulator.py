@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from exchanges import clock, http, rate_limit
+from exchanges.http import close_session
+from exchanges.simulator import ExchangeSimulator, SimConfig, create_sim_adapter
+from exchanges.streams import QuoteStore, stream_binance_depth, stream_bybit_depth
+from execution import trader
+from execution.positions import PositionManager
+from execution.trader import close_position, open_position
+from strategies.spread_strategy import monitor_spread
+from tests.fakes import eventually
+
+SYMBOL = "BTC/USDT"
+PAIR = "BTCUSDT"
+
+
+async def _with_sim(cfg: SimConfig, body):
+    sim = await ExchangeSimulator(cfg).start()
+    try:
+        return await body(sim)
+    finally:
+        await sim.stop()
+        await close_session()
+
+
+def test_monitor_spread_opens_and_closes_on_the_simulator():
+    cfg = SimConfig(symbols=(SYMBOL,), quotes_per_sec=400, dislocation_rate=0.05,
+                    dislocation_bps=60, latency_ms=1, latency_jitter_ms=0)
+
+    async def body(sim):
+        clients = sim.adapters()
+        pm = PositionManager(clients)
+        await pm.refresh()
+        opens, closes = [], []
+
+        async def on_open(low, high, spread):
+            pos = pm.get(SYMBOL, low, high)
+            result = await open_position(clients, low, high, SYMBOL, pos.amount, pos.price)
+            opens.append(result)
+            return result
+
+        async def on_close(low, high, spread):
+            result = await close_position(clients, low, high, SYMBOL, 0.01)
+            closes.append(result)
+            return result
+
+        task = asyncio.ensure_future(monitor_spread(
+            clients, SYMBOL, 0.3, 0.1, on_open, on_close, amount=0.01, positions=pm))
+        try:
+            await eventually(lambda: closes, timeout=15.0)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        assert opens[0].ok and closes[0].ok
+        # both legs of the open and of the close were filled, on both venues
+        assert {(f["venue"], f["side"]) for f in sim.fills} == {
+            ("binance", "buy"), ("binance", "sell"), ("bybit", "buy"), ("bybit", "sell")}
+
+    asyncio.run(_with_sim(cfg, body))
+
+
+def test_depth_streams_rebuild_the_simulated_books():
+    amount = 5.0                         # walks several levels of the BTC book
+    cfg = SimConfig(symbols=(SYMBOL, "ETH/USDT"), quotes_per_sec=300)
+
+    async def body(sim):
+        clients = sim.adapters()
+        store = QuoteStore()
+        tasks = [
+            asyncio.ensure_future(stream_binance_depth(store, [SYMBOL], amount, url=clients["binance"].WS_URL,
+                                                       rest_url=clients["binance"].DEPTH_URL)),
+            asyncio.ensure_future(stream_bybit_depth(store, [SYMBOL], amount, url=clients["bybit"].WS_URL)),
+        ]
+        try:
+            await eventually(lambda: store.get("binance", SYMBOL) and store.get("bybit", SYMBOL))
+            start = sim.updates
+            await eventually(lambda: sim.updates > start + 300)       # books moved under the diffs
+            sim.cfg.quotes_per_sec = 0.0                              # freeze the books
+            await asyncio.sleep(0.3)
+            for venue in ("binance", "bybit"):
+                book, q = sim.books[(venue, PAIR)], store.get(venue, SYMBOL)
+                assert q.bid == pytest.approx(book.sweep("sell", amount), rel=1e-6)
+                assert q.ask == pytest.approx(book.sweep("buy", amount), rel=1e-6)
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(_with_sim(cfg, body))
+
+
+def test_signed_calls_with_a_wrong_secret_are_refused():
+    async def body(sim):
+        good = sim.adapters()
+        for venue in ("binance", "bybit"):
+            bad = create_sim_adapter(venue, sim.url, sim.ws_url, {"apiKey": "sim", "secret": "wrong"})
+            with pytest.raises(Exception):
+                await bad.fetch_balance()
+            assert (await good[venue].fetch_balance())["free"]["USDT"] == 1_000_000.0
+        assert sim.fills == []
+
+    asyncio.run(_with_sim(SimConfig(symbols=(SYMBOL,)), body))
+
+
+def test_stop_restores_the_process_overrides():
+    host = "127.0.0.1"
+    urls = {v: clock.CLOCKS.clock(v).url for v in ("binance", "bybit")}
+    limit = rate_limit.VENUE_LIMITS.get(host)
+
+    async def body(sim):
+        sim.adapters()
+        assert clock.CLOCKS.clock("binance").url == f"{sim.url}/api/v3/time"
+        assert clock.CLOCKS.clock("bybit").url == f"{sim.url}/v5/market/time"
+        assert rate_limit.limiter(host).rate > 1e6
+
+    asyncio.run(_with_sim(SimConfig(symbols=(SYMBOL,)), body))
+    assert rate_limit.VENUE_LIMITS.get(host) == limit and host not in rate_limit.LIMITERS
+    assert {v: clock.CLOCKS.clock(v).url for v in urls} == urls
+
+
+def test_supervised_workers_trade_on_the_simulator():
+    # spawned workers build their adapters from the picklable factories,
+    # which must carry the simulator endpoints (clock, rate limit) with them
+    from strategies.supervisor import supervise
+    cfg = SimConfig(symbols=(SYMBOL, "ETH/USDT"), quotes_per_sec=400, dislocation_rate=0.05,
+                    dislocation_bps=60, latency_ms=1, latency_jitter_ms=0)
+
+    async def body(sim):
+        clients = sim.adapters()
+        pm = PositionManager(clients)
+        await pm.refresh()
+        closes = []
+
+        async def on_open(low, high, spread, symbol):
+            pos = pm.get(symbol, low, high)
+            return await open_position(clients, low, high, symbol, pos.amount, pos.price)
+
+        async def on_close(low, high, spread, symbol):
+            result = await close_position(clients, low, high, symbol, 0.01)
+            closes.append(symbol)
+            return result
+
+        task = asyncio.ensure_future(supervise(
+            {v: {} for v in clients}, sim.factories(), [SYMBOL, "ETH/USDT"], 2, 0.3, 0.1,
+            on_open, on_close, amount=0.01, positions=pm))
+        try:
+            await eventually(lambda: closes, timeout=30.0)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        assert len({(f["venue"], f["side"]) for f in sim.fills}) == 4
+
+    asyncio.run(_with_sim(cfg, body))
+
+
+def test_order_whose_reply_times_out_is_found_filled(monkeypatch):
+    monkeypatch.setattr(http, "REQUEST_TIMEOUT", 0.1)      # the venue answers after 0.3 s
+    monkeypatch.setattr(trader, "RECONCILE_POLL", 0.05)
+    cfg = SimConfig(symbols=(SYMBOL,), quotes_per_sec=10, latency_ms=300, latency_jitter_ms=0)
+
+    async def body(sim):
+        return await open_position(sim.adapters(), "binance", "bybit", SYMBOL, 0.01), sim.fills
+
+    result, fills = asyncio.run(_with_sim(cfg, body))
+    assert result.ok and not result.unknown
+    assert sorted(leg.order["filled"] for leg in result.legs) == [0.01, 0.01]
+    assert {(f["venue"], f["side"]) for f in fills} == {("binance", "buy"), ("bybit", "sell")}
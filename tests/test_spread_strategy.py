@@ -0,0 +1,161 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from execution.positions import PositionManager
+from strategies.spread_strategy import monitor_spread
+from tests.fakes import QueueFeed, eventually
+
+SYMBOL = "BTC/USDT"
+
+
+def _positions(clients) -> PositionManager:
+    pm = PositionManager(clients, max_positions=4)
+    pm.balances = {name: {"BTC": 10.0, "USDT": 1e6} for name in clients}
+    return pm
+
+
+async def _run(on_open, rounds: int):
+    """Quote a 1 % spread `rounds` times, waiting for an OPEN each time."""
+    clients = {"a": QueueFeed("a"), "b": QueueFeed("b")}
+    pm = _positions(clients)
+    opens = []
+
+    async def record_open(low, high, spread):
+        opens.append((low, high))
+        return await on_open()
+
+    async def on_close(low, high, spread):
+        return None
+
+    task = asyncio.ensure_future(monitor_spread(
+        clients, SYMBOL, 0.2, 0.1, record_open, on_close, amount=0.01, positions=pm))
+    try:
+        for i in range(rounds):
+            await clients["a"].queue.put((SYMBOL, 100.0, 100.01))
+            await clients["b"].queue.put((SYMBOL, 101.0, 101.01))
+            await eventually(lambda: len(opens) > i)
+            await asyncio.sleep(0.01)                 # let the callback task finish
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    return opens, pm
+
+
+def test_failed_open_releases_reservation_and_pair():
+    async def fail():
+        return SimpleNamespace(ok=False)
+
+    opens, pm = asyncio.run(_run(fail, rounds=2))
+    # the pair fired again on the next quote, so the engine gave it back too
+    assert opens == [("a", "b"), ("a", "b")]
+    assert pm.positions == {}
+    assert pm.free("a", "USDT") == 1e6
+
+
+def test_raising_open_releases_reservation():
+    async def boom():
+        raise RuntimeError("venue down")
+
+    opens, pm = asyncio.run(_run(boom, rounds=2))
+    assert len(opens) == 2
+    assert pm.positions == {}
+
+
+def test_filled_open_keeps_reservation():
+    async def fill():
+        return SimpleNamespace(ok=True)
+
+    opens, pm = asyncio.run(_run(fill, rounds=1))
+    pos = pm.get(SYMBOL, "a", "b")
+    assert pos is not None and pos.amount == 0.01 and pos.price == 100.01
+
+
+def test_positions_require_an_amount():
+    async def run():
+        clients = {"a": QueueFeed("a"), "b": QueueFeed("b")}
+        with pytest.raises(ValueError):
+            await monitor_spread(clients, SYMBOL, 0.2, 0.1, None, None, positions=_positions(clients))
+    asyncio.run(run())
+
+
+def _close_while_opening(open_ok: bool):
+    """Open at a 1 % spread, converge before `on_open` returns, then let it finish."""
+    async def run():
+        clients = {"a": QueueFeed("a"), "b": QueueFeed("b")}
+        pm = _positions(clients)
+        gate = asyncio.Event()
+        events = []
+
+        async def on_open(low, high, spread):
+            events.append("open sent")
+            await gate.wait()
+            events.append("open done")
+            return SimpleNamespace(ok=open_ok)
+
+        async def on_close(low, high, spread):
+            events.append(("close", pm.get(SYMBOL, low, high)))
+
+        task = asyncio.ensure_future(monitor_spread(
+            clients, SYMBOL, 0.2, 0.1, on_open, on_close, amount=0.01, positions=pm))
+        try:
+            await clients["a"].queue.put((SYMBOL, 100.0, 100.01))
+            await clients["b"].queue.put((SYMBOL, 101.0, 101.01))
+            await eventually(lambda: events)
+            await clients["b"].queue.put((SYMBOL, 100.0, 100.01))     # spread gone: CLOSE
+            await asyncio.sleep(0.05)
+            assert events == ["open sent"]                           # the close waits
+            assert pm.get(SYMBOL, "a", "b") is not None
+            gate.set()
+            await asyncio.sleep(0.05)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        return events, pm
+    return asyncio.run(run())
+
+
+def test_close_waits_for_the_open_in_flight():
+    events, pm = _close_while_opening(open_ok=True)
+    # the position is released (unwound) just before the close orders go out
+    assert events == ["open sent", "open done", ("close", None)]
+    assert pm.positions == {}
+
+
+def test_close_is_dropped_when_the_open_in_flight_fails():
+    events, pm = _close_while_opening(open_ok=False)
+    assert events == ["open sent", "open done"]
+    assert pm.positions == {} and pm.free("a", "USDT") == 1e6
+
+
+def test_open_with_unknown_outcome_keeps_reservation_and_is_never_closed():
+    async def run():
+        clients = {"a": QueueFeed("a"), "b": QueueFeed("b")}
+        pm = _positions(clients)
+        opens, closes = [], []
+
+        async def on_open(low, high, spread):
+            opens.append((low, high))
+            return SimpleNamespace(ok=False, unknown=True)      # an order got no reply
+
+        async def on_close(low, high, spread):
+            closes.append((low, high))
+
+        task = asyncio.ensure_future(monitor_spread(
+            clients, SYMBOL, 0.2, 0.1, on_open, on_close, amount=0.01, positions=pm))
+        try:
+            await clients["a"].queue.put((SYMBOL, 100.0, 100.01))
+            await clients["b"].queue.put((SYMBOL, 101.0, 101.01))
+            await eventually(lambda: opens)
+            await asyncio.sleep(0.01)
+            await clients["b"].queue.put((SYMBOL, 100.0, 100.01))     # spread gone: CLOSE
+            await asyncio.sleep(0.05)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        return closes, pm
+
+    closes, pm = asyncio.run(run())
+    assert closes == []
+    assert pm.get(SYMBOL, "a", "b") is not None and pm.free("a", "USDT") < 1e6
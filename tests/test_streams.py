@@ -0,0 +1,105 @@
+import asyncio
+import re
+
+import pytest
+
+from exchanges import parsing, streams
+from exchanges.parsing import BookTick, parse_bybit_book
+from exchanges.streams import QuoteStore, stream_binance_book, stream_bybit_book
+from tests.fakes import ReplayServer, eventually, recorded
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT"]
+
+
+@pytest.fixture(autouse=True)
+def fast_reconnect(monkeypatch):
+    monkeypatch.setattr(streams, "RECONNECT_DELAY", 0.01)
+
+
+async def _consume(stream, server: ReplayServer, store: QuoteStore, until) -> None:
+    task = asyncio.ensure_future(stream(store, SYMBOLS, url=server.url))
+    try:
+        await eventually(until)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def test_binance_book_replay_fills_store():
+    async def run():
+        store = QuoteStore()
+        async with ReplayServer(recorded("binance_bookticker.jsonl")) as server:
+            await _consume(stream_binance_book, server, store, lambda: store.updates >= 5)
+        btc, eth = store.get("binance", "BTC/USDT"), store.get("binance", "ETH/USDT")
+        assert (btc.bid, btc.ask) == (65012.0, 65012.5)       # last BTC frame wins
+        assert (eth.bid, eth.ask) == (3201.6, 3201.7)
+        assert btc.exch_ts == 0.0
+    asyncio.run(run())
+
+
+def test_bybit_book_replay_keeps_unchanged_side():
+    async def run():
+        store = QuoteStore()
+        async with ReplayServer(recorded("bybit_orderbook1.jsonl"), hold=0.2) as server:
+            await _consume(stream_bybit_book, server, store, lambda: store.updates >= 4)
+            # the client subscribed to both topics on connect
+            await eventually(lambda: server.received)
+            assert "orderbook.1.BTCUSDT" in server.received[0]
+            assert "orderbook.1.ETHUSDT" in server.received[0]
+        btc = store.get("bybit", "BTC/USDT")
+        # bid from the first delta, ask from the second (each omits the other side)
+        assert (btc.bid, btc.ask) == (65010.7, 65010.9)
+        assert btc.exch_ts == 1672304485001
+        eth = store.get("bybit", "ETH/USDT")
+        assert (eth.bid, eth.ask) == (3201.4, 3201.41)
+    asyncio.run(run())
+
+
+def test_bybit_removed_level_is_a_missing_side_on_both_parsers(monkeypatch):
+    frames = recorded("bybit_orderbook1_removed.jsonl")
+    assert all(parsing._BYBIT_BOOK.search(f) for f in frames)      # all on the fast path
+
+    def parse(raw):
+        tick = BookTick()
+        assert parse_bybit_book(raw, tick)
+        return tick.symbol, tick.bid, tick.ask, tick.ts
+
+    fast = [parse(f) for f in frames]
+    monkeypatch.setattr(parsing, "_BYBIT_BOOK", re.compile(r"(?!)"))   # force the json decode
+    assert [parse(f) for f in frames] == fast
+    # a level with size 0 is gone, never a price
+    assert [(bid, ask) for _, bid, ask, _ in fast] == [
+        (65010.5, 65010.6), (0.0, 0.0), (0.0, 0.0), (65010.4, 0.0)]
+
+
+def test_bybit_replay_keeps_the_side_whose_level_was_removed():
+    async def run():
+        store = QuoteStore()
+        async with ReplayServer(recorded("bybit_orderbook1_removed.jsonl"), hold=0.2) as server:
+            await _consume(stream_bybit_book, server, store, lambda: store.updates >= 4)
+        btc = store.get("bybit", "BTC/USDT")
+        assert (btc.bid, btc.ask) == (65010.4, 65010.6)
+    asyncio.run(run())
+
+
+def test_burst_is_coalesced_by_wait():
+    async def run():
+        store = QuoteStore()
+        async with ReplayServer(recorded("binance_bookticker.jsonl") * 20) as server:
+            await _consume(stream_binance_book, server, store, lambda: store.updates >= 100)
+        # 100 updates over two keys, nobody waiting: one wake-up, two keys
+        changed = await asyncio.wait_for(store.wait(), 1)
+        assert changed == {("binance", "BTC/USDT"), ("binance", "ETH/USDT")}
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(store.wait(), 0.05)
+    asyncio.run(run())
+
+
+def test_stream_reconnects_after_server_close():
+    async def run():
+        store = QuoteStore()
+        async with ReplayServer(recorded("binance_bookticker.jsonl")) as server:
+            await _consume(stream_binance_book, server, store, lambda: server.connections >= 3)
+        # every connection replayed the whole recording into the store
+        assert store.updates >= 10
+    asyncio.run(run())
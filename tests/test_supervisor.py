@@ -0,0 +1,156 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from execution.positions import PositionManager
+from strategies import supervisor
+from strategies.spread_engine import CLOSE, OPEN, SpreadEngine
+from strategies.supervisor import RECORD, RELEASE, _apply_control
+from tests.fakes import eventually
+from utils.shm_ring import ShmRing
+
+VENUES = ["a", "b"]
+SYMBOLS = ["BTC/USDT", "ETH/USDT"]
+
+
+def test_reserve_refuses_zero_size_or_price():
+    pm = PositionManager({"a": None, "b": None})
+    pm.balances = {"a": {"USDT": 1e6}, "b": {"BTC": 10.0}}
+    assert pm.reserve("BTC/USDT", "a", "b", 0.0, 100.0) is None
+    assert pm.reserve("BTC/USDT", "a", "b", 0.01, 0.0) is None      # no quote on the buy venue
+    assert pm.reserve("BTC/USDT", "a", "b", 0.01, 100.0) is not None
+
+
+def test_release_record_frees_the_worker_pair(monkeypatch):
+    monkeypatch.setattr(supervisor, "CONTROL_POLL", 0.001)
+
+    async def run():
+        engine = SpreadEngine(0.2, 0.1)
+        engine.update_all("ETH/USDT", "a", 100.0, 100.01)
+        [sig] = engine.update_all("ETH/USDT", "b", 101.0, 101.01)
+        assert sig.kind == OPEN and engine.open_pairs("ETH/USDT") == [("a", "b")]
+        parent = ShmRing.create(RECORD, 16)
+        worker = ShmRing.attach(parent.name, RECORD, 16)
+        task = asyncio.ensure_future(_apply_control(worker, engine, VENUES, SYMBOLS))
+        try:
+            parent.push(RELEASE, 0, 1, 1, 0.0, 0.0, 0.0)
+            await asyncio.sleep(0.05)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            worker.close()
+            parent.close()
+        assert engine.open_pairs("ETH/USDT") == []
+        # the next quote signals the pair again
+        assert [s.kind for s in engine.update_all("ETH/USDT", "b", 101.0, 101.01)] == [OPEN]
+    asyncio.run(run())
+
+
+class _Worker:
+    """Stands in for a worker process; the test writes its ring itself."""
+    started: list = []
+
+    def __init__(self, *args, **kwargs):
+        self.alive = True
+        self.exitcode = None
+
+    def start(self):
+        self.started.append(self)
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+
+def _harness(monkeypatch):
+    """supervise() without processes: returns the rings it creates, data rings first."""
+    _Worker.started = []
+    monkeypatch.setattr(supervisor.mp, "get_context", lambda _: SimpleNamespace(Process=_Worker))
+    rings = []
+    create = ShmRing.create
+    monkeypatch.setattr(ShmRing, "create", lambda *a: rings.append(create(*a)) or rings[-1])
+    return rings
+
+
+def test_supervised_close_waits_for_the_open_in_flight(monkeypatch):
+    rings = _harness(monkeypatch)
+
+    async def run():
+        pm = PositionManager({"a": None, "b": None})
+        pm.balances = {"a": {"USDT": 1e6}, "b": {"BTC": 10.0}}
+        gate = asyncio.Event()
+        events = []
+
+        async def on_open(low, high, spread, symbol):
+            events.append("open sent")
+            await gate.wait()
+            events.append("open done")
+            return SimpleNamespace(ok=True)
+
+        async def on_close(low, high, spread, symbol):
+            events.append(("close", pm.get(symbol, low, high)))
+
+        task = asyncio.ensure_future(supervisor.supervise(
+            {"a": {}, "b": {}}, {"a": None, "b": None}, ["BTC/USDT"], 1, 0.2, 0.1,
+            on_open, on_close, amount=0.01, positions=pm))
+        try:
+            await eventually(lambda: rings)
+            ring = rings[0]
+            ring.push(supervisor.QUOTE, 0, 0, 0, 100.0, 100.01, 0.0)
+            ring.push(supervisor.QUOTE, 1, 0, 0, 101.0, 101.01, 0.0)
+            ring.push(supervisor.SIG_OPEN, 0, 1, 0, 1.0, 0.0, time.time())
+            ring.push(supervisor.SIG_CLOSE, 0, 1, 0, 0.0, 0.0, time.time())
+            await asyncio.sleep(0.05)
+            assert events == ["open sent"] and pm.get("BTC/USDT", "a", "b") is not None
+            gate.set()
+            await asyncio.sleep(0.05)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        assert events == ["open sent", "open done", ("close", None)]
+        assert pm.positions == {}
+    asyncio.run(run())
+
+
+def test_restarted_worker_inherits_its_open_pairs(monkeypatch):
+    rings = _harness(monkeypatch)
+    monkeypatch.setattr(supervisor, "HEALTH_INTERVAL", 0.01)
+
+    async def run():
+        pm = PositionManager({"a": None, "b": None})
+        pm.balances = {"a": {"USDT": 1e6}, "b": {"ETH": 10.0}}
+
+        async def on_open(low, high, spread, symbol):
+            return SimpleNamespace(ok=True)
+
+        task = asyncio.ensure_future(supervisor.supervise(
+            {"a": {}, "b": {}}, {"a": None, "b": None}, SYMBOLS, 1, 0.2, 0.1,
+            on_open, None, amount=0.01, positions=pm))
+        try:
+            await eventually(lambda: rings)
+            data, control = rings
+            data.push(supervisor.QUOTE, 0, 0, 1, 100.0, 100.01, 0.0)
+            data.push(supervisor.SIG_OPEN, 0, 1, 1, 1.0, 0.0, time.time())
+            await eventually(lambda: pm.get("ETH/USDT", "a", "b"))
+            _Worker.started[0].alive = False                  # the worker dies holding the pair
+            await eventually(lambda: len(_Worker.started) == 2)
+            # what the replacement finds on its control ring puts the pair back in its engine
+            worker = ShmRing.attach(control.name, RECORD, supervisor.CONTROL_CAPACITY)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        engine = SpreadEngine(0.2, 0.1)
+        applier = asyncio.ensure_future(_apply_control(worker, engine, VENUES, SYMBOLS))
+        await asyncio.sleep(0.02)
+        applier.cancel()
+        await asyncio.gather(applier, return_exceptions=True)
+        worker.close()
+        assert engine.open_pairs("ETH/USDT") == [("a", "b")]
+        engine.update_all("ETH/USDT", "a", 100.0, 100.01)
+        assert [s.kind for s in engine.update_all("ETH/USDT", "b", 100.0, 100.01)] == [CLOSE]
+    asyncio.run(run())
@@ -0,0 +1,152 @@
+"""
+Hot-path latency instrumentation.
+
+Stages are timed with `time.monotonic_ns()` and recorded into HDR-style
+log-linear histograms: values below 2**SUB_BITS ns get exact buckets, above
+that each power of two is split into 2**(SUB_BITS-1) sub-buckets (~1.6 %
+relative error). Recording is a bit_length, a shift and a list increment;
+no locks – histograms are only written from the event-loop thread.
+
+Standard stages:
+    fetch.<venue>       REST request start → response decoded
+    quote_to_decision   quote stored → spread engine evaluated it
+    signal_to_submit    open/close signal → order leg submitted
+    order_ack.<venue>   order submitted → venue acknowledged
+
+`mark` / `since` stamps live in a context variable, not a global: a task
+created after `mark("signal")` carries its own copy, so order callbacks
+running concurrently each measure from their own decision.
+"""
+
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SUB_BITS = 7
+_HALF    = 1 << (SUB_BITS - 1)
+
+now_ns = time.monotonic_ns
+
+
+def _index(v: int) -> int:
+    m = v.bit_length()
+    if m <= SUB_BITS:
+        return v
+    shift = m - SUB_BITS
+    return shift * _HALF + (v >> shift)
+
+
+def _lower(idx: int) -> int:
+    if idx < (1 << SUB_BITS):
+        return idx
+    shift = idx // _HALF - 1
+    return (idx - shift * _HALF) << shift
+
+
+class LatencyHistogram:
+    """Log-linear nanosecond histogram with percentile queries."""
+    __slots__ = ("name", "counts", "count", "total", "max")
+
+    def __init__(self, name: str, max_ns: int = 60 * 10**9):
+        self.name = name
+        self.counts: List[int] = [0] * (_index(max_ns) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns: int) -> None:
+        if ns < 0:
+            ns = 0
+        idx = _index(ns)
+        if idx >= len(self.counts):
+            idx = len(self.counts) - 1
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q: float) -> int:
+        """Lower bound (ns) of the bucket holding the `q`-th percentile."""
+        if not self.count:
+            return 0
+        rank = max(1, int(self.count * q / 100.0 + 0.5))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return _lower(idx)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """Summary in microseconds."""
+        us = 1e-3
+        return {
+            "count": self.count,
+            "mean":  self.total / self.count * us if self.count else 0.0,
+            "p50":   self.percentile(50) * us,
+            "p90":   self.percentile(90) * us,
+            "p99":   self.percentile(99) * us,
+            "p999":  self.percentile(99.9) * us,
+            "max":   self.max * us,
+        }
+
+    def reset(self) -> None:
+        self.counts = [0] * len(self.counts)
+        self.count = self.total = self.max = 0
+
+
+# ─── Registry ────────────────────────────────────────────────────────────────
+HISTOGRAMS: Dict[str, LatencyHistogram] = {}
+# stage → stamp; a task sees the marks made before it was created
+_MARKS: ContextVar[Dict[str, int]] = ContextVar("latency_marks", default={})
+
+
+def histogram(name: str) -> LatencyHistogram:
+    h = HISTOGRAMS.get(name)
+    if h is None:
+        h = HISTOGRAMS[name] = LatencyHistogram(name)
+    return h
+
+
+def record(name: str, ns: int) -> None:
+    histogram(name).record(ns)
+
+
+def mark(stage: str, ts: Optional[int] = None) -> int:
+    """
+    Remember when `stage` happened (monotonic ns) in the current context;
+    tasks started afterwards keep this value even if it is marked again.
+    """
+    ts = now_ns() if ts is None else ts
+    _MARKS.set({**_MARKS.get(), stage: ts})      # copy: never mutate a dict another task holds
+    return ts
+
+
+def since(stage: str) -> Optional[int]:
+    """Nanoseconds since `stage` was last marked in this context, or None."""
+    ts = _MARKS.get().get(stage)
+    return None if ts is None else now_ns() - ts
+
+
+def snapshot_all(reset: bool = False) -> Dict[str, Dict[str, float]]:
+    out = {name: h.snapshot() for name, h in HISTOGRAMS.items() if h.count}
+    if reset:
+        for h in HISTOGRAMS.values():
+            h.reset()
+    return out
+
+
+async def report(interval: float = 60.0, reset: bool = True) -> None:
+    """Log every histogram's summary every *interval* seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        for name, s in sorted(snapshot_all(reset).items()):
+            logger.info(
+                "latency %-28s n=%-7d p50=%9.1fus p99=%9.1fus p99.9=%9.1fus max=%9.1fus",
+                name, s["count"], s["p50"], s["p99"], s["p999"], s["max"],
+            )
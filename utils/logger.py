@@ -1,9 +1,66 @@
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+FORMAT  = "%(asctime)s %(levelname)-8s [%(name)s] %(message)s"
+DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue the raw LogRecord. The stock QueueHandler formats the message in
+    the calling thread; here `msg % args` and the formatter both run on the
+    listener thread, so the event loop only pays for creating the record.
+    Pass values with %-style args (not f-strings) to keep it that way.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _start_listener() -> None:
+    global _listener
+    if _listener is not None:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(fmt=FORMAT, datefmt=DATEFMT))
+    _listener = QueueListener(_queue, handler, respect_handler_level=False)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Drain the queue and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """
+    Route the root logger through the background writer thread.
+
+    Args:
+        level: root logging level (default INFO)
+    """
+    _start_listener()
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(DeferredQueueHandler(_queue))
+    root.setLevel(level)
+
 
 def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
-    Create a configured Logger with a StreamHandler.
+    Create a configured Logger whose records are formatted and written by a
+    background thread.
 
     Args:
         name: logger name (e.g. module or app name)
@@ -14,15 +71,11 @@ def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
     logger = logging.getLogger(name)
     if not logger.handlers:
+        _start_listener()
         logger.setLevel(level)
-        handler = logging.StreamHandler(sys.stdout)
+        handler = DeferredQueueHandler(_queue)
         handler.setLevel(level)
-        formatter = logging.Formatter(
-            fmt="%(asctime)s %(levelname)-8s [%(name)s] %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        handler.setFormatter(formatter)
         logger.addHandler(handler)
         # Prevent double-logging if root logger is also configured
         logger.propagate = False
-    return logger
\ No newline at end of file
+    return logger